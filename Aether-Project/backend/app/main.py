@@ -5,9 +5,12 @@ from .models import db_models
 from .routes import upload, story, analysis, report, ml, dataset, ai, project
 from sqlalchemy.orm import Session
 from fastapi import Depends
-from .services import project_service
+from .services import metrics, project_service
 from .routes.project import ProjectCreate
 
+# Create tables that do not exist yet (new columns on old databases: see fix_db.py)
+Base.metadata.create_all(bind=engine)
+
 app = FastAPI(title="Aether Analytics Platform")
 
 # Configure CORS
@@ -19,6 +22,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request counts and latency per route for GET /metrics (outermost, so it sees every response)
+app.add_middleware(metrics.MetricsMiddleware)
+
 # Global OPTIONS handler to fix 405 on preflight
 @app.options("/{rest_of_path:path}")
 async def preflight_handler(rest_of_path: str):
@@ -52,6 +58,12 @@ api_router.include_router(project.router)
 app.include_router(api_router, prefix="/api")
 app.include_router(api_router)
 
+@app.on_event("startup")
+def resume_analysis_jobs():
+    # Jobs queued before a restart; see services/job_service.py
+    from .services import job_service
+    job_service.resume_jobs()
+
 @app.get("/")
 async def read_root():
     return {"message": "Welcome to Aether Analytics Platform API"}
@@ -59,3 +71,8 @@ async def read_root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+@app.get("/metrics")
+def get_metrics():
+    """Prometheus text format; see services/metrics.py"""
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
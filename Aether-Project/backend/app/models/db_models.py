@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from ..database import Base
@@ -9,6 +9,10 @@ class Dataset(Base):
     id = Column(Integer, primary_key=True, index=True)
     filename = Column(String, index=True)
     filepath = Column(String)
+    columnar_path = Column(String, nullable=True) # Arrow IPC copy written at ingest
+    content_hash = Column(String, index=True) # SHA-256 of the file; also names its blob
+    size_bytes = Column(Integer)
+    row_count = Column(Integer)
     upload_time = Column(DateTime, default=datetime.utcnow)
     expiry_time = Column(DateTime)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=True)
@@ -64,3 +68,31 @@ class DataInventory(Base):
     
     # Link to actual dataset if uploaded
     dataset_id = Column(Integer, ForeignKey("datasets.id"), nullable=True)
+
+class DatasetArtifact(Base):
+    __tablename__ = "dataset_artifacts"
+    __table_args__ = (UniqueConstraint("content_hash", "kind"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String, index=True) # Shared by every Dataset with the same bytes
+    kind = Column(String) # e.g. "pii_scan", "profile", "analysis"
+    payload = Column(Text) # JSON string
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class AnalysisJob(Base):
+    __tablename__ = "analysis_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # Content hash + options; unique so duplicate submissions share a job. Cleared when the job fails
+    dedup_key = Column(String, unique=True, nullable=True)
+    story_id = Column(Integer, ForeignKey("stories.id"))
+    dataset_id = Column(Integer, ForeignKey("datasets.id"))
+    content_hash = Column(String, index=True) # The dataset version being analysed
+    options = Column(String) # JSON string: mode, sample, stratify
+    status = Column(String, default="queued", index=True) # queued, running, succeeded, failed
+    stage = Column(String, nullable=True) # e.g. "loading", "analysing"
+    progress = Column(Float, default=0.0) # 0..1
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
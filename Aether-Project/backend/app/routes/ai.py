@@ -1,8 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from ..database import get_db
 from ..models import db_models
-import pandas as pd
+from ..services import compute_pool, dataset_loader, instrumentation, profile_service
 import os
 
 router = APIRouter(
@@ -15,9 +15,10 @@ def get_hypotheses(
     dataset_id: int, 
     story_type: str = "exploratory", 
     target_audience: str = "general", 
+    timings: bool = False,
     db: Session = Depends(get_db)
 ):
-    """Generate AI-powered hypotheses for the dataset"""
+    """Generate AI-powered hypotheses for the dataset (timings=true adds a `_timings` section)"""
     dataset = db.query(db_models.Dataset).filter(db_models.Dataset.id == dataset_id).first()
     if not dataset:
         raise HTTPException(status_code=404, detail="Dataset not found")
@@ -26,18 +27,16 @@ def get_hypotheses(
         raise HTTPException(status_code=404, detail="File not found")
     
     try:
-        # Load data
-        if dataset.filepath.endswith('.csv'):
-            df = pd.read_csv(dataset.filepath)
-        elif dataset.filepath.endswith(('.xls', '.xlsx')):
-            df = pd.read_excel(dataset.filepath)
-        else:
+        if not dataset_loader.is_supported(dataset.filepath):
             raise HTTPException(status_code=400, detail="Unsupported file format")
+        from ..services.ai_story_service import generate_hypotheses_from_profile
+        with instrumentation.operation("ai.hypotheses", memory=timings) as trace:
+            # Column catalog recorded at ingest; the data itself is not read
+            with instrumentation.stage("profile"):
+                profile = profile_service.get_profile(db, dataset)
+            hypotheses = generate_hypotheses_from_profile(profile, story_type=story_type, target_audience=target_audience)
         
-        from ..services.ai_story_service import generate_hypotheses
-        hypotheses = generate_hypotheses(df, story_type=story_type, target_audience=target_audience)
-        
-        return {"hypotheses": hypotheses}
+        return instrumentation.attach({"hypotheses": hypotheses}, trace, timings)
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -45,7 +44,8 @@ def get_hypotheses(
 
 
 @router.get("/questions/{dataset_id}")
-def get_smart_questions(dataset_id: int, story_title: str = "", context: str = "", db: Session = Depends(get_db)):
+def get_smart_questions(dataset_id: int, story_title: str = "", context: str = "", timings: bool = False,
+                        db: Session = Depends(get_db)):
     """Generate smart analysis questions based on context"""
     dataset = db.query(db_models.Dataset).filter(db_models.Dataset.id == dataset_id).first()
     if not dataset:
@@ -55,24 +55,30 @@ def get_smart_questions(dataset_id: int, story_title: str = "", context: str = "
         raise HTTPException(status_code=404, detail="File not found")
     
     try:
-        if dataset.filepath.endswith('.csv'):
-            df = pd.read_csv(dataset.filepath)
-        elif dataset.filepath.endswith(('.xls', '.xlsx')):
-            df = pd.read_excel(dataset.filepath)
-        else:
+        if not dataset_loader.is_supported(dataset.filepath):
             raise HTTPException(status_code=400, detail="Unsupported file format")
+        from ..services.ai_story_service import generate_smart_questions_for_columns
+        with instrumentation.operation("ai.questions", memory=timings) as trace:
+            with instrumentation.stage("profile"):
+                profile = profile_service.get_profile(db, dataset)
+            questions = generate_smart_questions_for_columns(
+                profile_service.columns_of_kind(profile, "numeric"),
+                profile_service.columns_of_kind(profile, "categorical"),
+                story_title, context
+            )
         
-        from ..services.ai_story_service import generate_smart_questions
-        questions = generate_smart_questions(df, story_title, context)
-        
-        return {"questions": questions}
+        return instrumentation.attach({"questions": questions}, trace, timings)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/correlations/{story_id}")
-def discover_correlations(story_id: int, db: Session = Depends(get_db)):
-    """Discover interesting correlations in the data"""
+async def discover_correlations(story_id: int, request: Request, method: str = "pearson", timings: bool = False,
+                                db: Session = Depends(get_db)):
+    """Discover interesting correlations in the data (method: pearson or spearman)"""
+    from ..services.correlation_search import METHODS
+    if method not in METHODS:
+        raise HTTPException(status_code=400, detail=f"Unknown correlation method '{method}'. Use one of: {', '.join(METHODS)}")
     story = db.query(db_models.Story).filter(db_models.Story.id == story_id).first()
     if not story:
         raise HTTPException(status_code=404, detail="Story not found")
@@ -81,66 +87,67 @@ def discover_correlations(story_id: int, db: Session = Depends(get_db)):
     if not dataset or not os.path.exists(dataset.filepath):
         raise HTTPException(status_code=404, detail="Dataset not found")
     
+    if not dataset_loader.is_supported(dataset.filepath):
+        raise HTTPException(status_code=400, detail="Unsupported file format")
     try:
-        if dataset.filepath.endswith('.csv'):
-            df = pd.read_csv(dataset.filepath)
-        elif dataset.filepath.endswith(('.xls', '.xlsx')):
-            df = pd.read_excel(dataset.filepath)
-        else:
-            raise HTTPException(status_code=400, detail="Unsupported file format")
-        
-        from ..services.ai_story_service import discover_correlations
-        correlations = discover_correlations(df)
+        # Loaded and computed in the compute pool, off the request threads
+        from ..services.ai_story_service import discover_dataset_correlations
+        with instrumentation.operation("ai.correlations", memory=timings) as trace:
+            task = instrumentation.traced_task(discover_dataset_correlations, compute_pool.dataset_ref(dataset), 0.5, method)
+            correlations = instrumentation.collect(await compute_pool.run(*task, request=request))
         
-        return {"correlations": correlations}
+        return instrumentation.attach({"correlations": correlations}, trace, timings)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/recommendations/{story_id}")
-def get_recommendations(story_id: int, db: Session = Depends(get_db)):
+def get_recommendations(story_id: int, timings: bool = False, db: Session = Depends(get_db)):
     """Generate actionable recommendations"""
-    # Fetch analysis results
     from ..services.analysis_service import perform_analysis
-    analysis = perform_analysis(story_id, db)
-    
-    story = db.query(db_models.Story).filter(db_models.Story.id == story_id).first()
-    dataset = db.query(db_models.Dataset).filter(db_models.Dataset.id == story.dataset_id).first()
-    
-    if dataset.filepath.endswith('.csv'):
-        df = pd.read_csv(dataset.filepath)
-    else:
-        df = pd.read_excel(dataset.filepath)
-    
-    from ..services.ai_story_service import generate_recommendations
-    recommendations = generate_recommendations(
-        analysis.get('auto_insights', []),
-        analysis.get('health_scores', {}),
-        df
-    )
+    from ..services.ai_story_service import generate_recommendations_for_columns
+    with instrumentation.operation("ai.recommendations", memory=timings) as trace:
+        # Fetch analysis results
+        analysis = perform_analysis(story_id, db)
+        
+        story = db.query(db_models.Story).filter(db_models.Story.id == story_id).first()
+        dataset = db.query(db_models.Dataset).filter(db_models.Dataset.id == story.dataset_id).first()
+        
+        with instrumentation.stage("profile"):
+            profile = profile_service.get_profile(db, dataset)
+        
+        recommendations = generate_recommendations_for_columns(
+            analysis.get('auto_insights', []),
+            analysis.get('health_scores', {}),
+            profile_service.columns_of_kind(profile, "numeric"),
+            profile_service.columns_of_kind(profile, "categorical")
+        )
     
-    return {"recommendations": recommendations}
+    return instrumentation.attach({"recommendations": recommendations}, trace, timings)
 
 
 @router.get("/narrative/{story_id}")
-def generate_narrative(story_id: int, db: Session = Depends(get_db)):
+def generate_narrative(story_id: int, timings: bool = False, db: Session = Depends(get_db)):
     """Generate AI-written narrative summary"""
     story = db.query(db_models.Story).filter(db_models.Story.id == story_id).first()
     if not story:
         raise HTTPException(status_code=404, detail="Story not found")
     
     from ..services.analysis_service import perform_analysis
-    analysis = perform_analysis(story_id, db)
-    
     from ..services.ai_story_service import generate_narrative
-    narrative = generate_narrative(
-        story.title,
-        analysis.get('auto_insights', []),
-        analysis.get('health_scores', {}),
-        analysis.get('dataset_info', {})
-    )
+    with instrumentation.operation("ai.narrative", memory=timings) as trace:
+        analysis = perform_analysis(story_id, db)
+        
+        narrative = generate_narrative(
+            story.title,
+            analysis.get('auto_insights', []),
+            analysis.get('health_scores', {}),
+            analysis.get('dataset_info', {})
+        )
     
-    return {
+    return instrumentation.attach({
         "narrative": narrative,
         "title": story.title
-    }
+    }, trace, timings)
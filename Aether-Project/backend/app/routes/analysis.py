@@ -1,5 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
+from typing import Optional
 from ..database import get_db
 from ..services import analysis_service
 
@@ -8,6 +9,66 @@ router = APIRouter(
     tags=["analysis"]
 )
 
+@router.get("/cache")
+def get_cache_stats():
+    """Hit/miss counters of the stored analysis results"""
+    from ..services import analysis_cache
+    return analysis_cache.stats()
+
+@router.get("/compute")
+def get_compute_stats():
+    """Worker count and task outcomes of the analysis process pool"""
+    from ..services import compute_pool
+    return compute_pool.stats()
+
+@router.get("/timings")
+def get_timings():
+    """Wall time, CPU time and peak memory per operation and stage since startup"""
+    from ..services import instrumentation
+    return instrumentation.stats()
+
+@router.post("/{story_id}/jobs")
+def submit_analysis_job(story_id: int, mode: str = "auto", sample: Optional[int] = None, stratify: Optional[str] = None,
+                        db: Session = Depends(get_db)):
+    """
+    Starts the analysis in the background and returns its job id at once.
+    Submitting the same dataset version and options again returns the same job.
+    """
+    from ..services import job_service
+    return job_service.submit_job(db, story_id, mode, sample, stratify)
+
+@router.get("/jobs/{job_id}")
+def get_analysis_job(job_id: int, heatmap: str = "cells", heatmap_layout: str = "upper",
+                     heatmap_decimals: Optional[int] = None, db: Session = Depends(get_db)):
+    """Status, stage and progress (0..1) of a job; `result` holds the analysis once it succeeded"""
+    from ..services import job_service
+    from ..services.correlation_format import format_result
+    status = job_service.get_job(db, job_id)
+    if status.get("result"):
+        status["result"] = format_result(status["result"], heatmap, heatmap_layout, heatmap_decimals)
+    return status
+
 @router.get("/{story_id}")
-def get_analysis(story_id: int, db: Session = Depends(get_db)):
-    return analysis_service.perform_analysis(story_id, db)
+async def get_analysis(story_id: int, request: Request, background_tasks: BackgroundTasks, mode: str = "auto",
+                       sample: Optional[int] = None, stratify: Optional[str] = None, heatmap: str = "cells",
+                       heatmap_layout: str = "upper", heatmap_decimals: Optional[int] = None,
+                       timings: bool = False, db: Session = Depends(get_db)):
+    """
+    mode=fast analyses a `sample` of rows (stratified on `stratify` or the
+    first sensitive column) and computes the full result in the background;
+    once stored, fast requests are answered with it.
+
+    The analysis runs in the compute pool; it is stopped if the client disconnects.
+
+    heatmap=compact sends the correlation matrix as one array of values
+    (heatmap_layout=upper|full, integers at heatmap_decimals); see
+    services/correlation_format.
+
+    timings=true adds a `_timings` section: the wall time, CPU time and peak
+    memory of every stage of this request (see services/instrumentation).
+    """
+    from ..services.correlation_format import format_result
+    # Rejects bad format parameters before any work is done
+    format_result({}, heatmap, heatmap_layout, heatmap_decimals)
+    result = await analysis_service.perform_analysis_async(story_id, db, mode, sample, stratify, background_tasks, request, timings)
+    return format_result(result, heatmap, heatmap_layout, heatmap_decimals)
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from sqlalchemy.orm import Session
+from typing import Optional
 from ..database import get_db
 from ..models import db_models
-import pandas as pd
+from ..services import artifact_store, dataset_loader, profile_service
 import os
 import numpy as np
 
@@ -11,6 +12,11 @@ router = APIRouter(
     tags=["datasets"]
 )
 
+@router.get("/cache")
+def get_cache_stats():
+    """Hit/miss counters of the in-process dataset cache"""
+    return dataset_loader.cache_stats()
+
 @router.get("/{dataset_id}/preview")
 def preview_dataset(dataset_id: int, db: Session = Depends(get_db)):
     dataset = db.query(db_models.Dataset).filter(db_models.Dataset.id == dataset_id).first()
@@ -22,16 +28,18 @@ def preview_dataset(dataset_id: int, db: Session = Depends(get_db)):
         
     try:
         # Read a sample for PII detection (50 rows)
-        if dataset.filepath.endswith('.csv'):
-            df = pd.read_csv(dataset.filepath, nrows=50)
-        elif dataset.filepath.endswith(('.xls', '.xlsx')):
-            df = pd.read_excel(dataset.filepath, nrows=50)
-        else:
+        if not dataset_loader.is_supported(dataset.filepath):
             raise HTTPException(status_code=400, detail="Unsupported file format")
+        df = dataset_loader.load_head(dataset, 50)
             
-        # Detect PII
-        from ..services.analysis_service import detect_pii
-        pii_warnings = detect_pii(df)
+        # The version's recorded guardrail findings; until they are, PII detected on the sample
+        from ..services import guardrails
+        stored = guardrails.get(db, dataset.content_hash)
+        if stored is not None:
+            pii_warnings, pii_source = guardrails.sections(stored)["pii_warnings"], "dataset"
+        else:
+            from ..services.analysis_service import detect_pii
+            pii_warnings, pii_source = detect_pii(df), "preview"
             
         # Replace NaN with None for JSON serialization (use only top 5 for display)
         preview_df = df.head(5).replace({np.nan: None})
@@ -39,11 +47,114 @@ def preview_dataset(dataset_id: int, db: Session = Depends(get_db)):
         return {
             "columns": list(preview_df.columns),
             "rows": preview_df.to_dict(orient='records'),
-            "pii_warnings": pii_warnings
+            "pii_warnings": pii_warnings,
+            "pii_source": pii_source
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/{dataset_id}/dtypes")
+def get_dtype_plan(dataset_id: int, db: Session = Depends(get_db)):
+    """Per-column storage types chosen at ingest and the memory they save"""
+    dataset = db.query(db_models.Dataset).filter(db_models.Dataset.id == dataset_id).first()
+    if not dataset:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    
+    plan = artifact_store.get(db, dataset.content_hash, "dtype_plan")
+    if plan is None:
+        return {"status": "pending", "columns": {}}
+    return {"status": "ready", **plan}
+
+@router.get("/{dataset_id}/profile")
+def get_profile(dataset_id: int, db: Session = Depends(get_db)):
+    """Column catalog (types, nulls, cardinality, ranges, top values) recorded at ingest"""
+    dataset = db.query(db_models.Dataset).filter(db_models.Dataset.id == dataset_id).first()
+    if not dataset:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    
+    if not os.path.exists(dataset.filepath):
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    try:
+        return profile_service.get_profile(db, dataset)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/{dataset_id}/pii")
+def get_pii_scan(dataset_id: int, mode: str = "full", db: Session = Depends(get_db)):
+    """Per-column PII hit counts and rates of the stored whole-dataset scan ("full" or "sample")"""
+    from ..services import ingest_service, privacy_scanner
+    if mode not in privacy_scanner.SCAN_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(privacy_scanner.SCAN_MODES)}")
+    dataset = db.query(db_models.Dataset).filter(db_models.Dataset.id == dataset_id).first()
+    if not dataset:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+
+    scan = artifact_store.get(db, dataset.content_hash, privacy_scanner.SCAN_MODES[mode])
+    if scan is not None:
+        return {"status": "ready", **scan}
+    return {"status": "pending" if ingest_service.pii_scan_running(dataset.content_hash, mode) else "not_scanned"}
+
+@router.post("/{dataset_id}/pii/scan")
+def scan_pii(dataset_id: int, background_tasks: BackgroundTasks, mode: str = "sample", rows: Optional[int] = None,
+             method: str = "stratified", seed: int = 0, db: Session = Depends(get_db)):
+    """
+    Scans the whole dataset for PII. A sample spread over the file is scanned
+    at once; a full scan runs in the background (poll GET /pii?mode=full).
+    """
+    from ..services import ingest_service, privacy_scanner
+    if mode not in privacy_scanner.SCAN_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(privacy_scanner.SCAN_MODES)}")
+    if method not in privacy_scanner.SAMPLING_METHODS:
+        raise HTTPException(status_code=400, detail=f"method must be one of {', '.join(privacy_scanner.SAMPLING_METHODS)}")
+    if rows is not None and rows < 1:
+        raise HTTPException(status_code=400, detail="rows must be positive")
+    dataset = db.query(db_models.Dataset).filter(db_models.Dataset.id == dataset_id).first()
+    if not dataset:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+
+    if not os.path.exists(dataset.filepath):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    if mode == "full":
+        scan = artifact_store.get(db, dataset.content_hash, privacy_scanner.FULL_SCAN_KIND)
+        if scan is not None:
+            return {"status": "ready", **scan}
+        # Already queued or running otherwise: pending either way
+        ingest_service.queue_pii_scan(background_tasks, dataset, "full")
+        return {"status": "pending"}
+    try:
+        result = ingest_service.run_pii_scan(db, dataset, "sample", rows=rows or privacy_scanner.SAMPLE_ROWS,
+                                             method=method, seed=seed)
+        db.commit()
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"PII scan failed: {str(e)}")
+    return {"status": "ready", **result}
+
+@router.get("/{dataset_id}/aggregate")
+def aggregate_dataset(dataset_id: int, by: str, metric: str = "count", value: Optional[str] = None, limit: int = 50,
+                      db: Session = Depends(get_db)):
+    """
+    count, sum or mean of the numeric column `value` (count without it counts
+    rows) per distinct value of `by`, in sorted group order. Served from the
+    dataset's factorised category index, built on first use.
+    """
+    from ..services import category_index, compute_pool
+    if metric not in category_index.METRICS:
+        raise HTTPException(status_code=400, detail=f"metric must be one of {', '.join(category_index.METRICS)}")
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be positive")
+    dataset = db.query(db_models.Dataset).filter(db_models.Dataset.id == dataset_id).first()
+    if not dataset:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    
+    if not os.path.exists(dataset.filepath):
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    return compute_pool.call(category_index.aggregate_dataset, compute_pool.dataset_ref(dataset), by, metric, value, limit)
+
 from pydantic import BaseModel
 
 class CleaningOperation(BaseModel):
@@ -51,6 +162,13 @@ class CleaningOperation(BaseModel):
     params: dict = {}
 
 @router.post("/{dataset_id}/clean")
-def clean_dataset(dataset_id: int, op: CleaningOperation, db: Session = Depends(get_db)):
+def clean_dataset(dataset_id: int, op: CleaningOperation, background_tasks: BackgroundTasks, timings: bool = False,
+                  db: Session = Depends(get_db)):
+    from ..services import ingest_service, instrumentation
     from ..services.analysis_service import apply_cleaning_operation
-    return apply_cleaning_operation(dataset_id, op.operation, op.params, db)
+    with instrumentation.operation("cleaning", memory=timings) as trace:
+        result = apply_cleaning_operation(dataset_id, op.operation, op.params, db)
+    # The edit is a new content version: scan it for PII as an upload would
+    dataset = db.query(db_models.Dataset).filter(db_models.Dataset.id == dataset_id).first()
+    ingest_service.queue_pii_scan(background_tasks, dataset)
+    return instrumentation.attach(result, trace, timings)
@@ -1,20 +1,16 @@
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Form
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Form, BackgroundTasks
 from typing import Optional
 from sqlalchemy.orm import Session
 from ..database import get_db
 from ..models import db_models
-from ..services import privacy_scanner
-import shutil
-import os
+from ..services import ingest_service
 from datetime import datetime, timedelta
 
 router = APIRouter()
 
-UPLOAD_DIR = "temp_uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-
 @router.post("/upload")
 async def upload_file(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...), 
     project_id: Optional[str] = Form(None),
     db: Session = Depends(get_db)
@@ -28,20 +24,19 @@ async def upload_file(
             except ValueError:
                 pid = None
 
-        file_location = f"{UPLOAD_DIR}/{file.filename}"
-        
-        # Save file locally
-        with open(file_location, "wb+") as file_object:
-            shutil.copyfileobj(file.file, file_object)
-        
-        # Scan for PII
-        warnings = privacy_scanner.scan_dataset(file_location)
+        # Stream into content-addressed storage; identical bytes are stored once
+        ingest = await ingest_service.ingest_upload(file, db)
+        file_location = ingest["filepath"]
+        warnings = ingest["warnings"]
         
         # Create Dataset record
         expiry = datetime.utcnow() + timedelta(hours=24)
         dataset = db_models.Dataset(
             filename=file.filename,
             filepath=file_location,
+            content_hash=ingest["sha256"],
+            size_bytes=ingest["size_bytes"],
+            row_count=ingest["row_count"],
             expiry_time=expiry,
             project_id=pid
         )
@@ -57,10 +52,18 @@ async def upload_file(
         db.commit()
         db.refresh(dataset)
         
+        # Typed columnar copy is written after the response is sent
+        background_tasks.add_task(ingest_service.build_columnar_copy, dataset.id)
+        # Then the guardrail findings are recorded, and the whole file is
+        # scanned for PII (AETHER_PII_SCAN: full, sample or off)
+        background_tasks.add_task(ingest_service.build_guardrails, dataset.id)
+        ingest_service.queue_pii_scan(background_tasks, dataset)
+        
         return {
             "info": f"file '{file.filename}' saved at '{file_location}'", 
             "dataset_id": dataset.id,
-            "warnings": warnings
+            "warnings": warnings,
+            "guardrails": ingest["guardrails"]
         }
     except Exception as e:
         import traceback
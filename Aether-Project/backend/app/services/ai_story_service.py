@@ -3,13 +3,24 @@ import numpy as np
 from typing import List, Dict
 import json
 
+from . import instrumentation
+
+@instrumentation.timed
 def generate_hypotheses(df: pd.DataFrame, story_context: str = "", story_type: str = "exploratory", target_audience: str = "general") -> List[Dict]:
     """Generate AI-powered hypotheses based on data structure, context, and user preferences"""
+    from .profile_service import build_profile
+    return generate_hypotheses_from_profile(build_profile(df), story_context, story_type, target_audience)
+
+
+@instrumentation.timed
+def generate_hypotheses_from_profile(profile: dict, story_context: str = "", story_type: str = "exploratory", target_audience: str = "general") -> List[Dict]:
+    """Same as generate_hypotheses, from the stored column catalog instead of the data"""
+    from .profile_service import column, columns_of_kind
     hypotheses = []
     
-    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-    categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
-    date_cols = df.select_dtypes(include=['datetime64']).columns.tolist()
+    numeric_cols = columns_of_kind(profile, "numeric")
+    categorical_cols = columns_of_kind(profile, "categorical")
+    date_cols = columns_of_kind(profile, "datetime")
     
     # Helper to adjust language based on audience
     def adjust_language(text_tech, text_exec, text_gen):
@@ -45,7 +56,7 @@ def generate_hypotheses(df: pd.DataFrame, story_context: str = "", story_type: s
     if len(categorical_cols) > 0 and len(numeric_cols) > 0:
         cat_col = categorical_cols[0]
         num_col = numeric_cols[0]
-        unique_vals = df[cat_col].nunique()
+        unique_vals = column(profile, cat_col)["unique"]
         
         if 2 <= unique_vals <= 10:
             confidence = "high" if story_type == 'comparative' else "medium"
@@ -69,13 +80,11 @@ def generate_hypotheses(df: pd.DataFrame, story_context: str = "", story_type: s
 
     # --- 3. Correlation (Standard) ---
     if len(numeric_cols) >= 2:
-        corr_matrix = df[numeric_cols].corr()
-        np.fill_diagonal(corr_matrix.values, 0)
-        if not corr_matrix.empty: # Check if matrix is not empty
-            max_corr_idx = np.unravel_index(np.argmax(np.abs(corr_matrix.values)), corr_matrix.shape)
-            col1 = numeric_cols[max_corr_idx[0]]
-            col2 = numeric_cols[max_corr_idx[1]]
-            corr_value = corr_matrix.iloc[max_corr_idx[0], max_corr_idx[1]]
+        strongest = profile["strongest_correlation"]
+        if strongest: # Check if matrix is not empty
+            col1 = strongest["var1"]
+            col2 = strongest["var2"]
+            corr_value = strongest["correlation"] if strongest["correlation"] is not None else np.nan
             
             hypotheses.append({
                 "type": "correlation",
@@ -97,10 +106,7 @@ def generate_hypotheses(df: pd.DataFrame, story_context: str = "", story_type: s
     # --- 4. Outliers/Root Cause (Priority for 'root_cause') ---
     if len(numeric_cols) > 0:
         col = numeric_cols[0]
-        Q1 = df[col].quantile(0.25)
-        Q3 = df[col].quantile(0.75)
-        IQR = Q3 - Q1
-        outliers = ((df[col] < (Q1 - 1.5 * IQR)) | (df[col] > (Q3 + 1.5 * IQR))).sum()
+        outliers = column(profile, col)["outliers"]
         
         if outliers > 0:
             confidence = "high" if story_type == 'root_cause' else "medium"
@@ -150,8 +156,17 @@ def generate_hypotheses(df: pd.DataFrame, story_context: str = "", story_type: s
     return sorted(hypotheses, key=lambda x: 0 if x['confidence'] == 'high' else 1)
 
 
+@instrumentation.timed
 def generate_smart_questions(df: pd.DataFrame, story_title: str, context: str) -> List[str]:
     """Generate context-aware analysis questions"""
+    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
+    return generate_smart_questions_for_columns(numeric_cols, categorical_cols, story_title, context)
+
+
+@instrumentation.timed
+def generate_smart_questions_for_columns(numeric_cols: List[str], categorical_cols: List[str], story_title: str, context: str) -> List[str]:
+    """Same as generate_smart_questions, from column names (e.g. the stored catalog)"""
     questions = []
     
     # Analyze story keywords
@@ -191,9 +206,6 @@ def generate_smart_questions(df: pd.DataFrame, story_title: str, context: str) -
         ])
     
     # Data-driven questions based on structure
-    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-    categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
-    
     if len(numeric_cols) > 0:
         questions.append(f"What drives variation in {numeric_cols[0]}?")
     
@@ -203,37 +215,48 @@ def generate_smart_questions(df: pd.DataFrame, story_title: str, context: str) -
     return questions[:6]  # Limit to 6 questions
 
 
-def discover_correlations(df: pd.DataFrame, threshold: float = 0.5) -> List[Dict]:
+@instrumentation.timed
+def discover_correlations(df: pd.DataFrame, threshold: float = 0.5, method: str = "pearson") -> List[Dict]:
     """Discover interesting correlations in the data"""
+    from .correlation_search import top_correlations
     discoveries = []
     
     numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
     
-    if len(numeric_cols) < 2:
-        return discoveries
-    
-    corr_matrix = df[numeric_cols].corr()
-    
-    # Find strong correlations
-    for i in range(len(numeric_cols)):
-        for j in range(i + 1, len(numeric_cols)):
-            corr_value = corr_matrix.iloc[i, j]
-            
-            if abs(corr_value) >= threshold:
-                discoveries.append({
-                    "var1": numeric_cols[i],
-                    "var2": numeric_cols[j],
-                    "correlation": round(corr_value, 3),
-                    "strength": "strong" if abs(corr_value) > 0.7 else "moderate",
-                    "direction": "positive" if corr_value > 0 else "negative",
-                    "insight": f"{numeric_cols[i]} and {numeric_cols[j]} show a {abs(corr_value):.0%} {'positive' if corr_value > 0 else 'negative'} correlation"
-                })
+    # The 5 strongest pairs at or above the threshold, compared at the reported precision
+    for var1, var2, corr_value in top_correlations(df, numeric_cols, k=5, method=method, min_abs=threshold, decimals=3):
+        discoveries.append({
+            "var1": var1,
+            "var2": var2,
+            "correlation": round(corr_value, 3),
+            "strength": "strong" if abs(corr_value) > 0.7 else "moderate",
+            "direction": "positive" if corr_value > 0 else "negative",
+            "insight": f"{var1} and {var2} show a {abs(corr_value):.0%} {'positive' if corr_value > 0 else 'negative'} correlation"
+        })
     
-    return sorted(discoveries, key=lambda x: abs(x['correlation']), reverse=True)[:5]
+    return discoveries
+
 
+@instrumentation.timed
+def discover_dataset_correlations(dataset, threshold: float = 0.5, method: str = "pearson") -> List[Dict]:
+    """discover_correlations on a stored dataset, loaded by the calling process (a compute pool worker)"""
+    from .dataset_loader import load_dataset
+    with instrumentation.stage("load"):
+        df = load_dataset(dataset)
+    return discover_correlations(df, threshold, method)
 
+
+@instrumentation.timed
 def generate_recommendations(insights: List[Dict], health_scores: Dict, df: pd.DataFrame) -> List[Dict]:
     """Generate actionable recommendations based on analysis"""
+    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
+    return generate_recommendations_for_columns(insights, health_scores, numeric_cols, categorical_cols)
+
+
+@instrumentation.timed
+def generate_recommendations_for_columns(insights: List[Dict], health_scores: Dict, numeric_cols: List[str], categorical_cols: List[str]) -> List[Dict]:
+    """Same as generate_recommendations, from column names (e.g. the stored catalog)"""
     recommendations = []
     
     # Data quality recommendations
@@ -268,8 +291,6 @@ def generate_recommendations(insights: List[Dict], health_scores: Dict, df: pd.D
         })
     
     # Advanced analytics recommendations
-    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-    
     if len(numeric_cols) >= 3:
         recommendations.append({
             "category": "Advanced Analytics",
@@ -280,8 +301,6 @@ def generate_recommendations(insights: List[Dict], health_scores: Dict, df: pd.D
         })
     
     # Visualization recommendations
-    categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
-    
     if len(categorical_cols) > 0 and len(numeric_cols) > 0:
         recommendations.append({
             "category": "Visualization",
@@ -294,6 +313,7 @@ def generate_recommendations(insights: List[Dict], health_scores: Dict, df: pd.D
     return recommendations
 
 
+@instrumentation.timed
 def generate_narrative(story_title: str, insights: List[Dict], health_scores: Dict, 
                        dataset_info: Dict) -> str:
     """Generate AI-written narrative summary"""
@@ -0,0 +1,89 @@
+import json
+import threading
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import artifact_store, guardrails
+
+# Bump when the analysis output changes so stored results are recomputed
+ANALYSIS_VERSION = 1
+
+
+class _Counters:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+_counters = _Counters()
+
+
+def _kind(options: dict) -> str:
+    return f"analysis:v{ANALYSIS_VERSION}:{json.dumps(options, sort_keys=True)}"
+
+
+def get(db: Session, dataset, options: dict) -> Optional[dict]:
+    """
+    Stored perform_analysis result for this dataset's content and options.
+
+    Results are keyed by content hash: a cleaning edit produces a new hash,
+    so older results are never served for the edited data. Datasets sharing
+    the same bytes share results; only the displayed source name differs.
+    """
+    result = artifact_store.get(db, dataset.content_hash, _kind(options))
+    _counters.record(result is not None)
+    if result is not None and "data_card" in result:
+        result["data_card"]["source"] = dataset.filename
+    return result
+
+
+def put(db: Session, dataset, options: dict, result: dict, inputs: Optional[dict] = None):
+    """
+    Stores a result. `inputs` is the column summary the result was derived
+    from, which lets a cleaning edit update the result instead of
+    recomputing it (see incremental_analysis).
+    """
+    if not dataset.content_hash:
+        return
+    try:
+        artifact_store.put(db, dataset.content_hash, _kind(options), result)
+        if options == {"mode": "exact"} and "pii_warnings" in result:
+            # The guardrail findings of a loaded-frame result are the version's own
+            guardrails.put(db, dataset.content_hash, guardrails.from_result(result))
+        if inputs is not None:
+            artifact_store.put(db, dataset.content_hash, _kind(options) + ":inputs", inputs)
+        db.commit()
+    except IntegrityError:
+        # A concurrent request stored the same result first
+        db.rollback()
+
+
+def peek(db: Session, content_hash: str, options: dict):
+    """(result, inputs) stored for a content version, or None. Not counted as a lookup."""
+    result = artifact_store.get(db, content_hash, _kind(options))
+    if result is None:
+        return None
+    return result, artifact_store.get(db, content_hash, _kind(options) + ":inputs")
+
+
+def stats() -> dict:
+    return _counters.stats()
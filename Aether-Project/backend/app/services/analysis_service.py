@@ -4,47 +4,132 @@ import json
 from sqlalchemy.orm import Session
 from ..models import db_models
 from fastapi import HTTPException
+from . import analysis_cache, compute_pool, dataset_loader, guardrails, instrumentation, metrics, numeric_profiler, pii_engine, row_index
 import os
-import re
+import threading
 
 def detect_pii(df):
     """Detects Potential PII in the dataframe."""
     pii_cols = []
-    # Simple regex patterns
-    email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-    phone_pattern = r'^\+?1?\d{9,15}$' 
-    
-    for col in df.select_dtypes(include=['object']):
-        # Check a sample for performance
-        sample = df[col].dropna().astype(str).head(50)
+    scanned = 0
+    for col in df.select_dtypes(include=['object', 'category']):
+        # Check a sample for performance (the first 50 values present; rarely further than the first 200 rows)
+        sample = df[col].head(200).dropna().head(50)
+        if len(sample) < 50:
+            sample = df[col].dropna().head(50)
+        scanned = max(scanned, len(sample))
         if len(sample) == 0:
             continue
-            
-        if any(sample.apply(lambda x: bool(re.search(email_pattern, x)))):
-            pii_cols.append({"column": col, "type": "Email"})
-        elif any(sample.apply(lambda x: bool(re.search(phone_pattern, re.sub(r'[\s\-\(\)]', '', x))))): # Strip formatting for phone check
-            pii_cols.append({"column": col, "type": "Phone"})
-            
+
+        # Email first, then phone numbers (formatting stripped)
+        pii_type = pii_engine.classify(sample, pii_engine.ANALYSIS_DETECTORS)
+        if pii_type:
+            pii_cols.append({"column": col, "type": pii_type})
+
+    metrics.inc(metrics.PII_ROWS_SCANNED, scanned, scanner="analysis")
     return pii_cols
 
-def check_bias(df):
+BIAS_KEYWORDS = ['gender', 'sex', 'race', 'ethnicity', 'age_group']
+FAIRNESS_KEYWORDS = ['gender', 'sex', 'race', 'ethnicity', 'age']
+
+def check_bias(df, categories=None):
     """Checks for class imbalance in sensitive columns."""
-    sensitive_keywords = ['gender', 'sex', 'race', 'ethnicity', 'age_group']
+    from .category_index import CategoryIndex
+    categories = categories or CategoryIndex(df)
     bias_warnings = []
     
     for col in df.columns:
-        if any(keyword in col.lower() for keyword in sensitive_keywords):
+        if any(keyword in col.lower() for keyword in BIAS_KEYWORDS):
             if df[col].dtype == 'object' or df[col].dtype.name == 'category':
-                counts = df[col].value_counts(normalize=True)
-                if not counts.empty and counts.max() > 0.75: # > 75% dominance
-                    bias_warnings.append({
-                        "column": col,
-                        "issue": "Potential Representation Bias",
-                        "details": f"Group '{counts.idxmax()}' dominates {counts.max():.1%} of the data."
-                    })
+                warning = bias_warning(col, categories.column(col).value_counts())
+                if warning:
+                    bias_warnings.append(warning)
     return bias_warnings
 
-def perform_analysis(story_id: int, db: Session):
+def bias_warning(col, counts):
+    """Representation bias warning for one column's value counts, or None."""
+    counts = counts / counts.sum() if counts.sum() > 0 else counts
+    if not counts.empty and counts.max() > 0.75: # > 75% dominance
+        return {
+            "column": col,
+            "issue": "Potential Representation Bias",
+            "details": f"Group '{counts.idxmax()}' dominates {counts.max():.1%} of the data."
+        }
+    return None
+
+# Above this size "auto" analysis streams the file instead of loading it whole
+STREAMING_THRESHOLD_BYTES = int(os.getenv("AETHER_STREAMING_THRESHOLD_BYTES", str(512 * 1024 * 1024)))
+
+ANALYSIS_MODES = ("auto", "exact", "stream", "fast")
+
+class AnalysisPlan:
+    """
+    A stored result, or the computation that produces it (a picklable
+    `task` for the compute pool) and the step storing its output.
+    """
+    def __init__(self, result=None, task=None, store=None):
+        self.result = result
+        self.task = task
+        self._store = store
+
+    def complete(self, output):
+        self.result = self._store(output)
+        return self.result
+
+def perform_analysis(story_id: int, db: Session, mode: str = "auto", sample: int = None, stratify: str = None, background_tasks=None):
+    """Blocking version (reports, AI routes); the computation still runs in the compute pool"""
+    with instrumentation.operation("analysis"):
+        with instrumentation.stage("plan"):
+            plan = plan_analysis(story_id, db, mode, sample, stratify, background_tasks)
+        if plan.result is None:
+            output = instrumentation.collect(compute_pool.call(*instrumentation.traced_task(*plan.task)))
+            with instrumentation.stage("store"):
+                plan.complete(output)
+        return plan.result
+
+async def perform_analysis_async(story_id: int, db: Session, mode: str = "auto", sample: int = None, stratify: str = None,
+                                 background_tasks=None, request=None, timings: bool = False):
+    """
+    perform_analysis for async routes: stopped when the client of `request`
+    disconnects. With `timings`, the result has a `_timings` section.
+    """
+    from starlette.concurrency import run_in_threadpool
+    with instrumentation.operation("analysis", memory=timings) as trace:
+        with instrumentation.stage("plan"):
+            plan = await run_in_threadpool(plan_analysis, story_id, db, mode, sample, stratify, background_tasks)
+        if plan.result is None:
+            output = await compute_pool.run(*instrumentation.traced_task(*plan.task), request=request)
+            output = instrumentation.collect(output)
+            with instrumentation.stage("store"):
+                await run_in_threadpool(plan.complete, output)
+    return instrumentation.attach(plan.result, trace, timings)
+
+def plan_analysis(story_id: int, db: Session, mode: str = "auto", sample: int = None, stratify: str = None, background_tasks=None) -> AnalysisPlan:
+    dataset, mode, options, full_mode = resolve_analysis(story_id, db, mode, sample, stratify)
+    if mode == "fast":
+        return _plan_fast_analysis(db, dataset, full_mode, options, background_tasks)
+
+    # Stored result for this exact content version and options
+    cached = analysis_cache.get(db, dataset, options)
+    if cached is not None:
+        return AnalysisPlan(result=cached)
+
+    def store(output):
+        eda_results, inputs = output
+        analysis_cache.put(db, dataset, options, eda_results, inputs)
+        return eda_results
+    # No progress reporting; the version's stored guardrail findings are reused
+    return AnalysisPlan(task=(compute_analysis, compute_pool.dataset_ref(dataset), options, None,
+                              guardrails.get(db, dataset.content_hash)), store=store)
+
+def resolve_analysis(story_id: int, db: Session, mode: str = "auto", sample: int = None, stratify: str = None):
+    """
+    Validates an analysis request. Returns the dataset, the mode it runs in,
+    the options its result is stored under and the mode of a full analysis.
+    """
+    if mode not in ANALYSIS_MODES:
+        raise HTTPException(status_code=400, detail=f"Unknown analysis mode '{mode}'. Use one of: {', '.join(ANALYSIS_MODES)}")
+
     # 1. Fetch Story and Dataset
     story = db.query(db_models.Story).filter(db_models.Story.id == story_id).first()
     if not story:
@@ -58,156 +143,310 @@ def perform_analysis(story_id: int, db: Session):
     if not os.path.exists(file_path):
         raise HTTPException(status_code=404, detail="Dataset file not found on server")
 
+    size = dataset.size_bytes or os.path.getsize(file_path)
+    full_mode = "stream" if size > STREAMING_THRESHOLD_BYTES else "exact"
+    if mode == "auto":
+        mode = full_mode
+
+    if mode == "fast":
+        from .sampled_analysis import FAST_SAMPLE_ROWS
+        if sample is None:
+            sample = FAST_SAMPLE_ROWS
+        if sample < 1:
+            raise HTTPException(status_code=400, detail="sample must be a positive number of rows")
+        if dataset.row_count is not None and dataset.row_count <= sample:
+            # The sample would be the whole dataset
+            mode = full_mode
+        else:
+            return dataset, mode, {"mode": "fast", "sample": sample, "stratify": stratify}, full_mode
+    return dataset, mode, {"mode": mode}, full_mode
+
+def compute_analysis(dataset, options: dict, progress=None, stored_guardrails=None):
+    """
+    Computes the result stored under `options`, plus the column summary
+    incremental re-analysis needs (exact mode only). `progress(stage, fraction)`
+    is told how far it got. `stored_guardrails` are the version's recorded
+    guardrail findings (see guardrails), reported instead of checking again.
+    Runs in the compute pool.
+    """
+    if options["mode"] == "fast":
+        if progress:
+            progress("sampling", 0.1)
+        return _fast_analysis(dataset, options["sample"], options["stratify"], stored_guardrails), None
+    return _full_analysis(dataset, options["mode"], progress, stored_guardrails)
+
+def _full_analysis(dataset, mode: str, progress=None, stored_guardrails=None):
+    if mode == "stream":
+        try:
+            # Single pass in bounded memory; some figures are approximate (see streaming_analysis)
+            from .streaming_analysis import perform_streaming_analysis
+            with instrumentation.stage("stream"):
+                return perform_streaming_analysis(dataset, progress=progress, stored_guardrails=stored_guardrails), None
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+    return _exact_analysis(dataset, progress, stored_guardrails)
+
+# (content hash, mode) of full analyses being computed in the background
+_refining = set()
+_refining_lock = threading.Lock()
+
+def _plan_fast_analysis(db: Session, dataset, full_mode: str, options: dict, background_tasks) -> AnalysisPlan:
+    # Once the full result has been computed it is served instead
+    full = analysis_cache.get(db, dataset, {"mode": full_mode})
+    if full is not None:
+        return AnalysisPlan(result=full)
+
+    def refine(eda_results):
+        refining = False
+        if background_tasks is not None and dataset.content_hash:
+            key = (dataset.content_hash, full_mode)
+            with _refining_lock:
+                if key not in _refining:
+                    _refining.add(key)
+                    background_tasks.add_task(refine_analysis, dataset.id, dataset.content_hash, full_mode)
+                refining = True
+        eda_results["approximation"]["refining"] = refining
+        return eda_results
+
+    eda_results = analysis_cache.get(db, dataset, options)
+    if eda_results is not None:
+        return AnalysisPlan(result=refine(eda_results))
+
+    def store(output):
+        eda_results, _ = output
+        analysis_cache.put(db, dataset, options, eda_results)
+        return refine(eda_results)
+    return AnalysisPlan(task=(compute_analysis, compute_pool.dataset_ref(dataset), options, None,
+                              guardrails.get(db, dataset.content_hash)), store=store)
+
+def _fast_analysis(dataset, sample: int, stratify: str, stored_guardrails=None):
+    try:
+        from .sampled_analysis import perform_fast_analysis
+        return perform_fast_analysis(dataset, sample, stratify, stored_guardrails)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+
+def refine_analysis(dataset_id: int, content_hash: str, mode: str):
+    """Background task: computes and stores the full result, which later requests are then served."""
+    from ..database import SessionLocal
+    db = SessionLocal()
+    try:
+        dataset = db.query(db_models.Dataset).filter(db_models.Dataset.id == dataset_id).first()
+        if dataset is None or dataset.content_hash != content_hash:
+            # Deleted or edited meanwhile; the next fast request schedules the new version
+            return
+        eda_results, inputs = compute_pool.call(compute_analysis, compute_pool.dataset_ref(dataset), {"mode": mode}, None,
+                                                guardrails.get(db, content_hash))
+        analysis_cache.put(db, dataset, {"mode": mode}, eda_results, inputs)
+    except Exception:
+        import traceback
+        traceback.print_exc()
+    finally:
+        db.close()
+        with _refining_lock:
+            _refining.discard((content_hash, mode))
+
+def _exact_analysis(dataset, progress=None, stored_guardrails=None):
     try:
-        # 2. Load Data
-        if file_path.endswith('.csv'):
-            df = pd.read_csv(file_path)
-        elif file_path.endswith(('.xls', '.xlsx')):
-            df = pd.read_excel(file_path)
+        # 2. Load Data (shared cached frame - never modified in place)
+        if progress:
+            progress("loading", 0.05)
+        with instrumentation.stage("load"):
+            df = dataset_loader.load_dataset(dataset)
+        with instrumentation.stage("row_index"):
+            hashes = row_index.for_dataset(dataset, df)
+        if progress:
+            progress("analysing", 0.3)
+        eda_results, _, summary = analyse_frame(df, dataset.filename, hashes, stored_guardrails)
+        from .incremental_analysis import stored_inputs
+        return eda_results, stored_inputs(summary)
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+
+def analyse_frame(df: pd.DataFrame, source: str, row_hashes=None, stored_guardrails=None):
+    """
+    Cleaning, EDA, guardrails and insights on a loaded frame. Returns the
+    results, the cleaned frame and the column summary behind the insights.
+    `row_hashes` is the frame's row index (row_index), if it has one;
+    `stored_guardrails` the dataset version's recorded guardrail findings.
+    """
+    from .category_index import CategoryIndex
+    # 3. Automated Cleaning
+    initial_shape = df.shape
+    metrics.inc(metrics.ANALYSIS_ROWS, initial_shape[0])
+    with instrumentation.stage("dedupe"):
+        if row_hashes is not None:
+            first = row_index.first_occurrences(row_hashes)
+            duplicates = int((~first).sum())
+            df = df[first].copy()
         else:
-            raise ValueError("Unsupported file format")
-        
-        # 3. Automated Cleaning
-        initial_shape = df.shape
-        duplicates = df.duplicated().sum()
-        df = df.drop_duplicates()
-        
-        # Simple imputation: fill numeric NaNs with median, categorical with mode
+            duplicates = df.duplicated().sum()
+            df = df.drop_duplicates().copy()
+    
+    # Simple imputation: fill numeric NaNs with median, categorical with mode
+    with instrumentation.stage("impute"):
         missing_report = df.isnull().sum().to_dict()
         for col in df.columns:
-            if df[col].dtype in [np.float64, np.int64]:
-                df[col] = df[col].fillna(df[col].median())
-            else:
-                if len(df[col].mode()) > 0:
-                    df[col] = df[col].fillna(df[col].mode()[0])
-        
-        # 4. Generate EDA (Exploratory Data Analysis)
-        eda_results = {
-            "dataset_info": {
-                "rows": int(df.shape[0]),
-                "columns": int(df.shape[1]),
-                "initial_rows": int(initial_shape[0]),
-                "duplicates_removed": int(duplicates),
-                "missing_values": {k: int(v) for k, v in missing_report.items() if v > 0}
-            },
-            "columns": list(df.columns),
-            "summary_stats": df.describe().to_dict(),
-            "categorical_analysis": {},
-            "advanced_stats": {},
-            "correlations": {},
-            "distributions": {}
-        }
-        
-        # Analyze categorical columns (top 5 values)
+            df[col] = impute_column(df[col])
+    
+    # 4. Generate EDA (Exploratory Data Analysis)
+    eda_results = {
+        "dataset_info": {
+            "rows": int(df.shape[0]),
+            "columns": int(df.shape[1]),
+            "initial_rows": int(initial_shape[0]),
+            "duplicates_removed": int(duplicates),
+            "missing_values": {k: int(v) for k, v in missing_report.items() if v > 0}
+        },
+        "columns": list(df.columns),
+        "summary_stats": {},
+        "categorical_analysis": {},
+        "advanced_stats": {},
+        "correlations": {},
+        "distributions": {}
+    }
+    
+    # Categorical columns are factorised once for the counts, bias, fairness, chart and insights below
+    categories = CategoryIndex(df)
+
+    # Analyze categorical columns (top 5 values)
+    with instrumentation.stage("categorical"):
         for col in df.select_dtypes(include=['object', 'category']).columns:
-            eda_results["categorical_analysis"][col] = df[col].value_counts().head(5).to_dict()
+            eda_results["categorical_analysis"][col] = categories.column(col).value_counts().head(5).to_dict()
 
-        # Advanced Stats & Distributions for Numeric Columns
+    # Advanced Stats & Distributions for Numeric Columns
+    with instrumentation.stage("describe"):
         numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-        
-        if len(numeric_cols) > 0:
-            # Correlation Matrix
+        numeric_profile = numeric_profiler.profile_numeric(df, numeric_cols)
+        if numeric_cols and df.select_dtypes(include=[np.number, 'datetime']).columns.tolist() == numeric_cols:
+            eda_results["summary_stats"] = {col: numeric_profile.describe(col) for col in numeric_cols}
+        else:
+            # describe() also summarises datetime columns (or everything when nothing is numeric)
+            eda_results["summary_stats"] = df.describe().to_dict()
+    
+    if len(numeric_cols) > 0:
+        # Correlation Matrix
+        with instrumentation.stage("correlation"):
             corr_matrix = df[numeric_cols].corr(method='pearson').round(2)
             # Convert to format suitable for heatmap: { x: col1, y: col2, value: 0.8 }
-            heatmap_data = []
-            for i, row in enumerate(corr_matrix.index):
-                for j, col in enumerate(corr_matrix.columns):
-                    heatmap_data.append({
-                        "x": col,
-                        "y": row,
-                        "value": float(corr_matrix.iloc[i, j])
-                    })
+            # (one tolist() of the matrix rather than an .iloc lookup per cell)
+            heatmap_data = [
+                {"x": col, "y": row, "value": value}
+                for row, values in zip(corr_matrix.index, corr_matrix.to_numpy(dtype=float).tolist())
+                for col, value in zip(corr_matrix.columns, values)
+            ]
             eda_results["correlations"] = {
                 "matrix": heatmap_data,
                 "variables": numeric_cols
             }
 
-            # Skewness, Kurtosis, Histograms
+        # Skewness, Kurtosis, Histograms
+        with instrumentation.stage("distributions"):
             for col in numeric_cols:
-                # Stats
-                eda_results["advanced_stats"][col] = {
-                    "skewness": round(float(df[col].skew()), 2),
-                    "kurtosis": round(float(df[col].kurt()), 2),
-                    "quantiles": {
-                        "25%": float(df[col].quantile(0.25)),
-                        "50%": float(df[col].quantile(0.50)),
-                        "75%": float(df[col].quantile(0.75))
-                    }
-                }
-                
-                # Histogram (10 bins)
-                try:
-                    counts, bin_edges = np.histogram(df[col].dropna(), bins=10)
-                    eda_results["distributions"][col] = [
-                        {"range": f"{round(bin_edges[i], 1)} - {round(bin_edges[i+1], 1)}", "count": int(counts[i])}
-                        for i in range(len(counts))
-                    ]
-                except:
-                    pass
-
-        # 5. Ethical Guardrails (Phase 10) & Fairness Score (Phase 4)
-        eda_results["pii_warnings"] = detect_pii(df)
-        eda_results["bias_warnings"] = check_bias(df)
-        
-        # Calculate Fairness Score for sensitive columns
-        from .metric_service import calculate_fairness_score
-        fairness_scores = {}
-        sensitive_keywords = ['gender', 'sex', 'race', 'ethnicity', 'age']
-        for col in df.columns:
-            if any(k in col.lower() for k in sensitive_keywords):
-                score = calculate_fairness_score(df, col)
-                fairness_scores[col] = round(score * 100, 1) # 0-100 scale
+                advanced, distribution = numeric_sections(numeric_profile, col)
+                eda_results["advanced_stats"][col] = advanced
+                if distribution is not None:
+                    eda_results["distributions"][col] = distribution
+
+    # 5. Ethical Guardrails (Phase 10) & Fairness Score (Phase 4): PII, bias and
+    # fairness scores for sensitive columns, recorded per content version
+    if stored_guardrails is None:
+        stored_guardrails = guardrails.compute(df, categories)
+    eda_results.update(guardrails.sections(stored_guardrails))
+    
+    eda_results["data_card"] = {
+        "source": source,
+        "rows": int(df.shape[0]),
+        "columns": int(df.shape[1]),
+        "pii_detected": len(eda_results["pii_warnings"]) > 0,
+        "bias_detected": len(eda_results["bias_warnings"]) > 0,
+        "cleaning_steps": ["Dropped Duplicates", "Imputed Missing Values"]
+    }
+
+    categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
+    with instrumentation.stage("chart"):
+        visualization = chart(df, categorical_cols, numeric_cols, categories)
+    if visualization is not None:
+        eda_results["visualization"] = visualization
         
-        eda_results["fairness_scores"] = fairness_scores
+    # Generate auto-insights
+    from ..services.insights_service import summarize_for_insights, generate_insights_from_summary, calculate_data_health_score
+    with instrumentation.stage("insights"):
+        summary = summarize_for_insights(df, numeric_profile, categories)
+        eda_results["auto_insights"] = generate_insights_from_summary(summary, eda_results)
+        eda_results["health_scores"] = calculate_data_health_score(eda_results)
         
-        eda_results["data_card"] = {
-            "source": os.path.basename(file_path),
-            "rows": int(df.shape[0]),
-            "columns": int(df.shape[1]),
-            "pii_detected": len(eda_results["pii_warnings"]) > 0,
-            "bias_detected": len(eda_results["bias_warnings"]) > 0,
-            "cleaning_steps": ["Dropped Duplicates", "Imputed Missing Values"]
+    return eda_results, df, summary
+
+def impute_column(series: pd.Series) -> pd.Series:
+    """perform_analysis' imputation: numeric NaNs get the median, everything else the mode"""
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series.fillna(series.median())
+    mode = series.mode()
+    if len(mode) > 0:
+        return series.fillna(mode[0])
+    return series
+
+def numeric_sections(numeric_profile, col):
+    """A numeric column's advanced_stats entry and 10-bin histogram (None where np.histogram would have raised)"""
+    pos = numeric_profile.index(col)
+    advanced = {
+        "skewness": round(float(numeric_profile.skew[pos]), 2),
+        "kurtosis": round(float(numeric_profile.kurt[pos]), 2),
+        "quantiles": {
+            "25%": numeric_profile.quantile(col, 0.25),
+            "50%": numeric_profile.quantile(col, 0.50),
+            "75%": numeric_profile.quantile(col, 0.75)
         }
+    }
+    distribution = None
+    if numeric_profile.histograms[pos] is not None:
+        counts, bin_edges = numeric_profile.histograms[pos]
+        distribution = [
+            {"range": f"{round(bin_edges[i], 1)} - {round(bin_edges[i+1], 1)}", "count": int(counts[i])}
+            for i in range(len(counts))
+        ]
+    return advanced, distribution
 
-        # Prepare simple data for charts (first 2 numeric cols vs first categorical if exists)
-        # This is a heuristic for basic visualization
-        chart_data = []
-        categorical_cols = df.select_dtypes(include=['object']).columns.tolist()
-        
-        if len(categorical_cols) > 0 and len(numeric_cols) > 0:
-            # Group by first categorical and mean of first numeric
-            cat_col = categorical_cols[0]
-            num_col = numeric_cols[0]
-            grouped = df.groupby(cat_col)[num_col].mean().head(10).reset_index()
-            chart_data = grouped.to_dict(orient='records')
-            eda_results["visualization"] = {
-                "type": "bar",
-                "x_axis": cat_col,
-                "y_axis": num_col,
-                "data": chart_data
-            }
-        elif len(numeric_cols) >= 2:
-            # Scatter plot data (sample 50 points)
-            sample = df.head(50)
-            chart_data = sample[[numeric_cols[0], numeric_cols[1]]].to_dict(orient='records')
-            eda_results["visualization"] = {
-                "type": "scatter",
-                "x_axis": numeric_cols[0],
-                "y_axis": numeric_cols[1],
-                "data": chart_data
-            }
-            
-        # Generate auto-insights
-        from ..services.insights_service import generate_auto_insights, calculate_data_health_score
-        eda_results["auto_insights"] = generate_auto_insights(df, eda_results)
-        eda_results["health_scores"] = calculate_data_health_score(eda_results)
-            
-        return eda_results
+def fairness_score(df, col, categories=None) -> float:
+    from .metric_service import calculate_fairness_score
+    return round(calculate_fairness_score(df, col, categories=categories) * 100, 1) # 0-100 scale
 
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+def chart(df, categorical_cols, numeric_cols, categories=None):
+    """
+    Simple data for charts (first 2 numeric cols vs first categorical if exists).
+    This is a heuristic for basic visualization
+    """
+    if len(categorical_cols) > 0 and len(numeric_cols) > 0:
+        # Group by first categorical and mean of first numeric
+        from .category_index import CategoryIndex
+        cat_col = categorical_cols[0]
+        num_col = numeric_cols[0]
+        means = (categories or CategoryIndex(df)).column(cat_col).aggregate("mean", df[num_col])
+        grouped = pd.DataFrame({cat_col: means.index, num_col: means.to_numpy()}).head(10)
+        return {
+            "type": "bar",
+            "x_axis": cat_col,
+            "y_axis": num_col,
+            "data": grouped.to_dict(orient='records')
+        }
+    if len(numeric_cols) >= 2:
+        # Scatter plot data (sample 50 points)
+        sample = df.head(50)
+        return {
+            "type": "scatter",
+            "x_axis": numeric_cols[0],
+            "y_axis": numeric_cols[1],
+            "data": sample[[numeric_cols[0], numeric_cols[1]]].to_dict(orient='records')
+        }
+    return None
 
 def apply_cleaning_operation(dataset_id: int, operation: str, params: dict, db: Session):
     """
@@ -222,56 +461,84 @@ def apply_cleaning_operation(dataset_id: int, operation: str, params: dict, db:
         raise HTTPException(status_code=404, detail="Dataset file not found")
 
     try:
-        # Load Data
-        if file_path.endswith('.csv'):
-            df = pd.read_csv(file_path)
-        elif file_path.endswith(('.xls', '.xlsx')):
-            df = pd.read_excel(file_path)
-        else:
-            raise ValueError("Unsupported file format")
+        # Load Data (copy, the cached frame is shared); plain object columns
+        # so edits like constant imputation are not limited to known categories
+        with instrumentation.stage("load"):
+            df = dataset_loader.load_dataset(dataset).copy()
+        # Row index of the edited frame, updated for just the column an operation touches
+        with instrumentation.stage("row_index"):
+            hashes = row_index.for_dataset(dataset, df)
+        for col in df.select_dtypes(include=['category']).columns:
+            df[col] = df[col].astype(object)
             
         # Apply Operation
-        if operation == 'drop_duplicates':
-            df.drop_duplicates(inplace=True)
+        with instrumentation.stage(operation):
+            if operation == 'drop_duplicates':
+                first = row_index.first_occurrences(hashes)
+                df, hashes = df[first], hashes[first]
             
-        elif operation == 'drop_column':
-            col = params.get('column')
-            if col in df.columns:
-                df.drop(columns=[col], inplace=True)
+            elif operation == 'drop_column':
+                col = params.get('column')
+                if col in df.columns:
+                    hashes = row_index.update_column(hashes, df[col])
+                    df.drop(columns=[col], inplace=True)
                 
-        elif operation == 'rename_column':
-            old_name = params.get('old_name')
-            new_name = params.get('new_name')
-            if old_name in df.columns:
-                df.rename(columns={old_name: new_name}, inplace=True)
+            elif operation == 'rename_column':
+                old_name = params.get('old_name')
+                new_name = params.get('new_name')
+                if old_name in df.columns:
+                    before = df[old_name]
+                    df.rename(columns={old_name: new_name}, inplace=True)
+                    # Merging into an existing name leaves two columns of that name; rehash then
+                    hashes = row_index.update_column(hashes, before, df[new_name]) if df.columns.is_unique else None
                 
-        elif operation == 'impute':
-            col = params.get('column')
-            method = params.get('method', 'mean') # mean, median, mode, constant
-            value = params.get('value')
+            elif operation == 'impute':
+                col = params.get('column')
+                method = params.get('method', 'mean') # mean, median, mode, constant
+                value = params.get('value')
             
-            if col in df.columns:
-                if method == 'mean' and pd.api.types.is_numeric_dtype(df[col]):
-                    df[col].fillna(df[col].mean(), inplace=True)
-                elif method == 'median' and pd.api.types.is_numeric_dtype(df[col]):
-                    df[col].fillna(df[col].median(), inplace=True)
-                elif method == 'mode':
-                    if len(df[col].mode()) > 0:
-                        df[col].fillna(df[col].mode()[0], inplace=True)
-                elif method == 'constant':
-                    df[col].fillna(value, inplace=True)
+                if col in df.columns:
+                    before = df[col].copy()
+                    if method == 'mean' and pd.api.types.is_numeric_dtype(df[col]):
+                        df[col].fillna(df[col].mean(), inplace=True)
+                    elif method == 'median' and pd.api.types.is_numeric_dtype(df[col]):
+                        df[col].fillna(df[col].median(), inplace=True)
+                    elif method == 'mode':
+                        if len(df[col].mode()) > 0:
+                            df[col].fillna(df[col].mode()[0], inplace=True)
+                    elif method == 'constant':
+                        df[col].fillna(value, inplace=True)
+                    hashes = row_index.update_column(hashes, before, df[col])
                     
-        elif operation == 'anonymize':
-            col = params.get('column')
-            if col in df.columns:
-                # Simple hashing for anonymization
-                df[col] = df[col].apply(lambda x: hash(str(x)) if pd.notnull(x) else x)
+            elif operation == 'anonymize':
+                col = params.get('column')
+                if col in df.columns:
+                    before = df[col]
+                    # Simple hashing for anonymization
+                    df[col] = df[col].apply(lambda x: hash(str(x)) if pd.notnull(x) else x)
+                    hashes = row_index.update_column(hashes, before, df[col])
                     
-        # Save changes back to file
-        if file_path.endswith('.csv'):
-            df.to_csv(file_path, index=False)
-        else:
-            df.to_excel(file_path, index=False)
+        # Save changes as a new blob (and its columnar copy); the previous
+        # version's analysis is read first, the store may delete it
+        from .ingest_service import store_edited_frame
+        from . import incremental_analysis
+        previous = incremental_analysis.snapshot(db, dataset)
+        previous_guardrails = guardrails.get(db, dataset.content_hash)
+        with instrumentation.stage("store"):
+            store_edited_frame(db, dataset, df, hashes)
+        try:
+            with instrumentation.stage("carry_over"):
+                # Guardrail findings are redone for the touched columns only
+                findings = guardrails.carry_over(previous_guardrails, df, hashes, operation, params)
+                if findings is not None and guardrails.get(db, dataset.content_hash) is None:
+                    guardrails.put(db, dataset.content_hash, findings)
+                    db.commit()
+                incremental_analysis.carry_over(db, dataset, previous, operation, params)
+        except Exception:
+            # The edit is saved; the next analysis just recomputes in full
+            import traceback
+            traceback.print_exc()
+            db.rollback()
             
         return {"status": "success", "message": f"Operation '{operation}' applied successfully"}
 
@@ -0,0 +1,42 @@
+import json
+from typing import Any, Optional
+
+from sqlalchemy.orm import Session
+
+from ..models import db_models
+
+
+def get(db: Session, content_hash: str, kind: str) -> Optional[Any]:
+    """
+    Returns a stored derived artifact (PII scan, column profile, analysis...)
+    for the given file content, or None. Artifacts are keyed by content hash,
+    so every Dataset sharing the same bytes reuses them.
+    """
+    if not content_hash:
+        return None
+    artifact = db.query(db_models.DatasetArtifact).filter(
+        db_models.DatasetArtifact.content_hash == content_hash,
+        db_models.DatasetArtifact.kind == kind
+    ).first()
+    return json.loads(artifact.payload) if artifact else None
+
+
+def put(db: Session, content_hash: str, kind: str, payload: Any):
+    """Stores (or replaces) an artifact. The caller commits."""
+    if not content_hash:
+        return
+    artifact = db.query(db_models.DatasetArtifact).filter(
+        db_models.DatasetArtifact.content_hash == content_hash,
+        db_models.DatasetArtifact.kind == kind
+    ).first()
+    data = json.dumps(payload, default=str)
+    if artifact:
+        artifact.payload = data
+    else:
+        db.add(db_models.DatasetArtifact(content_hash=content_hash, kind=kind, payload=data))
+
+
+def delete_all(db: Session, content_hash: str):
+    db.query(db_models.DatasetArtifact).filter(
+        db_models.DatasetArtifact.content_hash == content_hash
+    ).delete()
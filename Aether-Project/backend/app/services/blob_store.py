@@ -0,0 +1,64 @@
+import hashlib
+import os
+import uuid
+from typing import Tuple
+
+from sqlalchemy.orm import Session
+
+from ..models import db_models
+
+UPLOAD_DIR = "temp_uploads"
+BLOB_DIR = os.path.join(UPLOAD_DIR, "blobs")
+INCOMING_DIR = os.path.join(UPLOAD_DIR, "incoming")
+os.makedirs(BLOB_DIR, exist_ok=True)
+os.makedirs(INCOMING_DIR, exist_ok=True)
+
+
+def _extension(filename: str) -> str:
+    # Readers dispatch on the extension, so blobs keep the original one
+    return os.path.splitext(filename)[1].lower()
+
+
+def incoming_path(filename: str) -> str:
+    """Unique temp location for bytes whose hash is not known yet."""
+    return os.path.join(INCOMING_DIR, f"{uuid.uuid4().hex}{_extension(filename)}")
+
+
+def blob_path(content_hash: str, filename: str) -> str:
+    return os.path.join(BLOB_DIR, content_hash[:2], f"{content_hash}{_extension(filename)}")
+
+
+def commit(tmp_path: str, content_hash: str, filename: str) -> Tuple[str, bool]:
+    """
+    Moves a fully written temp file to its content-addressed location.
+    Returns (path, is_new); identical bytes uploaded before are not stored twice.
+    """
+    path = blob_path(content_hash, filename)
+    if os.path.exists(path):
+        os.remove(tmp_path)
+        return path, False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.replace(tmp_path, path)
+    return path, True
+
+
+def hash_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def is_referenced(db: Session, content_hash: str, exclude_dataset_id: int = None) -> bool:
+    """True while any other Dataset row still points at this blob."""
+    query = db.query(db_models.Dataset).filter(db_models.Dataset.content_hash == content_hash)
+    if exclude_dataset_id is not None:
+        query = query.filter(db_models.Dataset.id != exclude_dataset_id)
+    return query.first() is not None
+
+
+def delete_files(*paths):
+    for path in paths:
+        if path and os.path.exists(path):
+            os.remove(path)
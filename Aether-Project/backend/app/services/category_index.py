@@ -0,0 +1,223 @@
+"""
+Factorised categorical columns.
+
+The chart, bias check, fairness scores, insights and column profile each
+ran value_counts, groupby or nunique over the same columns. A
+CategoryIndex factorises a column once into integer codes (-1 where the
+value is missing) plus its distinct values, and keeps the per-value
+counts; grouped counts, sums and means are then np.bincount passes over
+the codes instead of a hash groupby.
+
+Columns are factorised on first use. Analyses build one index for the
+frame they analyse; `for_dataset` keeps the index of a stored dataset
+version in an in-process LRU next to dataset_loader's frame cache, which
+/datasets/{id}/aggregate reads from. Every column it factorises counts
+against CACHE_BUDGET_BYTES: older indexes go first, then the least
+recently used columns of the growing one.
+
+value_counts() returns what Series.value_counts() does (same order, index
+type and name). Group means are plain float64 sums divided by counts, so
+they can differ from groupby().mean() (which compensates its sums) in the
+last bits.
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from . import dataset_loader
+
+METRICS = ("count", "sum", "mean")
+
+# Byte budget for the codes kept by for_dataset (per process)
+CACHE_BUDGET_BYTES = int(os.getenv("AETHER_CATEGORY_INDEX_BYTES", str(128 * 1024 * 1024)))
+
+
+class CategoryColumn:
+    """One column's codes, distinct values and per-value counts."""
+
+    def __init__(self, series: pd.Series):
+        self.name = series.name
+        # value_counts of other extension types (nullable ints, strings) counts as Int64
+        self._count_dtype = np.int64
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Already coded; like Categorical.value_counts, unused categories are kept with count 0
+            self.codes = series.cat.codes.to_numpy().astype(np.intp)
+            categories = np.arange(len(series.cat.categories))
+            self.uniques = pd.CategoricalIndex(pd.Categorical.from_codes(categories, dtype=series.dtype))
+        else:
+            codes, uniques = pd.factorize(series)
+            self.codes = codes.astype(np.intp, copy=False)
+            self.uniques = pd.Index(uniques)
+            if isinstance(series.dtype, pd.api.extensions.ExtensionDtype):
+                self._count_dtype = "Int64"
+            if self.uniques.dtype in [bool, "string"] and uniques.dtype == object:
+                # value_counts does not infer bool or string indexes from objects
+                self.uniques = self.uniques.astype(object)
+        self.counts = np.bincount(self.codes[self.codes >= 0], minlength=len(self.uniques))
+        self.nbytes = self.codes.nbytes + self.counts.nbytes + int(self.uniques.memory_usage(deep=True))
+
+    def value_counts(self) -> pd.Series:
+        """Series.value_counts() of the column."""
+        counts = pd.Series(self.counts, index=self.uniques.rename(self.name), name="count", dtype=self._count_dtype)
+        return counts.sort_values(ascending=False)
+
+    def nunique(self) -> int:
+        return int(np.count_nonzero(self.counts))
+
+    def mode(self):
+        """Series.mode()[0] (the smallest of the most frequent values), or None without values."""
+        if not self.counts.any():
+            return None
+        tied = self.uniques[self.counts == self.counts.max()]
+        return pd.Series(tied).mode()[0]
+
+    def count_of(self, value) -> int:
+        position = self.uniques.get_indexer([value])[0]
+        return int(self.counts[position]) if position >= 0 else 0
+
+    def aggregate(self, metric: str, values=None) -> pd.Series:
+        """
+        Per-value count, sum or mean of `values` (aligned with the column),
+        for the values present, in groupby's (sorted) key order. Rows with a
+        missing value are skipped; count without `values` counts rows.
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric '{metric}'")
+        observed = self.counts > 0
+        if values is None:
+            if metric != "count":
+                raise ValueError(f"Metric '{metric}' needs a value column")
+            result = self.counts.astype(np.int64)
+        else:
+            values = pd.Series(values).to_numpy(dtype=np.float64, na_value=np.nan)
+            used = (self.codes >= 0) & ~np.isnan(values)
+            counts = np.bincount(self.codes[used], minlength=len(self.uniques))
+            if metric == "count":
+                result = counts
+            else:
+                sums = np.bincount(self.codes[used], weights=values[used], minlength=len(self.uniques))
+                if metric == "sum":
+                    result = sums
+                else:
+                    with np.errstate(invalid="ignore", divide="ignore"):
+                        result = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+        keys = self.uniques[observed]
+        result = pd.Series(result[observed], index=keys.rename(self.name), name=metric, copy=False)
+        try:
+            return result.iloc[keys.argsort()]
+        except TypeError:
+            # Values that cannot be ordered (mixed types) keep first-appearance order
+            return result
+
+
+class CategoryIndex:
+    """
+    Lazily factorised columns of one frame (which must not change while
+    indexed), or of the columns `load(col)` returns. `on_add(index, col)`
+    is called after a column is added.
+    """
+
+    def __init__(self, df: Optional[pd.DataFrame] = None, load=None, on_add=None):
+        self._load = load if load is not None else (lambda col: df[col])
+        self._on_add = on_add
+        self._columns = OrderedDict()
+        self._lock = threading.Lock()
+
+    def column(self, col, series: Optional[pd.Series] = None) -> CategoryColumn:
+        """The factorised column; `series` is its data, if the caller already holds it."""
+        with self._lock:
+            indexed = self._columns.get(col)
+            if indexed is not None:
+                self._columns.move_to_end(col)
+        if indexed is None:
+            created = CategoryColumn(series if series is not None else self._load(col))
+            with self._lock:
+                indexed = self._columns.setdefault(col, created)
+            if indexed is created and self._on_add is not None:
+                self._on_add(self, col)
+        return indexed
+
+    @property
+    def nbytes(self) -> int:
+        with self._lock:
+            return sum(column.nbytes for column in self._columns.values())
+
+    def shrink(self, budget: int, keep):
+        """Drops least recently used columns other than `keep` until the rest fit in `budget`."""
+        with self._lock:
+            total = sum(column.nbytes for column in self._columns.values())
+            for col in list(self._columns):
+                if total <= budget:
+                    break
+                if col != keep:
+                    total -= self._columns.pop(col).nbytes
+
+
+_indexes = OrderedDict()  # dataset_loader cache key -> CategoryIndex
+_indexes_lock = threading.Lock()
+
+
+def for_dataset(dataset) -> CategoryIndex:
+    """
+    The index of a stored dataset version, shared by every request in this
+    process until the file changes. It keeps only codes: columns are read
+    through dataset_loader (from its cache when the frame is loaded).
+    """
+    key = dataset_loader._cache_key(dataset)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is not None:
+            _indexes.move_to_end(key)
+            return index
+    index = CategoryIndex(load=lambda col: dataset_loader.load_dataset(dataset, columns=[col])[col], on_add=_fit_budget)
+    with _indexes_lock:
+        index = _indexes.setdefault(key, index)
+        _indexes.move_to_end(key)
+        # Older versions of the same file can never be hit again
+        for stale in [k for k in _indexes if k[0] == key[0] and k != key]:
+            del _indexes[stale]
+    return index
+
+
+def _fit_budget(index: CategoryIndex, col):
+    """After `index` grew by `col`: evicts the oldest other indexes, then the index's own older columns."""
+    with _indexes_lock:
+        total = sum(i.nbytes for i in _indexes.values())
+        while total > CACHE_BUDGET_BYTES and _indexes and next(iter(_indexes.values())) is not index:
+            total -= _indexes.popitem(last=False)[1].nbytes
+        others = total - index.nbytes if any(i is index for i in _indexes.values()) else total
+    # A column larger than the whole budget is still kept; its caller is using it
+    index.shrink(max(0, CACHE_BUDGET_BYTES - others), keep=col)
+
+
+def aggregate_dataset(dataset, by: str, metric: str = "count", value: Optional[str] = None, limit: int = 50) -> dict:
+    """/datasets/{id}/aggregate: `metric` of `value` per distinct value of `by` (runs in a compute worker)."""
+    from fastapi import HTTPException
+
+    # Checked against the header; only the two columns are read
+    available = dataset_loader.load_head(dataset, 0).columns
+    for col in (by, value):
+        if col is not None and col not in available:
+            raise HTTPException(status_code=400, detail=f"Column '{col}' not found")
+    if value is None and metric != "count":
+        raise HTTPException(status_code=400, detail=f"metric={metric} needs a value column")
+    values = dataset_loader.load_dataset(dataset, columns=[value])[value] if value is not None else None
+    if values is not None and not pd.api.types.is_numeric_dtype(values):
+        raise HTTPException(status_code=400, detail=f"Column '{value}' is not numeric")
+
+    column = for_dataset(dataset).column(by)
+    result = column.aggregate(metric, values)
+    groups = pd.DataFrame({"group": result.index, metric: result.to_numpy()}).head(limit)
+    groups = groups.astype(object).where(groups.notna(), None)
+    return {
+        "by": by,
+        "metric": metric,
+        "value": value,
+        "group_count": int(len(result)),
+        "groups": groups.to_dict(orient="records")
+    }
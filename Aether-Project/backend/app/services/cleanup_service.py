@@ -1,15 +1,19 @@
-import os
 from sqlalchemy.orm import Session
 from ..models import db_models
 from datetime import datetime
+from . import artifact_store, blob_store, dataset_loader, row_index
 
 def cleanup_expired_files(db: Session):
     now = datetime.utcnow()
     expired_datasets = db.query(db_models.Dataset).filter(db_models.Dataset.expiry_time < now).all()
     
     for dataset in expired_datasets:
-        if os.path.exists(dataset.filepath):
-            os.remove(dataset.filepath)
+        dataset_loader.invalidate(dataset.filepath, dataset.columnar_path)
+        
+        # Blobs are shared by content; keep them while another dataset uses the same bytes
+        if not dataset.content_hash or not blob_store.is_referenced(db, dataset.content_hash, exclude_dataset_id=dataset.id):
+            blob_store.delete_files(dataset.filepath, dataset.columnar_path, row_index.path_for(dataset.filepath))
+            artifact_store.delete_all(db, dataset.content_hash)
         
         # Log deletion
         audit = db_models.AuditLog(
@@ -20,5 +24,6 @@ def cleanup_expired_files(db: Session):
         
         # Remove from DB (or mark as deleted if soft delete preferred)
         db.delete(dataset)
+        db.flush()
     
     db.commit()
@@ -0,0 +1,212 @@
+"""
+Process pool for CPU-heavy analysis.
+
+Full analyses, correlation discovery and profile builds hold the GIL for
+seconds on large datasets. Run on the request threadpool they stalled
+every other request of the server process, /health included. They run
+here in a bounded set of worker processes instead; the request only
+waits on a pipe.
+
+- AETHER_COMPUTE_WORKERS: worker processes (default min(4, CPUs));
+  0 runs tasks in the calling thread.
+- AETHER_COMPUTE_TIMEOUT: seconds a task may take, waiting for a free
+  worker included (default 600).
+
+A task that times out, or whose client disconnects, is stopped by
+terminating its worker, which is replaced on the next task. Workers are
+started with "spawn" and keep their own dataset_loader cache over the
+same memory-mapped columnar copies.
+
+Tasks and their arguments must pickle: pass dataset_ref(dataset), not
+ORM rows or sessions. As with any spawned process, a script that serves
+the app in-process needs the `if __name__ == "__main__":` guard.
+"""
+import asyncio
+import functools
+import multiprocessing
+import os
+import threading
+import time
+import traceback
+from types import SimpleNamespace
+
+from fastapi import HTTPException
+
+from . import metrics
+
+WORKERS = int(os.getenv("AETHER_COMPUTE_WORKERS", str(min(4, os.cpu_count() or 1))))
+TIMEOUT_SECONDS = float(os.getenv("AETHER_COMPUTE_TIMEOUT", "600"))
+# How often a waiting caller checks the deadline, cancellation and its worker
+POLL_SECONDS = 0.1
+# How often an awaiting request checks whether its client is still connected
+DISCONNECT_POLL_SECONDS = 0.5
+
+DATASET_FIELDS = ("id", "filename", "filepath", "columnar_path", "content_hash", "size_bytes", "row_count", "expiry_time")
+
+
+class TaskCancelled(Exception):
+    """The caller stopped waiting for the task."""
+
+
+def dataset_ref(dataset) -> SimpleNamespace:
+    """The picklable part of a Dataset row that the loaders and analyses read."""
+    return SimpleNamespace(**{name: getattr(dataset, name, None) for name in DATASET_FIELDS})
+
+
+def _serve(conn):
+    """
+    Worker process: runs (fn, args, kwargs) tasks until the pipe closes.
+    Replies carry the worker's metrics since the previous one.
+    """
+    while True:
+        try:
+            fn, args, kwargs = conn.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            reply = ("ok", fn(*args, **kwargs))
+        except HTTPException as e:
+            # Not picklable as is; rebuilt by the caller
+            reply = ("http", (e.status_code, e.detail))
+        except Exception as e:
+            traceback.print_exc()
+            reply = ("error", f"{type(e).__name__}: {e}")
+        report = metrics.worker_report()
+        try:
+            conn.send(reply + (report,))
+        except Exception as e:
+            conn.send(("error", f"Result could not be returned: {e}", report))
+
+
+class _Worker:
+    def __init__(self, context):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_serve, args=(child,), daemon=True, name="aether-compute")
+        self.process.start()
+        child.close()
+
+    def stop(self):
+        self.process.terminate()
+        self.process.join(1)
+        self.conn.close()
+        metrics.forget_worker(self.process.pid)
+
+
+class ComputePool:
+    def __init__(self, workers: int, timeout: float):
+        self.workers = workers
+        self.timeout = timeout
+        self._context = multiprocessing.get_context("spawn")
+        self._slots = threading.BoundedSemaphore(max(workers, 1))
+        self._idle = []
+        self._lock = threading.Lock()
+        self.counts = {"completed": 0, "failed": 0, "timed_out": 0, "cancelled": 0}
+
+    def _count(self, outcome: str):
+        with self._lock:
+            self.counts[outcome] += 1
+
+    def _take(self) -> _Worker:
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.process.is_alive():
+                    return worker
+                worker.stop()
+        return _Worker(self._context)
+
+    def _check(self, cancelled, deadline: float, timeout: float):
+        if cancelled is not None and cancelled.is_set():
+            self._count("cancelled")
+            raise TaskCancelled()
+        if time.monotonic() > deadline:
+            self._count("timed_out")
+            raise HTTPException(status_code=504, detail=f"Computation timed out after {timeout:g}s")
+
+    def call(self, fn, *args, timeout: float = None, cancelled: threading.Event = None, **kwargs):
+        """
+        Runs fn(*args, **kwargs) in a worker process and returns its result,
+        blocking the calling thread (which does not hold the GIL meanwhile).
+        Setting `cancelled` stops the task.
+        """
+        if self.workers <= 0:
+            return fn(*args, **kwargs)
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while not self._slots.acquire(timeout=POLL_SECONDS):
+            self._check(cancelled, deadline, timeout)
+
+        worker = None
+        try:
+            worker = self._take()
+            worker.conn.send((fn, args, kwargs))
+            while not worker.conn.poll(POLL_SECONDS):
+                if not worker.process.is_alive():
+                    self._count("failed")
+                    raise RuntimeError("Compute worker exited unexpectedly")
+                self._check(cancelled, deadline, timeout)
+            status, value, report = worker.conn.recv()
+            metrics.merge_worker(report)
+            with self._lock:
+                self._idle.append(worker)
+            worker = None
+        finally:
+            # Still set: the task was interrupted, so its worker is stopped
+            if worker is not None:
+                worker.stop()
+            self._slots.release()
+
+        if status == "ok":
+            self._count("completed")
+            return value
+        self._count("failed")
+        if status == "http":
+            raise HTTPException(status_code=value[0], detail=value[1])
+        raise RuntimeError(value)
+
+    async def run(self, fn, *args, request=None, timeout: float = None, **kwargs):
+        """
+        call() for coroutines: the event loop stays free while the task runs.
+        With `request`, the task is stopped when its client disconnects.
+        """
+        cancelled = threading.Event()
+        task = asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(self.call, fn, *args, timeout=timeout, cancelled=cancelled, **kwargs))
+        try:
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+                if done:
+                    return task.result()
+                if request is not None and await request.is_disconnected():
+                    cancelled.set()
+        except TaskCancelled:
+            # Nobody is left to read the response
+            raise HTTPException(status_code=499, detail="Client closed request")
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"workers": self.workers, "idle": len(self._idle), **self.counts}
+
+    def shutdown(self):
+        with self._lock:
+            workers, self._idle = self._idle, []
+        for worker in workers:
+            worker.stop()
+
+
+_pool = ComputePool(WORKERS, TIMEOUT_SECONDS)
+
+
+def call(fn, *args, **kwargs):
+    return _pool.call(fn, *args, **kwargs)
+
+
+async def run(fn, *args, **kwargs):
+    return await _pool.run(fn, *args, **kwargs)
+
+
+def stats() -> dict:
+    return _pool.stats()
@@ -0,0 +1,81 @@
+"""
+Compact wire format for the correlation heatmap.
+
+The analysis lists the matrix as one {"x", "y", "value"} dict per cell:
+for 300 numeric columns that is 90k dicts repeating two column names each.
+`GET /analysis/{story_id}?heatmap=compact` sends instead
+
+    {"format": "compact", "layout": "upper" | "full", "variables": [...],
+     "values": [...], "scale": 100}
+
+- full: the matrix row by row (values[i * n + j] is row variables[i],
+  column variables[j]);
+- upper: row by row from the diagonal (for i, for j >= i), as the matrix
+  is symmetric;
+- with `decimals`, values are integers and value = values[k] / scale
+  (the analysis rounds to 2 decimals, so decimals=2 loses nothing);
+- a correlation that is not defined (constant column) is null.
+"""
+import numpy as np
+from fastapi import HTTPException
+
+FORMATS = ("cells", "compact")
+LAYOUTS = ("upper", "full")
+MAX_DECIMALS = 6
+
+
+def format_result(result: dict, heatmap: str = "cells", layout: str = "upper", decimals: int = None) -> dict:
+    """The analysis with its heatmap in the requested wire format (the stored result is left as is)."""
+    if heatmap not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"heatmap must be one of {', '.join(FORMATS)}")
+    if layout not in LAYOUTS:
+        raise HTTPException(status_code=400, detail=f"heatmap_layout must be one of {', '.join(LAYOUTS)}")
+    if decimals is not None and not 0 <= decimals <= MAX_DECIMALS:
+        raise HTTPException(status_code=400, detail=f"heatmap_decimals must be between 0 and {MAX_DECIMALS}")
+    if heatmap == "cells" or not result or not result.get("correlations"):
+        return result
+    formatted = dict(result)
+    formatted["correlations"] = compact_correlations(result["correlations"], layout, decimals)
+    return formatted
+
+
+def compact_correlations(correlations: dict, layout: str = "upper", decimals: int = None) -> dict:
+    """The analysis' `correlations` section in the compact format."""
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown heatmap layout '{layout}'")
+    variables = correlations.get("variables", [])
+    n = len(variables)
+    # Cells are listed row by row (y = row, x = column)
+    matrix = np.fromiter((cell["value"] for cell in correlations.get("matrix", [])), dtype=np.float64, count=n * n).reshape(n, n)
+    values = matrix[np.triu_indices(n)] if layout == "upper" else matrix.ravel()
+
+    compact = {"format": "compact", "layout": layout, "variables": variables}
+    missing = np.isnan(values)
+    if decimals is not None:
+        scale = 10 ** decimals
+        compact["scale"] = scale
+        values = np.round(np.where(missing, 0, values) * scale).astype(np.int64)
+    values = values.astype(object)
+    values[missing] = None
+    compact["values"] = values.tolist()
+    return compact
+
+
+def expand_correlations(compact: dict) -> dict:
+    """Back to the per-cell list (what clients of the default format receive)."""
+    variables = compact["variables"]
+    n = len(variables)
+    values = np.array([np.nan if v is None else v for v in compact["values"]], dtype=np.float64)
+    if "scale" in compact:
+        values = values / compact["scale"]
+    matrix = np.empty((n, n))
+    if compact["layout"] == "upper":
+        rows, cols = np.triu_indices(n)
+        matrix[rows, cols] = values
+        matrix[cols, rows] = values
+    else:
+        matrix = values.reshape(n, n)
+    return {
+        "matrix": [{"x": x, "y": y, "value": float(matrix[i, j])} for i, y in enumerate(variables) for j, x in enumerate(variables)],
+        "variables": variables
+    }
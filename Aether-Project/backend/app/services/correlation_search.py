@@ -0,0 +1,209 @@
+"""
+Top-k search over the upper triangle of a correlation matrix.
+
+Correlation discovery and the column profile's strongest pair used to
+build the full DataFrame.corr() matrix and walk it cell by cell. Here the
+matrix is computed in square column blocks with matrix products and only
+the k strongest pairs of each block are kept; no Python loop runs per cell.
+
+Memory is bounded by AETHER_CORR_BLOCK_BYTES, not by rows x columns or
+columns²: a block pair's products are summed over row chunks, and each
+chunk's columns are read, centred and masked from the frame on their own.
+Spearman ranks need whole columns, so they are computed once, a few
+columns at a time, into a temporary memory-mapped file.
+
+Missing values are handled pairwise, as in DataFrame.corr: every pair uses
+the rows where both columns are present. Pearson values agree with pandas
+to floating-point rounding. Spearman ranks each column over its observed
+values; pandas re-ranks each pair's complete rows, so the two differ only
+for columns with missing values.
+"""
+import os
+import tempfile
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+METHODS = ("pearson", "spearman")
+
+# Upper bound on the temporaries of one block pair: a quarter for the
+# width x width sums and results, the rest for the row chunk's values,
+# squares and masks of both blocks
+BLOCK_BYTES = int(os.getenv("AETHER_CORR_BLOCK_BYTES", str(64 * 1024 * 1024)))
+
+
+def _budget(block_bytes: Optional[int]) -> int:
+    return BLOCK_BYTES if block_bytes is None else block_bytes
+
+
+def block_columns(block_bytes: Optional[int] = None) -> int:
+    """Block width whose ~18 width x width float arrays fit a quarter of the budget."""
+    return max(1, int((_budget(block_bytes) / 4 / (18 * 8)) ** 0.5))
+
+
+def chunk_rows(width: int, block_bytes: Optional[int] = None) -> int:
+    """Rows per chunk whose ~8 rows x width float arrays fit the rest of the budget."""
+    return max(1, int(_budget(block_bytes) * 3 / 4 / (8 * 8 * width)))
+
+
+class _Columns:
+    """
+    The searched columns as float64 (ranks for Spearman), read a row chunk
+    and column block at a time. One pass on creation measures each column's
+    mean over its observed values, its centred sum of squares, and whether
+    any value is missing.
+    """
+
+    def __init__(self, df: pd.DataFrame, columns: list, method: str, block_bytes: Optional[int] = None):
+        self.df = df
+        self.rows = len(df)
+        self.positions = np.array([df.columns.get_loc(col) for col in columns])
+        self.ranks = None
+        self._file = None
+        if method == "spearman" and self.rows:
+            self._file = tempfile.TemporaryFile()
+            self.ranks = np.memmap(self._file, dtype=np.float64, mode="w+", shape=(self.rows, len(columns)))
+
+        p = len(columns)
+        self.means, squares = np.zeros(p), np.zeros(p)
+        self.complete = True
+        # Whole columns here; a width whose ~8 copies (ranking takes several) fit the budget
+        width = max(1, int(_budget(block_bytes) / (8 * 8 * max(self.rows, 1))))
+        for start in range(0, p, width):
+            block = slice(start, start + width)
+            frame = df.iloc[:, self.positions[block]]
+            if method == "spearman":
+                frame = frame.rank()
+            values = frame.to_numpy(dtype=np.float64, na_value=np.nan)
+            if self.ranks is not None:
+                self.ranks[:, block] = values
+            present = ~np.isnan(values)
+            self.complete &= bool(present.all())
+            counts = present.sum(axis=0)
+            self.means[block] = np.where(counts > 0, np.nansum(values, axis=0) / np.maximum(counts, 1), 0.0)
+            values -= self.means[block]
+            squares[block] = np.nansum(values * values, axis=0)
+        self.norms = np.sqrt(squares)
+
+    def prepare(self, rows: slice, block: slice) -> tuple:
+        """
+        A chunk's column-centred values with missing entries zeroed. With
+        gaps in the frame, also their squares and the presence mask, which
+        pairwise deletion needs per column pair.
+        """
+        if self.ranks is not None:
+            values = np.array(self.ranks[rows, block])
+        else:
+            # Rows first: iloc[rows, columns] takes the columns over every row before slicing
+            values = self.df.iloc[rows].iloc[:, self.positions[block]].to_numpy(dtype=np.float64, na_value=np.nan)
+        # Correlation is unchanged by a per-column shift; centring keeps the sums small
+        values = values - self.means[block]
+        if self.complete:
+            return values, None, None
+        missing = np.isnan(values)
+        values[missing] = 0.0
+        return values, values * values, (~missing).astype(np.float64)
+
+    def close(self):
+        if self._file is not None:
+            self.ranks = None
+            self._file.close()
+
+
+def _block(source: _Columns, a: slice, b: slice, rows_per_chunk: int) -> np.ndarray:
+    """Correlations between the columns of slices a and b, their products summed over row chunks."""
+    sums = None
+    for start in range(0, max(source.rows, 1), rows_per_chunk):
+        rows = slice(start, start + rows_per_chunk)
+        xa, sqa, ma = source.prepare(rows, a)
+        xb, sqb, mb = (xa, sqa, ma) if a == b else source.prepare(rows, b)
+        if ma is None:
+            products = (xa.T @ xb,)
+        else:
+            products = (xa.T @ xb, ma.T @ mb, xa.T @ mb, ma.T @ xb, sqa.T @ mb, ma.T @ sqb)
+        sums = products if sums is None else tuple(total + part for total, part in zip(sums, products))
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if source.complete:
+            corr = sums[0] / np.outer(source.norms[a], source.norms[b])
+        else:
+            xy, n, sx, sy, sxx, syy = sums
+            var_x = sxx - sx * sx / n
+            var_y = syy - sy * sy / n
+            corr = (xy - sx * sy / n) / np.sqrt(var_x * var_y)
+            corr[(n < 2) | (var_x <= 0) | (var_y <= 0)] = np.nan
+    corr[~np.isfinite(corr)] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+
+def top_correlations(df: pd.DataFrame, columns: Optional[list] = None, k: int = 5, method: str = "pearson",
+                     min_abs: float = 0.0, decimals: Optional[int] = None, nan_first: bool = False,
+                     block: Optional[int] = None) -> List[Tuple[str, str, float]]:
+    """
+    The k column pairs (i < j) with the largest absolute correlation, as
+    (column_i, column_j, r) from strongest to weakest.
+
+    - min_abs: pairs below it are left out.
+    - decimals: strength is compared at this rounding; ties keep the order
+      of the column pairs (as a stable sort of the rounded values would).
+    - nan_first: pairs without a defined correlation rank first instead of
+      being left out (np.argmax over the matrix behaves that way).
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown correlation method '{method}'")
+    if columns is None:
+        # Picked from the dtypes: select_dtypes would copy the whole frame
+        columns = [col for col, dtype in df.dtypes.items()
+                   if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)]
+    p = len(columns)
+    if p < 2 or k < 1:
+        return []
+
+    step = block or block_columns()
+    rows_per_chunk = chunk_rows(step)
+    source = _Columns(df, columns, method)
+    best_key = np.empty(0)
+    best_i = np.empty(0, dtype=np.int64)
+    best_j = np.empty(0, dtype=np.int64)
+    best_r = np.empty(0)
+
+    try:
+        for start_a in range(0, p, step):
+            a = slice(start_a, min(start_a + step, p))
+            for start_b in range(start_a, p, step):
+                b = slice(start_b, min(start_b + step, p))
+                corr = _block(source, a, b, rows_per_chunk)
+                rows, cols = np.indices(corr.shape)
+                rows += start_a
+                cols += start_b
+
+                strength = np.abs(corr)
+                key = np.round(strength, decimals) if decimals is not None else strength
+                undefined = np.isnan(corr)
+                keep = cols > rows
+                if nan_first:
+                    key = np.where(undefined, np.inf, key)
+                else:
+                    keep &= ~undefined
+                if min_abs > 0:
+                    strong = strength >= min_abs
+                    keep &= (strong | undefined) if nan_first else strong
+
+                key, rows, cols, corr = key[keep], rows[keep], cols[keep], corr[keep]
+                if len(key) > k:
+                    # Everything tied with the k-th strongest stays a candidate
+                    kth = np.partition(key, len(key) - k)[len(key) - k]
+                    chosen = key >= kth
+                    key, rows, cols, corr = key[chosen], rows[chosen], cols[chosen], corr[chosen]
+
+                best_key = np.concatenate([best_key, key])
+                best_i = np.concatenate([best_i, rows])
+                best_j = np.concatenate([best_j, cols])
+                best_r = np.concatenate([best_r, corr])
+                order = np.lexsort((best_j, best_i, -best_key))[:k]
+                best_key, best_i, best_j, best_r = best_key[order], best_i[order], best_j[order], best_r[order]
+    finally:
+        source.close()
+
+    return [(columns[i], columns[j], float(r)) for i, j, r in zip(best_i, best_j, best_r)]
@@ -0,0 +1,417 @@
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # Columnar copies are optional; readers fall back to the original file
+    pa = None
+
+from . import dtype_optimizer
+
+# Byte budget for parsed DataFrames kept in memory (per process)
+CACHE_BUDGET_BYTES = int(os.getenv("AETHER_DATASET_CACHE_BYTES", str(512 * 1024 * 1024)))
+
+COLUMNAR_SUFFIX = ".arrow"
+
+# Arrow files are the edited versions of non-CSV datasets (see ingest_service.store_edited_frame)
+SUPPORTED_EXTENSIONS = ('.csv', '.xls', '.xlsx', '.json', '.parquet', COLUMNAR_SUFFIX)
+
+# Rows per chunk when a dataset is streamed instead of loaded whole
+STREAM_CHUNK_ROWS = int(os.getenv("AETHER_STREAM_CHUNK_ROWS", "100000"))
+
+# Rows read up front to decide which CSV columns are numeric before streaming
+_SNIFF_ROWS = 1000
+
+
+def is_supported(filepath: str) -> bool:
+    return filepath.lower().endswith(SUPPORTED_EXTENSIONS)
+
+
+def read_file(filepath: str, nrows: Optional[int] = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Parses a dataset file from disk without touching the cache."""
+    path = filepath.lower()
+    if path.endswith('.csv'):
+        return pd.read_csv(filepath, nrows=nrows, usecols=columns)
+    elif path.endswith('.xlsx'):
+        df = read_xlsx(filepath, nrows=nrows)
+    elif path.endswith('.xls'):
+        return pd.read_excel(filepath, nrows=nrows, usecols=columns)
+    elif path.endswith(COLUMNAR_SUFFIX):
+        return read_columnar(filepath, nrows=nrows, columns=columns)
+    elif path.endswith('.json'):
+        df = pd.read_json(filepath)
+    elif path.endswith('.parquet'):
+        df = pd.read_parquet(filepath, columns=columns)
+    else:
+        raise ValueError("Unsupported file format")
+
+    if columns is not None:
+        df = df[columns]
+    return df.head(nrows) if nrows is not None else df
+
+
+def read_xlsx(filepath: str, nrows: Optional[int] = None) -> pd.DataFrame:
+    """
+    Reads the first sheet of a workbook with openpyxl's read-only streaming
+    reader, taking plain cell values row by row and stopping after `nrows`
+    data rows, so a preview never parses the rest of the sheet.
+
+    Matches pd.read_excel's defaults: the first row is the header (blank or
+    repeated names become "Unnamed: i" / "name.1"), empty cells are NaN,
+    trailing blank rows are dropped and column types are inferred from the
+    values.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(filepath, read_only=True, data_only=True, keep_links=False)
+    try:
+        sheet = workbook.worksheets[0]
+        sheet.reset_dimensions()  # some writers record a wrong sheet size
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, ())
+        data = []
+        last_with_data = -1
+        for row in rows:
+            if nrows is not None and len(data) >= nrows:
+                break
+            row = tuple(None if value == "" else value for value in row)
+            if any(value is not None for value in row):
+                last_with_data = len(data)
+            data.append(row)
+    finally:
+        workbook.close()
+    data = data[:last_with_data + 1]  # trailing blank rows
+
+    width = max([len(header)] + [len(row) for row in data])
+    header = list(header) + [None] * (width - len(header))
+    while width and header[width - 1] is None and all(len(row) < width or row[width - 1] is None for row in data):
+        width -= 1  # trailing empty columns
+    columns, seen = [], {}
+    for i, name in enumerate(header[:width]):
+        name = f"Unnamed: {i}" if name is None or name == "" else name
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        columns.append(name)
+
+    df = pd.DataFrame([tuple(row[:width]) + (None,) * (width - len(row)) for row in data], columns=columns)
+    for i, dtype in enumerate(df.dtypes):
+        if dtype == object:
+            series = df.iloc[:, i]
+            if pd.api.types.infer_dtype(series, skipna=True) in ('integer', 'floating', 'mixed-integer-float'):
+                # Numbers with gaps become float64, as read_excel types them
+                df.isetitem(i, pd.to_numeric(series))
+            else:
+                df.isetitem(i, series.where(series.notna(), np.nan))
+    return df.infer_objects()
+
+
+def write_file(df: pd.DataFrame, filepath: str):
+    """Writes a frame in the format implied by the path (CSV, otherwise Excel)."""
+    if filepath.lower().endswith('.csv'):
+        df.to_csv(filepath, index=False)
+    else:
+        df.to_excel(filepath, index=False)
+
+
+def _to_arrow(df: pd.DataFrame):
+    table = pa.Table.from_pandas(df.reset_index(drop=True), preserve_index=False)
+    # Keep float NaN as NaN instead of Arrow nulls: a column without a validity
+    # bitmap converts back to numpy without a copy
+    for i, dtype in enumerate(df.dtypes):
+        if isinstance(dtype, np.dtype) and dtype.kind == 'f':
+            values = df.iloc[:, i].to_numpy()
+            table = table.set_column(i, table.schema.field(i), pa.array(values, from_pandas=False))
+    return table
+
+
+def write_columnar(df: pd.DataFrame, filepath: str) -> Optional[str]:
+    """
+    Writes a typed Arrow IPC (Feather v2) copy of a frame next to its source
+    file. Returns the path, or None when pyarrow is unavailable or the frame
+    holds values Arrow cannot type (e.g. mixed objects in one column).
+    """
+    columnar_path = filepath + COLUMNAR_SUFFIX
+    return columnar_path if write_arrow(df, columnar_path) else None
+
+
+def write_arrow(df: pd.DataFrame, path: str) -> bool:
+    """
+    Writes a frame as an Arrow IPC file at exactly `path`; False when it
+    cannot (no pyarrow, or values Arrow cannot type).
+
+    The file is uncompressed and holds a single record batch so readers can
+    memory-map it and hand numeric columns to pandas without copying. It is
+    written to a temp file and renamed, so processes that still map the old
+    version keep a valid view.
+    """
+    if pa is None:
+        return False
+    tmp_path = path + ".tmp"
+    try:
+        feather.write_feather(_to_arrow(df), tmp_path, compression="uncompressed", chunksize=max(len(df), 1))
+    except (pa.ArrowException, TypeError, ValueError):
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+    os.replace(tmp_path, path)
+    return True
+
+
+def read_columnar(columnar_path: str, nrows: Optional[int] = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Memory-maps an Arrow IPC copy and converts only the requested columns/rows.
+
+    Numeric columns without nulls come back as read-only numpy views of the
+    mapped file, so every worker process shares one page-cache copy instead
+    of holding its own parsed array.
+    """
+    reader = pa.ipc.open_file(pa.memory_map(columnar_path, 'r'))
+    if nrows is None:
+        table = reader.read_all()
+    else:
+        batches, count = [], 0
+        for i in range(reader.num_record_batches):
+            if count >= nrows:
+                break
+            batch = reader.get_batch(i)
+            batches.append(batch)
+            count += batch.num_rows
+        table = pa.Table.from_batches(batches, schema=reader.schema).slice(0, nrows)
+    if columns is not None:
+        table = table.select(columns)
+    return table.to_pandas(split_blocks=True)
+
+
+def _mapped_bytes(df: pd.DataFrame) -> int:
+    """Bytes of numeric columns that are zero-copy views of a memory-mapped file."""
+    total = 0
+    for col in df.columns:
+        values = df[col].values
+        if isinstance(values, np.ndarray) and values.dtype != object and not values.flags.writeable:
+            total += values.nbytes
+    return total
+
+
+def _source_path(dataset) -> str:
+    """The file readers should use: the columnar copy when it exists, else the upload."""
+    columnar_path = getattr(dataset, "columnar_path", None)
+    if pa is not None and columnar_path and os.path.exists(columnar_path):
+        return columnar_path
+    return dataset.filepath
+
+
+def _read_source(dataset, nrows: Optional[int] = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    path = _source_path(dataset)
+    if path.endswith(COLUMNAR_SUFFIX):
+        return read_columnar(path, nrows=nrows, columns=columns)
+    return read_file(path, nrows=nrows, columns=columns)
+
+
+def iter_chunks(dataset, chunk_rows: int = STREAM_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    Yields a dataset in row chunks of at most `chunk_rows`, never holding the
+    whole frame. The columnar copy is sliced straight from the memory map;
+    CSVs are read incrementally with non-numeric columns pinned to strings so
+    every chunk has the same types. Other formats cannot be read
+    incrementally and are parsed once, then sliced. Bypasses the cache.
+    """
+    path = _source_path(dataset)
+    if path.endswith(COLUMNAR_SUFFIX):
+        reader = pa.ipc.open_file(pa.memory_map(path, 'r'))
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            for start in range(0, max(batch.num_rows, 1), chunk_rows):
+                yield pa.Table.from_batches([batch.slice(start, chunk_rows)]).to_pandas(split_blocks=True)
+    elif path.lower().endswith('.csv'):
+        head = pd.read_csv(path, nrows=_SNIFF_ROWS)
+        text_cols = {col: object for col in head.columns if not pd.api.types.is_numeric_dtype(head[col])}
+        yield from pd.read_csv(path, chunksize=chunk_rows, dtype=text_cols)
+    else:
+        df = read_file(path)
+        for start in range(0, max(len(df), 1), chunk_rows):
+            yield df.iloc[start:start + chunk_rows]
+
+
+def take_rows(dataset, positions: np.ndarray, chunk_rows: int = STREAM_CHUNK_ROWS) -> pd.DataFrame:
+    """
+    The rows at the given sorted positions (past the end are ignored). The
+    columnar copy converts just those rows from the memory map; other files
+    are streamed with iter_chunks, keeping each chunk's share.
+    """
+    positions = np.asarray(positions, dtype=np.int64)
+    path = _source_path(dataset)
+    if path.endswith(COLUMNAR_SUFFIX):
+        table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+        return table.take(positions[positions < table.num_rows]).to_pandas(split_blocks=True)
+    parts, offset = [], 0
+    for chunk in iter_chunks(dataset, chunk_rows):
+        lo, hi = np.searchsorted(positions, [offset, offset + len(chunk)])
+        parts.append(chunk.iloc[positions[lo:hi] - offset])
+        offset += len(chunk)
+        if hi == len(positions):
+            break
+    return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+
+
+class _DatasetCache:
+    """
+    Byte-budgeted LRU of parsed DataFrames.
+
+    Entries are keyed by (source path, mtime, size): datasets that share a
+    content-addressed blob share one frame, and a rewritten file is never
+    served stale. Cached frames are shared between requests and must be
+    treated as read-only; callers that modify data take a .copy() first.
+
+    Only private heap memory counts against the budget: columns backed by a
+    memory-mapped columnar file live in the shared page cache.
+    """
+
+    def __init__(self, budget_bytes: int):
+        self.budget_bytes = budget_bytes
+        self._entries = OrderedDict()  # key -> (df, nbytes, mapped_bytes, expiry_time)
+        self._bytes = 0
+        self._mapped_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            df, _, _, expiry = entry
+            if expiry is not None and expiry < datetime.utcnow():
+                self._evict(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return df
+
+    def peek(self, key):
+        """Returns a cached frame without touching counters or LRU order."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[0] if entry is not None else None
+
+    def put(self, key, df: pd.DataFrame, expiry: Optional[datetime]):
+        mapped = _mapped_bytes(df)
+        nbytes = int(df.memory_usage(deep=True).sum()) - mapped
+        with self._lock:
+            # Older versions of the same file can never be hit again
+            for stale in [k for k in self._entries if k[0] == key[0] and k != key]:
+                self._evict(stale)
+            self._purge_expired()
+            if nbytes > self.budget_bytes or (expiry is not None and expiry < datetime.utcnow()):
+                return
+            if key in self._entries:
+                self._evict(key)
+            self._entries[key] = (df, nbytes, mapped, expiry)
+            self._bytes += nbytes
+            self._mapped_bytes += mapped
+            while self._bytes > self.budget_bytes:
+                self._evict(next(iter(self._entries)))
+
+    def invalidate(self, path: str):
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == path]:
+                self._evict(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._mapped_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "mapped_bytes": self._mapped_bytes,
+                "budget_bytes": self.budget_bytes
+            }
+
+    def _purge_expired(self):
+        now = datetime.utcnow()
+        for key in [k for k, (_, _, _, exp) in self._entries.items() if exp is not None and exp < now]:
+            self._evict(key)
+
+    def _evict(self, key):
+        _, nbytes, mapped, _ = self._entries.pop(key)
+        self._bytes -= nbytes
+        self._mapped_bytes -= mapped
+        self.evictions += 1
+
+
+_cache = _DatasetCache(CACHE_BUDGET_BYTES)
+
+
+def _cache_key(dataset):
+    path = _source_path(dataset)
+    stat = os.stat(path)
+    return (path, stat.st_mtime_ns, stat.st_size)
+
+
+def load_dataset(dataset, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Returns the parsed DataFrame for a Dataset row, served from the in-process
+    cache when the file has not changed since it was last parsed.
+
+    With `columns`, a full frame already in the cache is projected; otherwise
+    only those columns are read from the columnar copy (and not cached).
+    The returned frame is shared: do not modify it in place.
+    """
+    key = _cache_key(dataset)
+    if columns is not None:
+        df = _cache.peek(key)
+        if df is not None:
+            return df[columns]
+        if _source_path(dataset).endswith(COLUMNAR_SUFFIX):
+            return _read_source(dataset, columns=columns)
+
+    df = _cache.get(key)
+    if df is None:
+        df = _read_source(dataset)
+        if not key[0].endswith(COLUMNAR_SUFFIX):
+            # The columnar copy is stored optimized; raw files get the same (deterministic) plan
+            df, _ = dtype_optimizer.optimize(df)
+        _cache.put(key, df, dataset.expiry_time)
+    return df[columns] if columns is not None else df
+
+
+def load_head(dataset, nrows: int) -> pd.DataFrame:
+    """Returns the first rows of a dataset, reusing a cached full parse if one exists."""
+    df = _cache.peek(_cache_key(dataset))
+    if df is not None:
+        return df.head(nrows)
+    return _read_source(dataset, nrows=nrows)
+
+
+def invalidate(*paths):
+    """Drops every cached version of the given files (after edits or deletion)."""
+    for path in paths:
+        if path:
+            _cache.invalidate(path)
+
+
+def cache_stats() -> dict:
+    return _cache.stats()
@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+from typing import Optional, Tuple
+
+# Object columns whose distinct values are at most this share of the rows become 'category'
+CATEGORY_MAX_RATIO = 0.5
+
+_INT_TYPES = [np.int8, np.int16, np.int32]
+
+
+def _memory(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(deep=True).sum())
+
+
+def _decide(series: pd.Series) -> Optional[str]:
+    """Returns the target dtype name for one column, or None to keep it."""
+    dtype = series.dtype
+    values = series.dropna()
+
+    if dtype == object:
+        if len(values) == 0:
+            return None
+        if pd.api.types.infer_dtype(values, skipna=True) == 'string':
+            numeric = pd.to_numeric(series.str.strip(), errors='coerce')
+            if numeric.notna().sum() == len(values):
+                # Numeric-looking strings: coerce, then downcast like any number
+                return _decide(numeric) or str(numeric.dtype)
+        if values.nunique() <= CATEGORY_MAX_RATIO * len(series):
+            return 'category'
+        return None
+
+    if pd.api.types.is_bool_dtype(dtype):
+        return None
+
+    if pd.api.types.is_integer_dtype(dtype) and isinstance(dtype, np.dtype):
+        if len(values) == 0:
+            return None
+        lo, hi = values.min(), values.max()
+        for int_type in _INT_TYPES:
+            info = np.iinfo(int_type)
+            if info.min <= lo and hi <= info.max:
+                return np.dtype(int_type).name if np.dtype(int_type).itemsize < dtype.itemsize else None
+        return None
+
+    if dtype == np.float64:
+        # Only when every value survives the round trip exactly
+        as_float32 = series.to_numpy().astype(np.float32)
+        if np.array_equal(as_float32.astype(np.float64), series.to_numpy(), equal_nan=True):
+            return 'float32'
+        return None
+
+    return None
+
+
+def plan_dtypes(df: pd.DataFrame) -> dict:
+    """Decides per-column storage types. The plan only depends on the data, so it is stable."""
+    columns = {}
+    for col in df.columns:
+        target = _decide(df[col])
+        if target is not None:
+            columns[col] = {"from": str(df[col].dtype), "to": target}
+    return {"columns": columns}
+
+
+def apply_plan(df: pd.DataFrame, plan: dict) -> pd.DataFrame:
+    """
+    Applies recorded decisions. Columns that no longer exist or no longer fit
+    their recorded type (e.g. after a cleaning edit) are left as they are.
+    """
+    converted = {}
+    for col, decision in plan.get("columns", {}).items():
+        if col not in df.columns:
+            continue
+        series = df[col]
+        try:
+            if series.dtype == object and decision["to"] != 'category':
+                series = pd.to_numeric(series.str.strip(), errors='raise')
+            result = series.astype(decision["to"])
+        except (ValueError, TypeError, AttributeError):
+            continue
+        # astype wraps ints and rounds floats silently; keep the column if any value changed
+        if decision["to"] != 'category' and not np.array_equal(
+                result.to_numpy(dtype=np.float64), series.to_numpy(dtype=np.float64), equal_nan=True):
+            continue
+        converted[col] = result
+    if not converted:
+        return df
+    # Shallow copy: untouched columns are shared, converted ones replaced
+    df = df.copy(deep=False)
+    for col, series in converted.items():
+        df[col] = series
+    return df
+
+
+def optimize(df: pd.DataFrame, plan: Optional[dict] = None) -> Tuple[pd.DataFrame, dict]:
+    """
+    Shrinks a freshly loaded frame: low-cardinality strings become categories,
+    numeric-looking strings become numbers and ints/floats are downcast when
+    no value changes. A previously recorded plan is reused as-is so types
+    stay the same across loads.
+
+    Returns the optimized frame and the plan, including the memory saved.
+    """
+    if plan is None:
+        plan = plan_dtypes(df)
+    bytes_before = _memory(df)
+    optimized = apply_plan(df, plan)
+    bytes_after = _memory(optimized)
+    plan = dict(plan, bytes_before=bytes_before, bytes_after=bytes_after, bytes_saved=bytes_before - bytes_after)
+    return optimized, plan
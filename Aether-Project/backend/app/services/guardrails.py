@@ -0,0 +1,159 @@
+"""
+Ethical guardrail results (PII detection, representation bias, fairness
+scores) stored per dataset content version.
+
+They are what perform_analysis reports under pii_warnings, bias_warnings and
+fairness_scores: the checks of analysis_service run on the frame the
+analysis works on (duplicates dropped, gaps imputed). Every check looks at
+one column, so the artifact keeps one entry per column and a cleaning edit
+redoes only the columns it touched (`carry_over`).
+
+Written by the background step after upload (datasets the analysis would
+stream are left to it) and by every exact analysis; read by the upload
+response, the dataset preview and all analysis modes.
+"""
+from typing import Optional
+
+import pandas as pd
+
+from . import artifact_store, instrumentation
+
+KIND = "guardrails"
+
+
+def _needed_columns(df: pd.DataFrame) -> list:
+    """Columns some check reads: text columns (PII, bias) and sensitive names (bias, fairness)."""
+    from .analysis_service import BIAS_KEYWORDS, FAIRNESS_KEYWORDS
+    text = set(df.select_dtypes(include=['object', 'category']).columns)
+    return [col for col in df.columns
+            if col in text or any(k in str(col).lower() for k in BIAS_KEYWORDS + FAIRNESS_KEYWORDS)]
+
+
+def compute(df: pd.DataFrame, categories=None) -> dict:
+    """
+    Runs the checks on an analysis-cleaned frame. Returns the stored form:
+    the frame's columns (in order), its rows and each finding by column.
+    """
+    from .analysis_service import FAIRNESS_KEYWORDS, check_bias, detect_pii, fairness_score
+    from .category_index import CategoryIndex
+    categories = categories or CategoryIndex(df)
+    with instrumentation.stage("pii"):
+        pii = {w["column"]: w["type"] for w in detect_pii(df)}
+    with instrumentation.stage("bias"):
+        bias = {w["column"]: w for w in check_bias(df, categories)}
+    with instrumentation.stage("fairness"):
+        fairness = {col: fairness_score(df, col, categories)
+                    for col in df.columns if any(k in col.lower() for k in FAIRNESS_KEYWORDS)}
+    return {"columns": list(df.columns), "rows": int(len(df)), "pii": pii, "bias": bias, "fairness": fairness}
+
+
+def sections(stored: dict) -> dict:
+    """The stored findings as perform_analysis reports them, in column order."""
+    columns = stored["columns"]
+    return {
+        "pii_warnings": [{"column": col, "type": stored["pii"][col]} for col in columns if col in stored["pii"]],
+        "bias_warnings": [stored["bias"][col] for col in columns if col in stored["bias"]],
+        "fairness_scores": {col: stored["fairness"][col] for col in columns if col in stored["fairness"]}
+    }
+
+
+def cleaned_frame(df: pd.DataFrame, row_hashes=None, columns: Optional[list] = None) -> pd.DataFrame:
+    """
+    `columns` of the frame as analyse_frame cleans it (first occurrences of
+    duplicate rows, then each column imputed). Default: the needed columns.
+    """
+    from . import row_index
+    from .analysis_service import impute_column
+    first = row_index.first_occurrences(row_hashes) if row_hashes is not None else ~df.duplicated().to_numpy()
+    clean = df[first]
+    columns = _needed_columns(df) if columns is None else columns
+    return pd.DataFrame({col: impute_column(clean[col]) for col in columns}, index=clean.index)
+
+
+def build_for_dataset(dataset) -> dict:
+    """Runs in the compute pool: the checks on the whole loaded dataset."""
+    from . import dataset_loader, row_index
+    df = dataset_loader.load_dataset(dataset)
+    stored = compute(cleaned_frame(df, row_index.for_dataset(dataset, df)))
+    stored["columns"] = list(df.columns)
+    return stored
+
+
+def get(db, content_hash: str) -> Optional[dict]:
+    return artifact_store.get(db, content_hash, KIND)
+
+
+def put(db, content_hash: str, stored: dict):
+    """Records a version's findings. The caller commits."""
+    artifact_store.put(db, content_hash, KIND, stored)
+
+
+def from_result(eda_results: dict) -> dict:
+    """The stored form of an exact analysis' guardrail sections."""
+    return {
+        "columns": list(eda_results["columns"]),
+        "rows": int(eda_results["dataset_info"]["rows"]),
+        "pii": {w["column"]: w["type"] for w in eda_results["pii_warnings"]},
+        "bias": {w["column"]: w for w in eda_results["bias_warnings"]},
+        "fairness": dict(eda_results["fairness_scores"])
+    }
+
+
+def _sensitivity(col) -> tuple:
+    from .analysis_service import BIAS_KEYWORDS, FAIRNESS_KEYWORDS
+    name = str(col).lower()
+    return any(k in name for k in BIAS_KEYWORDS), any(k in name for k in FAIRNESS_KEYWORDS)
+
+
+def carry_over(previous: Optional[dict], df: pd.DataFrame, row_hashes, operation: str, params: dict) -> Optional[dict]:
+    """
+    The edited frame's findings from the previous version's: the columns an
+    operation touched are checked again, the others' findings kept. Checks
+    everything again when the edit changed which rows the analysis keeps.
+    None without previous findings (the next analysis records them).
+    """
+    if previous is None or not df.columns.is_unique:
+        return None
+    from . import row_index
+    columns = list(df.columns)
+    if row_hashes is not None:
+        rows = int(row_index.first_occurrences(row_hashes).sum())
+    else:
+        rows = int((~df.duplicated()).sum())
+    if rows != previous["rows"]:
+        stored = compute(cleaned_frame(df, row_hashes))
+        stored["columns"] = columns
+        return stored
+
+    findings = {key: dict(previous[key]) for key in ("pii", "bias", "fairness")}
+    removed, changed = [], []
+    if operation == "rename_column":
+        old, new = params.get("old_name"), params.get("new_name")
+        if old in previous["columns"] and new in columns:
+            if _sensitivity(old) == _sensitivity(new):
+                # Bias and fairness go by the name; an equally sensitive one changes no finding
+                for found in findings.values():
+                    if old in found:
+                        found[new] = found.pop(old)
+                if new in findings["bias"]:
+                    findings["bias"][new] = {**findings["bias"][new], "column": new}
+            else:
+                removed, changed = [old], [new]
+    elif operation == "drop_column":
+        removed = [params.get("column")]
+    elif operation in ("impute", "anonymize"):
+        removed = changed = [params.get("column")]
+    elif operation != "drop_duplicates":
+        # The analysis drops duplicate rows itself, so that edit changes nothing; others are unknown
+        removed, changed = list(previous["columns"]), columns
+
+    for col in removed:
+        for found in findings.values():
+            found.pop(col, None)
+    needed = _needed_columns(df)
+    changed = [col for col in changed if col in needed]
+    if changed:
+        edited = compute(cleaned_frame(df, row_hashes, changed))
+        for key, found in findings.items():
+            found.update(edited[key])
+    return {"columns": columns, "rows": rows, **findings}
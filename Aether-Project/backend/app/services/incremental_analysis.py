@@ -0,0 +1,289 @@
+"""
+Incremental re-analysis after cleaning edits.
+
+A cleaning edit stores the data under a new content hash, so the next
+analysis used to start from scratch although usually one column changed.
+Instead the previous version's stored exact result is carried over to
+the new hash with only that column's entries redone:
+
+- rename_column relabels the result;
+- drop_column removes the column's entries and its correlation row/column;
+- impute and anonymize recompute the column's statistics, guardrail
+  entries and correlation row.
+
+Figures that depend on several columns (the chart, the insights and the
+health scores) are rebuilt from the stored per-column inputs. An edit
+that changes which rows the analysis de-duplicates, or a dataset that
+describe() summarises (date columns, nothing numeric), is left to the
+next full analysis.
+"""
+import numpy as np
+import pandas as pd
+
+from . import analysis_cache, artifact_store, dataset_loader, guardrails, numeric_profiler, row_index
+from .profile_service import PROFILE_KIND
+
+# The options perform_analysis stores loaded-frame results under
+EXACT = {"mode": "exact"}
+
+
+def stored_inputs(summary: dict) -> dict:
+    """summarize_for_insights' output in a JSON-safe form."""
+    def native(value):
+        return value.item() if isinstance(value, np.generic) else value
+
+    return {
+        "row_count": int(summary["row_count"]),
+        "variances": {col: float(v) for col, v in summary["variances"].items()},
+        "categorical": [
+            {
+                "column": cat["column"],
+                "unique_count": int(cat["unique_count"]),
+                "top_value": native(cat["top_value"]),
+                "top_count": int(cat["top_count"])
+            }
+            for cat in summary["categorical"]
+        ],
+        "outliers": {col: int(v) for col, v in summary["outliers"].items()},
+        "latest_date": None if summary["latest_date"] is None else str(summary["latest_date"])
+    }
+
+
+def snapshot(db, dataset):
+    """
+    What carry_over needs from the version about to be edited. Taken before
+    the edit is stored, which may delete the old version's artifacts.
+    """
+    if not dataset.content_hash:
+        return None
+    previous = analysis_cache.peek(db, dataset.content_hash, EXACT)
+    if previous is None or previous[1] is None:
+        return None
+    result, inputs = previous
+    profile = artifact_store.get(db, dataset.content_hash, PROFILE_KIND)
+    return {"hash": dataset.content_hash, "result": result, "inputs": inputs, "profile": profile}
+
+
+def carry_over(db, dataset, previous, operation: str, params: dict) -> bool:
+    """
+    Stores the edited version's exact result derived from the previous
+    one. Returns False when the edit needs a full analysis instead.
+    """
+    if previous is None or not dataset.content_hash or dataset.content_hash == previous["hash"]:
+        return False
+    if analysis_cache.peek(db, dataset.content_hash, EXACT) is not None:
+        # e.g. an edit that restored an earlier version
+        return False
+
+    result, inputs = previous["result"], previous["inputs"]
+    # The edited version's guardrail findings, when apply_cleaning_operation carried them over
+    findings = guardrails.get(db, dataset.content_hash)
+    updated = None
+    if operation == "rename_column":
+        old, new = params.get("old_name"), params.get("new_name")
+        if old in result["columns"] and new not in result["columns"] and isinstance(new, str):
+            if _sensitivity(old) == _sensitivity(new):
+                updated = _relabel(result, inputs, old, new)
+            else:
+                # Bias and fairness checks go by the name; redo the column under it
+                updated = _update_column(dataset, previous, removed=old, changed=new, findings=findings)
+    elif operation == "drop_column":
+        if params.get("column") in result["columns"]:
+            updated = _update_column(dataset, previous, removed=params["column"], changed=None, findings=findings)
+    elif operation in ("impute", "anonymize"):
+        if params.get("column") in result["columns"]:
+            updated = _update_column(dataset, previous, removed=params["column"], changed=params["column"], findings=findings)
+
+    if updated is None:
+        return False
+    analysis_cache.put(db, dataset, EXACT, *updated)
+    return True
+
+
+def _sensitivity(col: str):
+    from .analysis_service import BIAS_KEYWORDS, FAIRNESS_KEYWORDS
+    name = col.lower()
+    return any(k in name for k in BIAS_KEYWORDS), any(k in name for k in FAIRNESS_KEYWORDS)
+
+
+def _rename_keys(mapping: dict, old: str, new: str) -> dict:
+    return {(new if key == old else key): value for key, value in mapping.items()}
+
+
+def _relabel(result: dict, inputs: dict, old: str, new: str):
+    """A rename changes no figure, only where it is filed."""
+    def label(col):
+        return new if col == old else col
+
+    result["columns"] = [label(c) for c in result["columns"]]
+    info = result["dataset_info"]
+    info["missing_values"] = _rename_keys(info["missing_values"], old, new)
+    for section in ("summary_stats", "categorical_analysis", "advanced_stats", "distributions", "fairness_scores"):
+        result[section] = _rename_keys(result[section], old, new)
+
+    correlations = result["correlations"]
+    if correlations:
+        correlations["variables"] = [label(c) for c in correlations["variables"]]
+        for cell in correlations["matrix"]:
+            cell["x"], cell["y"] = label(cell["x"]), label(cell["y"])
+    for warning in result["pii_warnings"] + result["bias_warnings"]:
+        warning["column"] = label(warning["column"])
+
+    visualization = result.get("visualization")
+    if visualization is not None:
+        visualization["x_axis"] = label(visualization["x_axis"])
+        visualization["y_axis"] = label(visualization["y_axis"])
+        visualization["data"] = [_rename_keys(record, old, new) for record in visualization["data"]]
+
+    inputs["variances"] = _rename_keys(inputs["variances"], old, new)
+    inputs["outliers"] = _rename_keys(inputs["outliers"], old, new)
+    for cat in inputs["categorical"]:
+        cat["column"] = label(cat["column"])
+
+    from .insights_service import generate_insights_from_summary
+    result["auto_insights"] = generate_insights_from_summary(inputs, result)
+    return result, inputs
+
+
+def _update_column(dataset, previous: dict, removed: str, changed, findings=None):
+    """
+    Drops the entries of `removed` and recomputes those of `changed` (the
+    edited column's name in the new version, None when it was dropped);
+    every other column's entries are copied. `findings` are the new
+    version's stored guardrail findings, used instead of checking again.
+    """
+    from .analysis_service import chart, check_bias, detect_pii, fairness_score, impute_column, numeric_sections, FAIRNESS_KEYWORDS
+    from .insights_service import calculate_data_health_score, categorical_summary, generate_insights_from_summary
+
+    result, inputs = previous["result"], previous["inputs"]
+    info = result["dataset_info"]
+    df = dataset_loader.load_dataset(dataset)
+    if len(df) != info["initial_rows"] or (changed is not None and changed not in df.columns):
+        return None
+
+    # Unchanged columns must load as before, or their stored figures would not hold
+    before = {c["name"]: c["dtype"] for c in (previous["profile"] or {}).get("columns", [])}
+    if any(before.get(col) != str(df[col].dtype) for col in df.columns if col != changed):
+        return None
+
+    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    if not numeric_cols or df.select_dtypes(include=[np.number, 'datetime']).columns.tolist() != numeric_cols:
+        return None
+    categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
+
+    # Removing or editing one column can only add duplicate rows, so the
+    # same count means the same rows are dropped
+    duplicates = ~row_index.first_occurrences(row_index.for_dataset(dataset, df))
+    if int(duplicates.sum()) != info["duplicates_removed"]:
+        return None
+    clean = df[~duplicates]
+
+    def imputed(col):
+        # Only columns that had gaps were changed by the analysis' imputation
+        if col == changed or col in info["missing_values"]:
+            return impute_column(clean[col])
+        return clean[col]
+
+    # Numeric figures still needed: the edited column and columns moving into the insights' top 3
+    fresh = [col for col in numeric_cols if col == changed or (col not in inputs["outliers"] and col in numeric_cols[:3])]
+    frame = pd.DataFrame({col: imputed(col) for col in fresh}, index=clean.index)
+    profile = numeric_profiler.profile_numeric(frame, fresh)
+
+    columns = df.columns.tolist()
+    missing = dict(info["missing_values"])
+    missing.pop(removed, None)
+    if changed is not None:
+        count = int(clean[changed].isnull().sum())
+        if count > 0:
+            missing[changed] = count
+    info.update({
+        "columns": len(columns),
+        "missing_values": {col: missing[col] for col in columns if col in missing}
+    })
+    result["columns"] = columns
+
+    summary_stats, advanced, distributions = {}, {}, {}
+    for col in numeric_cols:
+        if col == changed:
+            summary_stats[col] = profile.describe(col)
+            advanced[col], distribution = numeric_sections(profile, col)
+        else:
+            summary_stats[col] = result["summary_stats"][col]
+            advanced[col], distribution = result["advanced_stats"][col], result["distributions"].get(col)
+        if distribution is not None:
+            distributions[col] = distribution
+    result.update(summary_stats=summary_stats, advanced_stats=advanced, distributions=distributions)
+
+    categorical = {}
+    for col in categorical_cols:
+        categorical[col] = imputed(col).value_counts().head(5).to_dict() if col == changed else result["categorical_analysis"][col]
+    result["categorical_analysis"] = categorical
+
+    result["correlations"] = _correlations(result["correlations"], numeric_cols, changed, imputed)
+
+    if findings is not None and findings["columns"] == columns:
+        result.update(guardrails.sections(findings))
+    else:
+        # Guardrails: the edited column is checked again, the others' findings kept
+        edited = pd.DataFrame({changed: imputed(changed)}) if changed is not None else pd.DataFrame()
+        pii = {w["column"]: w for w in result["pii_warnings"] if w["column"] != removed}
+        bias = {w["column"]: w for w in result["bias_warnings"] if w["column"] != removed}
+        pii.update({w["column"]: w for w in detect_pii(edited)})
+        bias.update({w["column"]: w for w in check_bias(edited)})
+        result["pii_warnings"] = [pii[col] for col in categorical_cols if col in pii]
+        result["bias_warnings"] = [bias[col] for col in columns if col in bias]
+        scores = dict(result["fairness_scores"])
+        scores.pop(removed, None)
+        if changed is not None and any(k in changed.lower() for k in FAIRNESS_KEYWORDS):
+            scores[changed] = fairness_score(edited, changed)
+        result["fairness_scores"] = {col: scores[col] for col in columns if col in scores}
+
+    result["data_card"].update({
+        "columns": len(columns),
+        "pii_detected": len(result["pii_warnings"]) > 0,
+        "bias_detected": len(result["bias_warnings"]) > 0
+    })
+
+    # The chart only reads its first categorical and numeric columns
+    charted = list(dict.fromkeys(categorical_cols[:1] + numeric_cols[:2]))
+    visualization = chart(pd.DataFrame({col: imputed(col) for col in charted}), categorical_cols, numeric_cols)
+    result.pop("visualization", None)
+    if visualization is not None:
+        result["visualization"] = visualization
+
+    stored_categorical = {cat["column"]: cat for cat in inputs["categorical"]}
+    summary = {
+        "row_count": inputs["row_count"],
+        "variances": {
+            col: float(profile.var[profile.index(col)]) if col == changed else inputs["variances"][col]
+            for col in numeric_cols
+        },
+        "categorical": [
+            categorical_summary(imputed(col)) if col == changed or col not in stored_categorical else stored_categorical[col]
+            for col in categorical_cols[:2]
+        ],
+        "outliers": {
+            col: int(profile.outliers[profile.index(col)]) if col in profile else inputs["outliers"][col]
+            for col in numeric_cols[:3]
+        },
+        "latest_date": None
+    }
+    result["auto_insights"] = generate_insights_from_summary(summary, result)
+    result["health_scores"] = calculate_data_health_score(result)
+    return result, stored_inputs(summary)
+
+
+def _correlations(stored: dict, numeric_cols: list, changed, imputed) -> dict:
+    """The heatmap with the edited column's row and column recomputed."""
+    values = {(cell["y"], cell["x"]): cell["value"] for cell in stored.get("matrix", [])}
+    if changed in numeric_cols:
+        series = imputed(changed)
+        others = pd.DataFrame({col: imputed(col) for col in numeric_cols if col != changed}, index=series.index)
+        row = others.corrwith(series).round(2) if len(others.columns) else pd.Series(dtype=float)
+        row[changed] = round(series.corr(series), 2)
+        for col in numeric_cols:
+            values[(changed, col)] = values[(col, changed)] = float(row[col])
+    return {
+        "matrix": [{"x": col, "y": row, "value": values[(row, col)]} for row in numeric_cols for col in numeric_cols],
+        "variables": numeric_cols
+    }
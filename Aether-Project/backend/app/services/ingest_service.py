@@ -0,0 +1,338 @@
+import hashlib
+import io
+import os
+import threading
+import traceback
+
+import pandas as pd
+from fastapi import UploadFile
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from ..database import SessionLocal
+from ..models import db_models
+from . import artifact_store, blob_store, compute_pool, dataset_loader, dtype_optimizer, guardrails, privacy_scanner, profile_service, row_index
+
+CHUNK_SIZE = 1024 * 1024  # 1 MB
+SCAN_ROWS = 100
+# Whole-dataset PII scan run after upload: "full", "sample" or "off"
+BACKGROUND_PII_SCAN = os.getenv("AETHER_PII_SCAN", "full")
+
+# (content hash, scan kind) of the PII scans running in this process
+_pii_scans = set()
+_pii_scans_lock = threading.Lock()
+
+
+async def stream_upload(upload: UploadFile, destination: str, scan_rows: int = SCAN_ROWS) -> dict:
+    """
+    Copies an upload to disk chunk by chunk without blocking the event loop.
+
+    In the same pass it computes the SHA-256, the byte size and the line
+    count, and keeps the header plus the first `scan_rows` CSV lines so the
+    PII scan runs on bytes already in memory instead of re-reading the file.
+    Non-CSV formats cannot be parsed from a prefix; their "warnings" is None
+    and the caller scans the stored file.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    newlines = 0
+    last_byte = b""
+    is_csv = destination.lower().endswith('.csv')
+    head = bytearray()
+    head_complete = not is_csv
+
+    with open(destination, "wb") as out:
+        while True:
+            chunk = await upload.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            size += len(chunk)
+            newlines += chunk.count(b"\n")
+            last_byte = chunk[-1:]
+            if not head_complete:
+                head.extend(chunk)
+                head_complete = head.count(b"\n") > scan_rows
+            await run_in_threadpool(out.write, chunk)
+
+    row_count = None
+    warnings = None
+    if is_csv:
+        lines = newlines + (1 if size and last_byte != b"\n" else 0)
+        row_count = max(lines - 1, 0)  # minus header; newlines inside quoted fields also count
+        warnings = _scan_csv_head(bytes(head), scan_rows)
+
+    return {
+        "sha256": digest.hexdigest(),
+        "size_bytes": size,
+        "row_count": row_count,
+        "warnings": warnings
+    }
+
+
+async def ingest_upload(upload: UploadFile, db: Session) -> dict:
+    """
+    Streams an upload into content-addressed storage.
+
+    Re-uploading bytes that are already stored writes nothing new and reuses
+    the PII scan recorded for them.
+    """
+    tmp_path = blob_store.incoming_path(upload.filename)
+    try:
+        ingest = await stream_upload(upload, tmp_path)
+    except Exception:
+        blob_store.delete_files(tmp_path)
+        raise
+    filepath, is_new = blob_store.commit(tmp_path, ingest["sha256"], upload.filename)
+
+    warnings = artifact_store.get(db, ingest["sha256"], "pii_scan")
+    if warnings is None:
+        warnings = ingest["warnings"]
+        if warnings is None:
+            warnings = await run_in_threadpool(privacy_scanner.scan_dataset, filepath, SCAN_ROWS)
+        artifact_store.put(db, ingest["sha256"], "pii_scan", warnings)
+
+    # Known bytes: the guardrail findings recorded for them
+    stored = guardrails.get(db, ingest["sha256"])
+    ingest.update(filepath=filepath, is_new=is_new, warnings=warnings,
+                  guardrails=guardrails.sections(stored) if stored is not None else None)
+    return ingest
+
+
+def store_edited_frame(db: Session, dataset, df: pd.DataFrame, row_hashes=None):
+    """
+    Persists an edited frame copy-on-write: the blob may be shared with other
+    datasets, so the edit becomes a new blob and only this Dataset is
+    repointed. The previous blob is removed once nothing references it.
+
+    CSVs stay CSVs. Everything else (workbooks in particular) is stored as
+    the Arrow copy itself instead of rewriting the workbook on every edit.
+    `row_hashes` is the edited frame's row index when the caller kept it
+    up to date; otherwise it is rebuilt.
+    """
+    old_hash = dataset.content_hash
+    old_files = (dataset.filepath, dataset.columnar_path, row_index.path_for(dataset.filepath))
+
+    optimized, plan = dtype_optimizer.optimize(df)
+    filepath = None
+    if not dataset.filepath.lower().endswith('.csv'):
+        arrow_name = dataset.filepath + dataset_loader.COLUMNAR_SUFFIX
+        tmp_path = blob_store.incoming_path(arrow_name)
+        if dataset_loader.write_arrow(optimized, tmp_path):
+            content_hash = blob_store.hash_file(tmp_path)
+            filepath, is_new = blob_store.commit(tmp_path, content_hash, arrow_name)
+            columnar_path = filepath
+            if is_new:
+                artifact_store.put(db, content_hash, "dtype_plan", plan)
+                profile_service.store_profile(db, content_hash, optimized)
+
+    if filepath is None:
+        # CSV, or no pyarrow / values Arrow cannot type: write the original format
+        tmp_path = blob_store.incoming_path(dataset.filepath)
+        dataset_loader.write_file(df, tmp_path)
+        content_hash = blob_store.hash_file(tmp_path)
+        filepath, is_new = blob_store.commit(tmp_path, content_hash, dataset.filepath)
+
+        columnar_path = filepath + dataset_loader.COLUMNAR_SUFFIX
+        if is_new or not os.path.exists(columnar_path):
+            artifact_store.put(db, content_hash, "dtype_plan", plan)
+            profile_service.store_profile(db, content_hash, optimized)
+            columnar_path = dataset_loader.write_columnar(optimized, filepath)
+
+    if row_index.load(filepath, len(df)) is None:
+        row_index.save(filepath, row_hashes if row_hashes is not None else row_index.row_hashes(optimized))
+
+    dataset.filepath = filepath
+    dataset.columnar_path = columnar_path
+    dataset.content_hash = content_hash
+    dataset.size_bytes = os.path.getsize(filepath)
+    dataset.row_count = int(len(df))
+    db.flush()
+
+    # Legacy rows (no hash) may share a name-based path, so only blobs are reclaimed
+    if old_hash and old_hash != content_hash and not blob_store.is_referenced(db, old_hash):
+        blob_store.delete_files(*old_files)
+        dataset_loader.invalidate(*old_files)
+        artifact_store.delete_all(db, old_hash)
+    db.commit()
+
+
+def _scan_csv_head(head: bytes, scan_rows: int) -> list:
+    if not head:
+        return []
+    try:
+        df = pd.read_csv(io.BytesIO(head), nrows=scan_rows)
+    except Exception as e:
+        return [{"error": f"Failed to scan dataset: {str(e)}"}]
+    return privacy_scanner.scan_frame(df)
+
+
+def build_columnar_copy(dataset_id: int):
+    """
+    Background step after upload: parses the file once, optimizes its dtypes,
+    writes the columnar copy and fills in the row count for formats that
+    could not be counted while streaming, and records the column profile.
+    Workbooks are read with the streaming reader, and from then on every
+    read uses the copy.
+    """
+    db = SessionLocal()
+    try:
+        dataset = db.query(db_models.Dataset).filter(db_models.Dataset.id == dataset_id).first()
+        if not dataset or not dataset_loader.is_supported(dataset.filepath):
+            return
+
+        if dataset.filepath.endswith(dataset_loader.COLUMNAR_SUFFIX):
+            # Already columnar (an edited workbook re-uploaded as-is, say)
+            dataset.columnar_path = dataset.filepath
+            db.commit()
+            return
+
+        existing = dataset.filepath + dataset_loader.COLUMNAR_SUFFIX
+        if os.path.exists(existing):
+            # Same bytes were ingested before: reuse their copy and row count
+            dataset.columnar_path = existing
+            if dataset.row_count is None:
+                sibling = db.query(db_models.Dataset).filter(
+                    db_models.Dataset.content_hash == dataset.content_hash,
+                    db_models.Dataset.row_count.isnot(None)
+                ).first()
+                dataset.row_count = sibling.row_count if sibling else None
+            db.commit()
+            return
+
+        try:
+            df = dataset_loader.read_file(dataset.filepath)
+        except Exception:
+            # Unparseable uploads keep working as before, just without a copy
+            return
+        if dataset.row_count is None:
+            dataset.row_count = int(len(df))
+        # Recorded decisions win over fresh ones so the stored types never drift
+        plan = artifact_store.get(db, dataset.content_hash, "dtype_plan")
+        df, plan = dtype_optimizer.optimize(df, plan)
+        artifact_store.put(db, dataset.content_hash, "dtype_plan", plan)
+        # Column catalog for the wizard and AI suggestions, so they never need the data
+        profile_service.store_profile(db, dataset.content_hash, df)
+        # Row fingerprints for duplicate detection
+        row_index.save(dataset.filepath, row_index.row_hashes(df))
+        dataset.columnar_path = dataset_loader.write_columnar(df, dataset.filepath)
+        db.commit()
+    finally:
+        db.close()
+
+
+def pii_scan_running(content_hash: str, mode: str) -> bool:
+    """Whether a scan of this kind is queued or running for the content version."""
+    with _pii_scans_lock:
+        return (content_hash, privacy_scanner.SCAN_MODES[mode]) in _pii_scans
+
+
+def claim_pii_scan(content_hash: str, mode: str) -> bool:
+    """Marks the scan as queued or running; False if it already was."""
+    key = (content_hash, privacy_scanner.SCAN_MODES[mode])
+    with _pii_scans_lock:
+        if key in _pii_scans:
+            return False
+        _pii_scans.add(key)
+        return True
+
+
+def release_pii_scan(content_hash: str, mode: str):
+    with _pii_scans_lock:
+        _pii_scans.discard((content_hash, privacy_scanner.SCAN_MODES[mode]))
+
+
+def queue_pii_scan(background_tasks, dataset, mode: str = None) -> bool:
+    """
+    Adds scan_for_pii to the background tasks, claiming the scan now so
+    GET /pii reports it pending while it waits behind the earlier steps.
+    False if the mode is off or a scan is already queued or running.
+    """
+    mode = mode or BACKGROUND_PII_SCAN
+    if mode not in privacy_scanner.SCAN_MODES or not claim_pii_scan(dataset.content_hash, mode):
+        return False
+    background_tasks.add_task(scan_for_pii, dataset.id, mode, claimed_hash=dataset.content_hash)
+    return True
+
+
+def run_pii_scan(db: Session, dataset, mode: str, **options) -> dict:
+    """
+    Scans the whole dataset for PII in the compute pool, chunk by chunk
+    ("full") or on a sample spread over the file ("sample", with
+    scan_sample's options), and stores the per-column hit counts and rates
+    for its content version. The caller commits.
+    """
+    key = (dataset.content_hash, privacy_scanner.SCAN_MODES[mode])
+    scan = privacy_scanner.scan_full if mode == "full" else privacy_scanner.scan_sample
+    # A scan the caller claimed stays claimed until the caller releases it
+    claimed = claim_pii_scan(dataset.content_hash, mode)
+    try:
+        result = compute_pool.call(scan, compute_pool.dataset_ref(dataset), **options)
+    finally:
+        if claimed:
+            release_pii_scan(dataset.content_hash, mode)
+    artifact_store.put(db, dataset.content_hash, key[1], result)
+    return result
+
+
+def scan_for_pii(dataset_id: int, mode: str = None, claimed_hash: str = None):
+    """
+    Background step after upload: the whole-dataset PII scan of
+    BACKGROUND_PII_SCAN's mode. A scan already stored (or running) for the
+    same bytes is reused. claimed_hash is the content version whose scan
+    queue_pii_scan claimed for this task; it is released once the result is
+    committed, or when there is nothing to scan.
+    """
+    mode = mode or BACKGROUND_PII_SCAN
+    if mode not in privacy_scanner.SCAN_MODES:
+        return
+    db = SessionLocal()
+    claimed = claimed_hash
+    try:
+        dataset = db.query(db_models.Dataset).filter(db_models.Dataset.id == dataset_id).first()
+        if not dataset or not dataset.content_hash or not dataset_loader.is_supported(dataset.filepath):
+            return
+        if claimed is None:
+            if not claim_pii_scan(dataset.content_hash, mode):
+                return
+            claimed = dataset.content_hash
+        if artifact_store.get(db, dataset.content_hash, privacy_scanner.SCAN_MODES[mode]) is not None:
+            return
+        try:
+            run_pii_scan(db, dataset, mode)
+        except Exception:
+            # Unparseable uploads keep their upload-time scan only
+            traceback.print_exc()
+            return
+        db.commit()
+    finally:
+        if claimed is not None:
+            release_pii_scan(claimed, mode)
+        db.close()
+
+
+def build_guardrails(dataset_id: int):
+    """
+    Background step after upload: records the PII, bias and fairness
+    findings the analysis reports, so the preview and every analysis of
+    this content version read them instead of checking again. Datasets
+    large enough to be streamed are left to the analysis.
+    """
+    from .analysis_service import STREAMING_THRESHOLD_BYTES
+    db = SessionLocal()
+    try:
+        dataset = db.query(db_models.Dataset).filter(db_models.Dataset.id == dataset_id).first()
+        if not dataset or not dataset.content_hash or not dataset_loader.is_supported(dataset.filepath):
+            return
+        if (dataset.size_bytes or 0) > STREAMING_THRESHOLD_BYTES or guardrails.get(db, dataset.content_hash) is not None:
+            return
+        try:
+            stored = compute_pool.call(guardrails.build_for_dataset, compute_pool.dataset_ref(dataset))
+        except Exception:
+            traceback.print_exc()
+            return
+        if guardrails.get(db, dataset.content_hash) is None:
+            guardrails.put(db, dataset.content_hash, stored)
+            db.commit()
+    finally:
+        db.close()
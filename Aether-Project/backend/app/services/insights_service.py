@@ -2,8 +2,54 @@ import pandas as pd
 import numpy as np
 from typing import List, Dict
 
-def generate_auto_insights(df: pd.DataFrame, eda_results: dict) -> List[Dict]:
+def generate_auto_insights(df: pd.DataFrame, eda_results: dict, numeric_profile=None) -> List[Dict]:
     """Generate automatic insights from the data"""
+    return generate_insights_from_summary(summarize_for_insights(df, numeric_profile), eda_results)
+
+
+def summarize_for_insights(df: pd.DataFrame, numeric_profile=None, categories=None) -> dict:
+    """Collects the per-column figures the insights need, so they can also come from streamed stats"""
+    from .category_index import CategoryIndex
+    from .numeric_profiler import profile_numeric
+
+    numeric_cols = [col for col in df.select_dtypes(include=[np.number]).columns]
+    if numeric_profile is None:
+        numeric_profile = profile_numeric(df, numeric_cols)
+    categorical_cols = df.select_dtypes(include=['object', 'category']).columns
+    date_cols = df.select_dtypes(include=['datetime64']).columns
+    
+    categories = categories or CategoryIndex(df)
+    categorical = [categorical_summary(df[col], categories.column(col)) for col in categorical_cols[:2]]  # Top 2 categorical columns
+    
+    # IQR outlier counts for the first 3 numeric columns
+    outliers = {col: int(numeric_profile.outliers[numeric_profile.index(col)]) for col in numeric_cols[:3]}
+    
+    return {
+        "row_count": len(df),
+        "variances": {col: float(numeric_profile.var[numeric_profile.index(col)]) for col in numeric_cols},
+        "categorical": categorical,
+        "outliers": outliers,
+        "latest_date": df[date_cols[0]].max() if len(date_cols) > 0 else None
+    }
+
+
+def categorical_summary(series: pd.Series, column=None) -> dict:
+    """`column` is the series' CategoryColumn, if one was built"""
+    if column is None:
+        from .category_index import CategoryColumn
+        column = CategoryColumn(series)
+    unique_count = column.nunique()
+    top_value = column.mode() if unique_count / len(series) < 0.1 else None
+    return {
+        "column": series.name,
+        "unique_count": unique_count,
+        "top_value": top_value,
+        "top_count": column.count_of(top_value) if top_value is not None else 0
+    }
+
+
+def generate_insights_from_summary(summary: dict, eda_results: dict) -> List[Dict]:
+    """Turns the column summary and EDA results into insight cards"""
     insights = []
     
     # Insight 1: Data Volume
@@ -52,10 +98,9 @@ def generate_auto_insights(df: pd.DataFrame, eda_results: dict) -> List[Dict]:
         })
     
     # Insight 4: Numeric Column Insights
-    numeric_cols = [col for col in df.select_dtypes(include=[np.number]).columns]
-    if numeric_cols:
+    variances = summary["variances"]
+    if variances:
         # Find column with highest variance
-        variances = {col: df[col].var() for col in numeric_cols}
         high_var_col = max(variances, key=variances.get)
         
         insights.append({
@@ -67,16 +112,15 @@ def generate_auto_insights(df: pd.DataFrame, eda_results: dict) -> List[Dict]:
         })
     
     # Insight 5: Categorical Analysis
-    categorical_cols = df.select_dtypes(include=['object', 'category']).columns
-    if len(categorical_cols) > 0:
-        for col in categorical_cols[:2]:  # Top 2 categorical columns
-            unique_count = df[col].nunique()
-            total_count = len(df)
-            cardinality_ratio = unique_count / total_count
+    total_count = summary["row_count"]
+    if summary["categorical"]:
+        for cat in summary["categorical"]:
+            col = cat["column"]
+            cardinality_ratio = cat["unique_count"] / total_count
             
             if cardinality_ratio < 0.1:
-                top_value = df[col].mode()[0]
-                top_freq = (df[col] == top_value).sum()
+                top_value = cat["top_value"]
+                top_freq = cat["top_count"]
                 top_pct = (top_freq / total_count) * 100
                 
                 insights.append({
@@ -88,15 +132,10 @@ def generate_auto_insights(df: pd.DataFrame, eda_results: dict) -> List[Dict]:
                 })
     
     # Insight 6: Potential Outliers (for numeric columns)
-    if numeric_cols:
-        for col in numeric_cols[:3]:  # Check first 3 numeric columns
-            Q1 = df[col].quantile(0.25)
-            Q3 = df[col].quantile(0.75)
-            IQR = Q3 - Q1
-            outliers = ((df[col] < (Q1 - 1.5 * IQR)) | (df[col] > (Q3 + 1.5 * IQR))).sum()
-            
+    if summary["outliers"]:
+        for col, outliers in summary["outliers"].items():
             if outliers > 0:
-                outlier_pct = (outliers / len(df)) * 100
+                outlier_pct = (outliers / total_count) * 100
                 if outlier_pct > 1:
                     insights.append({
                         "type": "outlier",
@@ -107,10 +146,8 @@ def generate_auto_insights(df: pd.DataFrame, eda_results: dict) -> List[Dict]:
                     })
     
     # Insight 7: Data Freshness (if timestamp columns exist)
-    date_cols = df.select_dtypes(include=['datetime64']).columns
-    if len(date_cols) > 0:
-        col = date_cols[0]
-        latest_date = df[col].max()
+    latest_date = summary["latest_date"]
+    if latest_date is not None:
         insights.append({
             "type": "temporal",
             "icon": "📅",
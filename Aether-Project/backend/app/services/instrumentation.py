@@ -0,0 +1,227 @@
+"""
+Per-stage wall time, CPU time and peak memory.
+
+An operation (an analysis, a cleaning edit, a PII scan, an AI helper)
+runs inside `operation(name)`; the steps it goes through are marked with
+`stage(name)`. Outside an operation `stage` does nothing, so instrumented
+code costs two clock reads per stage at most. Functions decorated with
+`timed` are a stage of the running operation, or an operation of their own
+when called on their own.
+
+Every finished operation is added to in-memory totals per operation and
+stage (`stats()`, served at GET /analysis/timings). Routes taking
+`timings=true` also return the operation's stages as a `_timings` section.
+
+Work sent to the compute pool is wrapped in `run_traced`, which records
+the worker's stages and returns them with the result. CPU time is the
+process' (time.process_time), which is exact in the single-task workers.
+Peak memory is measured with tracemalloc, which runs only while some
+caller asked for the timings (it slows allocation down): it is the most a
+stage allocated on top of what was allocated when it started. Concurrent
+operations in one process share tracemalloc's peak, so theirs overlap.
+"""
+import functools
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+_current: ContextVar[Optional["Trace"]] = ContextVar("aether_trace", default=None)
+
+_totals = {}  # (operation, stage) -> running totals
+_totals_lock = threading.Lock()
+
+_tracing_users = 0  # operations measuring memory; tracemalloc runs while there are any
+_tracing_lock = threading.Lock()
+
+
+class Trace:
+    """Stages recorded for one operation."""
+
+    def __init__(self, name: str, memory: bool = False):
+        self.name = name
+        self.memory = memory
+        self.stages = []
+        self._open = []  # [start traced bytes, peak so far] of the stages being timed
+
+    def add(self, stages: list):
+        """Stages recorded elsewhere (a compute worker)."""
+        self.stages.extend(stages)
+
+    def report(self) -> dict:
+        return {"operation": self.name, "stages": self.stages}
+
+    def _peak_enter(self):
+        if not tracemalloc.is_tracing():
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        if self._open:
+            # The enclosing stage keeps the peak reached before this one resets it
+            self._open[-1][1] = max(self._open[-1][1], peak)
+        tracemalloc.reset_peak()
+        self._open.append([current, current])
+
+    def _peak_exit(self) -> Optional[float]:
+        if not tracemalloc.is_tracing() or not self._open:
+            return None
+        start, peak = self._open.pop()
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        if self._open:
+            self._open[-1][1] = max(self._open[-1][1], peak)
+        return round((peak - start) / (1024 * 1024), 2)
+
+
+@contextmanager
+def stage(name: str):
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    if trace.memory:
+        trace._peak_enter()
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield
+    finally:
+        entry = {
+            "stage": name,
+            "wall_s": round(time.perf_counter() - wall, 4),
+            "cpu_s": round(time.process_time() - cpu, 4)
+        }
+        if trace.memory:
+            entry["peak_mb"] = trace._peak_exit()
+        trace.stages.append(entry)
+
+
+def _start_tracing():
+    global _tracing_users
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _tracing_users += 1
+
+
+def _stop_tracing():
+    global _tracing_users
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0:
+            tracemalloc.stop()
+
+
+@contextmanager
+def operation(name: str, memory: bool = False):
+    """
+    Records the stages run inside it and adds them to the totals. Yields the
+    Trace. Run inside another operation (an analysis an AI route needs), its
+    stages also show in the caller's, as `<name>.<stage>`.
+    """
+    parent = _current.get()
+    if parent is not None:
+        memory = memory or parent.memory
+    trace = Trace(name, memory)
+    token = _current.set(trace)
+    if memory:
+        _start_tracing()
+    try:
+        with stage("total"):
+            yield trace
+    finally:
+        if memory:
+            _stop_tracing()
+        _current.reset(token)
+        _aggregate(trace)
+        if parent is not None:
+            parent.add([{**entry, "stage": f"{name}.{entry['stage']}"} for entry in trace.stages])
+
+
+def timed(fn):
+    """Runs `fn` as a stage named after it, or as its own operation outside one."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if _current.get() is None:
+            with operation(fn.__name__):
+                return fn(*args, **kwargs)
+        with stage(fn.__name__):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def memory_requested() -> bool:
+    trace = _current.get()
+    return trace is not None and trace.memory
+
+
+def run_traced(memory: bool, fn, *args, **kwargs):
+    """
+    Compute pool task: runs fn(*args, **kwargs) under a trace of its own and
+    returns (result, stages). Exceptions propagate as from fn.
+    """
+    trace = Trace(fn.__name__, memory)
+    token = _current.set(trace)
+    if memory:
+        _start_tracing()
+    try:
+        return fn(*args, **kwargs), trace.stages
+    finally:
+        if memory:
+            _stop_tracing()
+        _current.reset(token)
+
+
+def traced_task(fn, *args) -> tuple:
+    """A (function, args...) compute pool task that reports its stages to the current trace (see collect)."""
+    return (run_traced, memory_requested(), fn) + args
+
+
+def collect(output):
+    """The result of a traced_task, after adding its stages to the current trace."""
+    result, stages = output
+    trace = _current.get()
+    if trace is not None:
+        trace.add(stages)
+    return result
+
+
+def attach(result: dict, trace: Trace, requested: bool) -> dict:
+    """`result` with a `_timings` section when the caller asked for it."""
+    if not requested or not isinstance(result, dict):
+        return result
+    return {**result, "_timings": trace.report()}
+
+
+def _aggregate(trace: Trace):
+    with _totals_lock:
+        for entry in trace.stages:
+            totals = _totals.setdefault((trace.name, entry["stage"]), {
+                "count": 0, "wall_s_total": 0.0, "wall_s_max": 0.0, "cpu_s_total": 0.0, "peak_mb_max": None
+            })
+            totals["count"] += 1
+            totals["wall_s_total"] += entry["wall_s"]
+            totals["wall_s_max"] = max(totals["wall_s_max"], entry["wall_s"])
+            totals["cpu_s_total"] += entry["cpu_s"]
+            if entry.get("peak_mb") is not None:
+                totals["peak_mb_max"] = max(totals["peak_mb_max"] or 0.0, entry["peak_mb"])
+
+
+def stats() -> dict:
+    """Totals per operation and stage since the process started."""
+    with _totals_lock:
+        report = {}
+        for (name, stage_name), totals in _totals.items():
+            report.setdefault(name, {})[stage_name] = {
+                "count": totals["count"],
+                "wall_s_total": round(totals["wall_s_total"], 4),
+                "wall_s_mean": round(totals["wall_s_total"] / totals["count"], 4),
+                "wall_s_max": round(totals["wall_s_max"], 4),
+                "cpu_s_total": round(totals["cpu_s_total"], 4),
+                "peak_mb_max": totals["peak_mb_max"]
+            }
+        return report
+
+
+def reset():
+    with _totals_lock:
+        _totals.clear()
@@ -0,0 +1,210 @@
+"""
+Asynchronous analysis jobs.
+
+POST /analysis/{story_id}/jobs records a job in the `analysis_jobs` table
+and returns at once; GET /analysis/jobs/{id} reports its status and
+progress, and the result once it succeeded. Jobs run in the compute pool:
+a dispatcher thread of the API process claims the job, and the worker
+process writes its stage and progress to the job row as it goes. The
+result is stored like any other analysis (analysis_cache), so the
+regular /analysis endpoint serves it as well.
+
+A job is identified by the story, the dataset version and the analysis
+options, so duplicate submissions share one job. Stories on the same
+data get jobs of their own but share the stored result: a job whose
+result another one already stored finishes without computing it again.
+A failed job releases its key and can be resubmitted.
+"""
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..models import db_models
+from . import analysis_cache, compute_pool
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+# Progress writes from a running job are at most this frequent
+PROGRESS_INTERVAL_SECONDS = 0.5
+
+# One dispatcher thread per compute worker; each only waits on its task
+_dispatcher = ThreadPoolExecutor(max_workers=max(1, compute_pool.WORKERS), thread_name_prefix="aether-jobs")
+
+
+def _dedup_key(story_id: int, content_hash: str, options: dict) -> str:
+    return f"{story_id}:{content_hash}:{json.dumps(options, sort_keys=True)}"
+
+
+def submit_job(db: Session, story_id: int, mode: str = "auto", sample: int = None, stratify: str = None) -> dict:
+    """Queues an analysis, or returns the story's job already covering this dataset version and options."""
+    from .analysis_service import resolve_analysis
+    dataset, _, options, _ = resolve_analysis(story_id, db, mode, sample, stratify)
+    if not dataset.content_hash:
+        raise HTTPException(status_code=400, detail="Dataset has no content version; re-upload it to run analysis jobs")
+    key = _dedup_key(story_id, dataset.content_hash, options)
+
+    job = db.query(db_models.AnalysisJob).filter(db_models.AnalysisJob.dedup_key == key).first()
+    if job is not None:
+        if job.status != SUCCEEDED or analysis_cache.peek(db, job.content_hash, options) is not None:
+            return job_status(db, job)
+        # The result was deleted with its blob; start over
+        job.dedup_key = None
+
+    job = db_models.AnalysisJob(
+        dedup_key=key,
+        story_id=story_id,
+        dataset_id=dataset.id,
+        content_hash=dataset.content_hash,
+        options=json.dumps(options, sort_keys=True),
+        status=QUEUED,
+        progress=0.0
+    )
+    if analysis_cache.peek(db, dataset.content_hash, options) is not None:
+        # Already computed by a synchronous request
+        job.status, job.progress = SUCCEEDED, 1.0
+        job.started_at = job.finished_at = datetime.utcnow()
+    db.add(job)
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent submission created the job first
+        db.rollback()
+        job = db.query(db_models.AnalysisJob).filter(db_models.AnalysisJob.dedup_key == key).first()
+        return job_status(db, job)
+
+    if job.status == QUEUED:
+        _dispatcher.submit(_dispatch, job.id)
+    return job_status(db, job)
+
+
+def get_job(db: Session, job_id: int) -> dict:
+    job = db.query(db_models.AnalysisJob).filter(db_models.AnalysisJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    _expire_if_stale(db, job)
+    return job_status(db, job, with_result=True)
+
+
+def job_status(db: Session, job, with_result: bool = False) -> dict:
+    status = {
+        "job_id": job.id,
+        "story_id": job.story_id,
+        "dataset_id": job.dataset_id,
+        "status": job.status,
+        "stage": job.stage,
+        "progress": job.progress,
+        "options": json.loads(job.options),
+        "error": job.error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at
+    }
+    if with_result and job.status == SUCCEEDED:
+        stored = analysis_cache.peek(db, job.content_hash, status["options"])
+        if stored is None:
+            status["error"] = "The result is no longer stored (its dataset version was deleted)"
+            status["result"] = None
+        else:
+            result = stored[0]
+            dataset = db.query(db_models.Dataset).filter(db_models.Dataset.id == job.dataset_id).first()
+            if dataset is not None and "data_card" in result:
+                result["data_card"]["source"] = dataset.filename
+            status["result"] = result
+    return status
+
+
+def resume_jobs():
+    """Dispatches queued jobs and fails jobs a stopped server left running (run at startup)."""
+    from ..database import SessionLocal
+    db = SessionLocal()
+    try:
+        for job in db.query(db_models.AnalysisJob).filter(db_models.AnalysisJob.status == RUNNING).all():
+            _expire_if_stale(db, job)
+        for (job_id,) in db.query(db_models.AnalysisJob.id).filter(db_models.AnalysisJob.status == QUEUED).all():
+            _dispatcher.submit(_dispatch, job_id)
+    finally:
+        db.close()
+
+
+def _expire_if_stale(db: Session, job):
+    # A running job outlives the compute timeout only if its server stopped
+    if job.status == RUNNING and job.started_at is not None:
+        if datetime.utcnow() - job.started_at > timedelta(seconds=compute_pool.TIMEOUT_SECONDS + 60):
+            _finish(db, job, FAILED, "Interrupted; submit the job again")
+
+
+def _finish(db: Session, job, status: str, error: str = None):
+    job.status = status
+    job.error = error
+    job.finished_at = datetime.utcnow()
+    if status == FAILED:
+        # Frees the key so the analysis can be resubmitted
+        job.dedup_key = None
+    else:
+        job.progress, job.stage = 1.0, None
+    db.commit()
+
+
+def _dispatch(job_id: int):
+    """Dispatcher thread: claims a queued job and waits for the compute pool to run it."""
+    from ..database import SessionLocal
+    db = SessionLocal()
+    try:
+        # Claiming is atomic, so a job is run once even if several servers resume it
+        claimed = db.query(db_models.AnalysisJob).filter(
+            db_models.AnalysisJob.id == job_id,
+            db_models.AnalysisJob.status == QUEUED
+        ).update({"status": RUNNING, "stage": "starting", "started_at": datetime.utcnow()}, synchronize_session=False)
+        db.commit()
+        if not claimed:
+            return
+        try:
+            compute_pool.call(run_job, job_id)
+        except Exception as e:
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            db.expire_all()
+            job = db.query(db_models.AnalysisJob).filter(db_models.AnalysisJob.id == job_id).first()
+            if job is not None and job.status == RUNNING:
+                _finish(db, job, FAILED, str(detail))
+    except Exception:
+        import traceback
+        traceback.print_exc()
+    finally:
+        db.close()
+
+
+def run_job(job_id: int):
+    """Runs in a compute worker: analyses the job's dataset version, reporting progress on the job row."""
+    from ..database import SessionLocal
+    from . import guardrails
+    from .analysis_service import compute_analysis
+    db = SessionLocal()
+    try:
+        job = db.query(db_models.AnalysisJob).filter(db_models.AnalysisJob.id == job_id).first()
+        dataset = db.query(db_models.Dataset).filter(db_models.Dataset.id == job.dataset_id).first()
+        if dataset is None or dataset.content_hash != job.content_hash:
+            raise HTTPException(status_code=409, detail="The dataset was edited or deleted after the job was submitted")
+
+        last_write = [0.0]
+        def progress(stage: str, fraction: float):
+            now = time.monotonic()
+            if stage != job.stage or now - last_write[0] >= PROGRESS_INTERVAL_SECONDS:
+                job.stage, job.progress = stage, round(fraction, 3)
+                db.commit()
+                last_write[0] = now
+
+        options = json.loads(job.options)
+        if analysis_cache.peek(db, job.content_hash, options) is not None:
+            # Stored meanwhile by another story's job on the same version
+            _finish(db, job, SUCCEEDED)
+            return
+        eda_results, inputs = compute_analysis(dataset, options, progress, guardrails.get(db, dataset.content_hash))
+        progress("storing", 0.95)
+        analysis_cache.put(db, dataset, options, eda_results, inputs)
+        _finish(db, job, SUCCEEDED)
+    finally:
+        db.close()
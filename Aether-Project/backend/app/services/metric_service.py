@@ -32,11 +32,14 @@ def suggest_metrics(objective: str) -> List[Dict[str, str]]:
         
     return metrics
 
-def calculate_fairness_score(df, sensitive_col: str, target_col: str = None) -> float:
+def calculate_fairness_score(df, sensitive_col: str, target_col: str = None, categories=None) -> float:
     """
     Calculates a simple fairness score (Disparate Impact Ratio).
     If target_col is None, it checks for representation balance.
+    `categories` is the frame's CategoryIndex, if one was built.
     """
+    from .category_index import CategoryIndex
+    categories = categories or CategoryIndex(df)
     if sensitive_col not in df.columns:
         return 1.0 # Perfect score if col doesn't exist
         
@@ -44,7 +47,7 @@ def calculate_fairness_score(df, sensitive_col: str, target_col: str = None) ->
         # Disparate Impact: P(Outcome=1 | Group A) / P(Outcome=1 | Group B)
         # Simplified for this demo: Max deviation from global mean
         global_rate = df[target_col].mean()
-        groups = df.groupby(sensitive_col)[target_col].mean()
+        groups = categories.column(sensitive_col).aggregate("mean", df[target_col])
         if groups.empty:
             return 1.0
         
@@ -55,15 +58,21 @@ def calculate_fairness_score(df, sensitive_col: str, target_col: str = None) ->
         return max(0.0, 1.0 - max_dev)
         
     else:
-        # Representation Balance
-        counts = df[sensitive_col].value_counts(normalize=True)
-        if counts.empty:
-            return 1.0
-        
-        # Ideal is 1/N
-        n_groups = len(counts)
-        ideal = 1.0 / n_groups
-        
-        # Max deviation from ideal
-        max_dev = (counts - ideal).abs().max()
-        return max(0.0, 1.0 - max_dev)
+        return representation_score(categories.column(sensitive_col).value_counts())
+
+
+def representation_score(counts) -> float:
+    """Representation balance from per-group counts (a Series of value -> count)."""
+    # Categorical columns also list unused categories
+    counts = counts[counts > 0]
+    if counts.empty:
+        return 1.0
+    shares = counts / counts.sum()
+    
+    # Ideal is 1/N
+    n_groups = len(shares)
+    ideal = 1.0 / n_groups
+    
+    # Max deviation from ideal
+    max_dev = (shares - ideal).abs().max()
+    return max(0.0, 1.0 - max_dev)
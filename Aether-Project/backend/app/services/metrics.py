@@ -0,0 +1,231 @@
+"""
+Prometheus metrics, served at GET /metrics (text exposition format 0.0.4).
+
+- aether_http_requests_total{method,mount,route,status} and
+  aether_http_request_duration_seconds{method,mount,route}: every request,
+  by route template (unmatched paths all count as route="<unmatched>")
+  and by mount: the routers are served under /api and at the root
+  (mount="api|root"), with the same templates.
+- aether_pii_rows_scanned_total{scanner} and aether_analysis_rows_total:
+  rows read by the PII scanners (upload scan, analysis check) and rows fed
+  into analyses.
+- Gauges, read when scraped: dataset cache bytes and hit ratio, stored
+  analysis hit ratio, compute pool tasks and resident memory, for the
+  server process and the compute workers (process="server|workers").
+
+Compute workers count into their own copy of this module; every task
+reply carries the increments since the last one plus the worker's cache
+figures and memory (see compute_pool), which the server adds up. So
+figures lag a worker by at most one task, and no extra IPC is made.
+
+Recording costs a clock read and a dict update under a lock per request,
+so the endpoint is meant to stay on. Histograms are kept per route and
+method only (not per status) to keep the series count small.
+"""
+import bisect
+import os
+import threading
+import time
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+PII_ROWS_SCANNED = "aether_pii_rows_scanned_total"
+ANALYSIS_ROWS = "aether_analysis_rows_total"
+
+_HELP = {
+    PII_ROWS_SCANNED: "Rows read by the PII scanners",
+    ANALYSIS_ROWS: "Rows fed into analyses (before de-duplication)",
+}
+
+_lock = threading.Lock()
+_counters = {}  # (name, labels) -> value, labels a sorted tuple of pairs
+_pending = {}  # counts not reported yet (only compute workers report theirs)
+_requests = {}  # (method, mount, route, status) -> count
+_latency = {}  # (method, mount, route) -> [per-bucket counts (+Inf last), sum, count]
+_workers = {}  # pid -> last report of a compute worker
+
+
+def inc(name: str, value: float = 1, **labels):
+    """Adds to a counter (declared in _HELP)."""
+    if not value:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+        _pending[key] = _pending.get(key, 0) + value
+
+
+def observe_request(method: str, mount: str, route: str, status: int, seconds: float):
+    with _lock:
+        key = (method, mount, route, status)
+        _requests[key] = _requests.get(key, 0) + 1
+        histogram = _latency.get(key[:3])
+        if histogram is None:
+            histogram = _latency[key[:3]] = [[0] * (len(LATENCY_BUCKETS) + 1), 0.0, 0]
+        histogram[0][bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        histogram[1] += seconds
+        histogram[2] += 1
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing every HTTP request until its response is sent."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        start = time.perf_counter()
+        state = {"status": 500, "done": False}
+
+        def record():
+            if not state["done"]:
+                state["done"] = True
+                path = scope["path"]
+                mount = "api" if path == "/api" or path.startswith("/api/") else "root"
+                route = getattr(scope.get("route"), "path", "<unmatched>")
+                # Older FastAPI versions copy routes with the prefix in their path
+                if mount == "api" and route.startswith("/api"):
+                    route = route[len("/api"):] or "/"
+                observe_request(scope["method"], mount, route, state["status"], time.perf_counter() - start)
+
+        async def send_timed(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+            await send(message)
+            # Background tasks run after the last body message; they are not the request's latency
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                record()
+
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            record()
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def _local_figures() -> dict:
+    from . import dataset_loader
+    cache = dataset_loader.cache_stats()
+    return {
+        "rss_bytes": _rss_bytes(),
+        "dataset_cache": {key: cache[key] for key in ("hits", "misses", "bytes", "mapped_bytes", "entries")}
+    }
+
+
+def worker_report() -> dict:
+    """Compute worker: the counts since the last report, and its cache figures and memory."""
+    global _pending
+    with _lock:
+        pending, _pending = _pending, {}
+    return {"pid": os.getpid(), "counters": pending, **_local_figures()}
+
+
+def merge_worker(report: dict):
+    """Server: adds a compute worker's report."""
+    with _lock:
+        for key, value in report["counters"].items():
+            _counters[key] = _counters.get(key, 0) + value
+        _workers[report["pid"]] = report
+
+
+def forget_worker(pid: int):
+    """A worker was stopped; its gauges no longer count."""
+    with _lock:
+        _workers.pop(pid, None)
+
+
+def _labels(pairs) -> str:
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _number(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _ratio(hits: int, misses: int) -> float:
+    return hits / (hits + misses) if hits + misses else 0.0
+
+
+def render() -> str:
+    """All metrics in the Prometheus text format."""
+    from . import analysis_cache, compute_pool
+    server = _local_figures()
+    with _lock:
+        counters = dict(_counters)
+        requests = dict(_requests)
+        latency = {key: (list(buckets), total, count) for key, (buckets, total, count) in _latency.items()}
+        workers = list(_workers.values())
+
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for suffix, labels, value in samples:
+            lines.append(f"{name}{suffix}{_labels(labels)} {_number(value)}")
+
+    metric("aether_http_requests_total", "counter", "HTTP requests by route template and status",
+           [("", (("method", m), ("mount", u), ("route", r), ("status", s)), n) for (m, u, r, s), n in sorted(requests.items())])
+    samples = []
+    for (method, mount, route), (buckets, total, count) in sorted(latency.items()):
+        labels = (("method", method), ("mount", mount), ("route", route))
+        cumulative = 0
+        for bound, n in zip(LATENCY_BUCKETS + ("+Inf",), buckets):
+            cumulative += n
+            samples.append(("_bucket", labels + (("le", bound if bound == "+Inf" else repr(bound)),), cumulative))
+        samples.append(("_sum", labels, total))
+        samples.append(("_count", labels, count))
+    metric("aether_http_request_duration_seconds", "histogram", "HTTP request latency, until the response is sent",
+           samples)
+
+    for name, help_text in _HELP.items():
+        metric(name, "counter", help_text,
+               [("", labels, value) for (key, labels), value in sorted(counters.items()) if key == name] or [("", (), 0)])
+
+    figures = {"server": server}
+    if workers:
+        figures["workers"] = {
+            "rss_bytes": sum(w["rss_bytes"] for w in workers),
+            "dataset_cache": {key: sum(w["dataset_cache"][key] for w in workers) for key in server["dataset_cache"]}
+        }
+
+    def by_process(field):
+        return [("", (("process", process),), field(f)) for process, f in figures.items()]
+
+    metric("aether_dataset_cache_bytes", "gauge", "Bytes of loaded datasets held in memory (not memory-mapped)",
+           by_process(lambda f: f["dataset_cache"]["bytes"]))
+    metric("aether_dataset_cache_mapped_bytes", "gauge", "Bytes of loaded datasets memory-mapped from columnar copies",
+           by_process(lambda f: f["dataset_cache"]["mapped_bytes"]))
+    metric("aether_dataset_cache_entries", "gauge", "Datasets held by the dataset cache",
+           by_process(lambda f: f["dataset_cache"]["entries"]))
+    metric("aether_dataset_cache_hit_ratio", "gauge", "Share of dataset loads served from the cache",
+           by_process(lambda f: _ratio(f["dataset_cache"]["hits"], f["dataset_cache"]["misses"])))
+    metric("aether_process_resident_memory_bytes", "gauge", "Resident memory (the workers' summed)",
+           by_process(lambda f: f["rss_bytes"]))
+
+    stored = analysis_cache.stats()
+    metric("aether_analysis_cache_hit_ratio", "gauge", "Share of analysis requests served a stored result",
+           [("", (), _ratio(stored["hits"], stored["misses"]))])
+    pool = compute_pool.stats()
+    metric("aether_compute_tasks_total", "counter", "Compute pool tasks by outcome",
+           [("", (("outcome", outcome),), pool[outcome]) for outcome in ("completed", "failed", "timed_out", "cancelled")])
+    metric("aether_compute_workers", "gauge", "Configured compute worker processes", [("", (), pool["workers"])])
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    with _lock:
+        for registry in (_counters, _pending, _requests, _latency, _workers):
+            registry.clear()
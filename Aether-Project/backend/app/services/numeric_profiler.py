@@ -0,0 +1,283 @@
+"""
+Column-batched numeric statistics.
+
+perform_analysis, the insights and the column profile used to call a
+dozen pandas reductions per numeric column (describe, skew, kurt, three
+quantiles, var, histogram, outlier masks). On wide datasets the per-call
+overhead dominated. Here the columns of one dtype are stacked into a
+(columns x rows) block and every statistic is one vectorised pass over
+the block.
+
+The arithmetic follows pandas/numpy step by step (sum precision, the
+float32 casts, numpy's linear quantile interpolation and its uniform-bin
+histogram), so results match the per-column calls.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+HISTOGRAM_BINS = 10
+QUANTILES = (0.25, 0.5, 0.75)
+
+# Upper bound on the stacked block; wider groups are processed in slices
+BLOCK_BYTES = int(os.getenv("AETHER_PROFILE_BLOCK_BYTES", str(32 * 1024 * 1024)))
+
+
+class NumericProfile:
+    """Per-column statistics, indexed like `columns`."""
+
+    STATS = ("mean", "std", "var", "min", "max", "skew", "kurt")
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.count = np.zeros(k, dtype=np.int64)
+        for name in self.STATS:
+            setattr(self, name, np.full(k, np.nan))
+        self.quantiles = np.full((k, len(QUANTILES)), np.nan)
+        self.outliers = np.zeros(k, dtype=np.int64)
+        # (counts, edges) per column, None where np.histogram would raise
+        self.histograms = [None] * k
+        self._index = {col: i for i, col in enumerate(self.columns)}
+
+    def __contains__(self, col):
+        return col in self._index
+
+    def index(self, col) -> int:
+        return self._index[col]
+
+    def quantile(self, col, q: float) -> float:
+        return float(self.quantiles[self._index[col], QUANTILES.index(q)])
+
+    def describe(self, col) -> dict:
+        """The column's entry of DataFrame.describe().to_dict()."""
+        i = self._index[col]
+        q25, q50, q75 = (float(v) for v in self.quantiles[i])
+        return {
+            "count": float(self.count[i]),
+            "mean": float(self.mean[i]),
+            "std": float(self.std[i]),
+            "min": float(self.min[i]),
+            "25%": q25,
+            "50%": q50,
+            "75%": q75,
+            "max": float(self.max[i])
+        }
+
+
+def _zero_out_fperr(value):
+    # pandas' guard against round-off making a zero moment non-zero
+    return value.dtype.type(0) if np.abs(value) < 1e-14 else value
+
+
+def _skew(count, m2, m3, dtype):
+    # pandas nanskew
+    if count < 3:
+        return np.nan
+    m2, m3 = _zero_out_fperr(m2), _zero_out_fperr(m3)
+    if m2 == 0:
+        return 0.0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return dtype.type((count * (count - 1) ** 0.5 / (count - 2)) * (m3 / m2 ** 1.5))
+
+
+def _kurt(count, m2, m4, dtype):
+    # pandas nankurt
+    if count < 4:
+        return np.nan
+    with np.errstate(invalid="ignore", divide="ignore"):
+        adj = 3 * (count - 1) ** 2 / ((count - 2) * (count - 3))
+        numerator = _zero_out_fperr(count * (count + 1) * (count - 1) * m4)
+        denominator = _zero_out_fperr((count - 2) * (count - 3) * m2 ** 2)
+        if denominator == 0:
+            return 0.0
+        return dtype.type(numerator / denominator - adj)
+
+
+def _column_values(series: pd.Series):
+    """Values as a float ndarray plus the dtype the statistics are computed in."""
+    if series.dtype == np.float32:
+        return series.to_numpy(), np.float32
+    if series.dtype == np.float64:
+        return series.to_numpy(), np.float64
+    # Integers (numpy or nullable) and nullable floats: pandas reduces them in float64
+    return series.to_numpy(dtype=np.float64, na_value=np.nan), np.float64
+
+
+def profile_numeric(df: pd.DataFrame, columns=None, bins: int = HISTOGRAM_BINS) -> NumericProfile:
+    """
+    Count, mean, std/var, min/max, quartiles, skew, kurtosis, IQR outlier
+    counts and a fixed-bin histogram for every numeric column at once.
+    """
+    if columns is None:
+        columns = df.select_dtypes(include=[np.number]).columns.tolist()
+    profile = NumericProfile(columns)
+
+    groups = {}
+    for i, col in enumerate(profile.columns):
+        values, dtype = _column_values(df[col])
+        groups.setdefault(dtype, []).append((i, values))
+
+    rows = len(df)
+    for dtype, members in groups.items():
+        step = max(1, BLOCK_BYTES // max(1, rows * np.dtype(dtype).itemsize))
+        for start in range(0, len(members), step):
+            chunk = members[start:start + step]
+            block = np.empty((len(chunk), rows), dtype=dtype)
+            for row, (_, values) in enumerate(chunk):
+                block[row] = values
+            _profile_block(profile, [i for i, _ in chunk], block, bins)
+    return profile
+
+
+def _profile_block(profile: NumericProfile, idx, block: np.ndarray, bins: int):
+    dtype = block.dtype
+    is_f32 = dtype == np.float32
+    mask = np.isnan(block)
+    valid = ~mask
+    count = valid.sum(axis=1)
+    # pandas keeps counts in the value dtype for floats, so float32 columns
+    # get float32 count arithmetic in mean/skew/kurt
+    fcount = count.astype(dtype)
+    has_nan = count < block.shape[1]
+
+    any_nan = bool(has_nan.any())
+    zeroed = np.where(mask, 0, block) if any_nan else block
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # mean: float32 columns are summed in float32 (pandas nanmean)
+        if is_f32:
+            mean = zeroed.sum(axis=1, dtype=np.float32) / fcount
+        else:
+            mean = zeroed.sum(axis=1) / count
+
+        # var/skew/kurt: float64 sums around the float64 mean
+        values64 = zeroed.astype(np.float64, copy=False)
+        mean64 = values64.sum(axis=1) / fcount
+        adjusted = values64 - mean64[:, None]
+        if any_nan:
+            adjusted[mask] = 0
+        adjusted2 = adjusted ** 2
+        m2 = adjusted2.sum(axis=1)
+        m3 = (adjusted2 * adjusted).sum(axis=1)
+        m4 = (adjusted2 ** 2).sum(axis=1)
+        del adjusted, adjusted2
+
+        # nanvar squares (avg - values), which is not bit-identical to m2
+        sqr = (mean64[:, None] - values64) ** 2
+        if any_nan:
+            sqr[mask] = 0
+        var = sqr.sum(axis=1) / (fcount - 1)
+        var[count <= 1] = np.nan
+        del sqr, values64
+        var = var.astype(dtype)
+        std = np.sqrt(var)
+
+    # The closing formulas run per column on numpy scalars: array `**` is
+    # vectorised differently from scalar `**` and drifts by an ULP
+    skew = np.full(len(idx), np.nan)
+    kurt = np.full(len(idx), np.nan)
+    for pos in range(len(idx)):
+        skew[pos] = _skew(fcount[pos], m2[pos], m3[pos], dtype)
+        kurt[pos] = _kurt(fcount[pos], m2[pos], m4[pos], dtype)
+    del zeroed
+
+    # NaN-free slices are needed for min/max/quantiles; NaN sorts last so
+    # the first `count` entries of a partitioned row are the valid values
+    quantiles = np.full((len(idx), len(QUANTILES)), np.nan)
+    q = np.asarray(QUANTILES, dtype=np.float64)
+    mins = np.full(len(idx), np.nan)
+    maxs = np.full(len(idx), np.nan)
+    for n in np.unique(count):
+        if n == 0:
+            continue
+        rows = np.flatnonzero(count == n)
+        virtual = (n - 1) * q
+        previous = np.floor(virtual).astype(np.intp)
+        nxt = previous + 1
+        above = virtual >= n - 1
+        previous[above] = n - 1
+        nxt[above] = n - 1
+        gamma = virtual - np.floor(virtual)
+        gamma[above] = virtual[above] + 1
+        kth = np.unique(np.concatenate(([0, n - 1], previous, nxt)))
+        part = np.partition(block[rows], kth, axis=1)
+        mins[rows] = part[:, 0]
+        maxs[rows] = part[:, n - 1]
+        a, b = part[:, previous], part[:, nxt]
+        # numpy's _lerp: the difference stays in the value dtype
+        diff = b - a
+        lerp = a + diff * gamma
+        lerp = np.where(gamma >= 0.5, b - diff * (1 - gamma), lerp)
+        quantiles[rows] = lerp
+    # pandas hands float32 columns with missing values back in float32
+    if is_f32 and any_nan:
+        quantiles[has_nan] = quantiles[has_nan].astype(np.float32)
+
+    # IQR outliers, bounds computed in the quantile's dtype
+    q1, q3 = quantiles[:, 0], quantiles[:, 2]
+    if is_f32:
+        low = np.where(has_nan, (q1.astype(np.float32) - 1.5 * (q3 - q1).astype(np.float32)), q1 - 1.5 * (q3 - q1))
+        high = np.where(has_nan, (q3.astype(np.float32) + 1.5 * (q3 - q1).astype(np.float32)), q3 + 1.5 * (q3 - q1))
+    else:
+        iqr = q3 - q1
+        low, high = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+    outliers = ((block < low[:, None]) | (block > high[:, None])).sum(axis=1)
+
+    for pos, col_index in enumerate(idx):
+        profile.count[col_index] = count[pos]
+        profile.mean[col_index] = mean[pos]
+        profile.std[col_index] = std[pos]
+        profile.var[col_index] = var[pos]
+        profile.min[col_index] = mins[pos]
+        profile.max[col_index] = maxs[pos]
+        profile.skew[col_index] = skew[pos]
+        profile.kurt[col_index] = kurt[pos]
+        profile.quantiles[col_index] = quantiles[pos]
+        profile.outliers[col_index] = outliers[pos]
+
+    _histograms(profile, idx, block, valid, count, mins, maxs, bins)
+
+
+def _histograms(profile, idx, block, valid, count, mins, maxs, bins):
+    """np.histogram(values, bins) for every row, using numpy's uniform-bin algorithm."""
+    dtype = block.dtype
+    k = len(idx)
+    edges = np.zeros((k, bins + 1), dtype=dtype)
+    first = np.zeros(k, dtype=dtype)
+    last = np.ones(k, dtype=dtype)
+    ok = np.ones(k, dtype=bool)
+    for pos in range(k):
+        if count[pos]:
+            lo, hi = dtype.type(mins[pos]), dtype.type(maxs[pos])
+            if not (np.isfinite(lo) and np.isfinite(hi)):
+                ok[pos] = False
+                continue
+            if lo == hi:
+                lo, hi = lo - dtype.type(0.5), hi + dtype.type(0.5)
+            first[pos], last[pos] = lo, hi
+            edges[pos] = np.linspace(lo, hi, bins + 1, endpoint=True, dtype=dtype)
+        else:
+            # No values: numpy falls back to the range 0..1
+            edges[pos] = np.linspace(0, 1, bins + 1, endpoint=True, dtype=dtype)
+        if np.any(edges[pos][:-1] >= edges[pos][1:]):
+            ok[pos] = False
+
+    used = valid & ok[:, None]
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        f_indices = ((block - first[:, None]) / (last - first)[:, None]) * bins
+    if not used.all():
+        f_indices[~used] = 0
+    indices = f_indices.astype(np.intp)
+    indices[indices == bins] -= 1
+    # The index computation is only accurate to ~1 ULP at the edges
+    lower = np.take_along_axis(edges, indices, axis=1)
+    indices[used & (block < lower)] -= 1
+    upper = np.take_along_axis(edges, indices + 1, axis=1)
+    indices[used & (block >= upper) & (indices != bins - 1)] += 1
+
+    offsets = np.arange(k)[:, None] * bins
+    counts = np.bincount((indices + offsets)[used], minlength=k * bins).reshape(k, bins)
+    for pos, col_index in enumerate(idx):
+        if ok[pos]:
+            profile.histograms[col_index] = (counts[pos], edges[pos])
@@ -0,0 +1,246 @@
+"""
+PII matching shared by the upload scan (privacy_scanner) and the analysis
+check (analysis_service.detect_pii).
+
+Both used to run re.search through Series.apply for every value of every
+(column, pattern) pair, after astype(str) of every column. Here a column
+is matched with the same patterns and the same results, but:
+
+- Patterns are compiled once (`Detector`).
+- Values that cannot match are skipped before any regex runs: a detector
+  declares the fewest digits a match has and the characters it needs
+  ('@' for emails), which are counted for all values of a column at once
+  over its text as bytes. Numbers are only turned into strings when their
+  string form could be long enough to match; numbers with a fractional
+  part are never matched, since the digits of a measurement such as
+  0.3333333333333333 are not an identifier. Other non-text columns
+  (dates, booleans, categories) are matched on their distinct values.
+- The remaining values are joined with a NUL separator and the pattern runs
+  once over that text in C (`finditer`); match positions map back to rows.
+  A pattern that could match across the separator, or per-value
+  normalisation, falls back to one search per value.
+- `classify` stops at the first match of the first detector that has one.
+
+`python -m benchmarks.bench_pii` reports rows per second against the
+per-value apply.
+"""
+import itertools
+import re
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+_SEPARATOR = "\x00"
+
+# The upload scan's patterns (flagged with their match counts)
+PATTERNS = {
+    "Email": r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}',
+    "Phone": r'(\+\d{1,2}\s?)?\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4}',
+    "SSN": r'\d{3}-\d{2}-\d{4}',
+    "Credit Card": r'\b(?:\d[ -]*?){13,16}\b'
+}
+
+# The analysis check's: emails anywhere, or a whole value that is a phone number once formatting is removed
+ANALYSIS_EMAIL_PATTERN = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
+ANALYSIS_PHONE_PATTERN = r'^\+?1?\d{9,15}$'
+_PHONE_FORMATTING = re.compile(r'[\s\-\(\)]')
+
+
+class Detector:
+    """
+    A compiled PII pattern plus what a value needs to possibly match it:
+    `min_digits` ASCII-or-other digits and every character of `requires`.
+    `number_digits` is the fewest digits a match has in a number's string
+    form ("-1234.5"), None if a number can never match. `normalize` is
+    applied to each value before matching; `joinable` says the pattern can
+    run over NUL-joined values (no anchors, cannot match a NUL).
+    """
+
+    def __init__(self, name: str, pattern: str, min_digits: int = 0, requires: str = "",
+                 number_digits: Optional[int] = None, normalize=None, joinable: bool = True):
+        self.name = name
+        self.regex = re.compile(pattern)
+        self.min_digits = min_digits
+        self.requires = requires.encode("ascii")
+        self.number_digits = number_digits
+        self.normalize = normalize
+        self.joinable = joinable and normalize is None
+
+
+SCAN_DETECTORS = (
+    Detector("Email", PATTERNS["Email"], requires="@"),
+    Detector("Phone", PATTERNS["Phone"], min_digits=10, number_digits=10),
+    Detector("SSN", PATTERNS["SSN"], min_digits=9, requires="-"),
+    Detector("Credit Card", PATTERNS["Credit Card"], min_digits=13, number_digits=13),
+)
+
+ANALYSIS_DETECTORS = (
+    Detector("Email", ANALYSIS_EMAIL_PATTERN, requires="@"),
+    Detector("Phone", ANALYSIS_PHONE_PATTERN, min_digits=9, number_digits=9,
+             normalize=lambda value: _PHONE_FORMATTING.sub('', value)),
+)
+
+
+def _starts(values: List[str]) -> np.ndarray:
+    """Offsets of the values in their separator-joined text."""
+    starts = np.zeros(len(values), dtype=np.int64)
+    if len(values) > 1:
+        lengths = np.fromiter(map(len, values), dtype=np.int64, count=len(values))
+        np.cumsum(lengths[:-1] + 1, out=starts[1:])
+    return starts
+
+
+class _Text:
+    """Values of a column as strings, with per-value digit and character counts."""
+
+    def __init__(self, values: List[str], weights: Optional[np.ndarray] = None):
+        self.values = values
+        # Rows each value stands for (distinct values of a column), None when one each
+        self.weights = weights
+        self.starts = _starts(values)
+        text = _SEPARATOR.join(values)
+        self.joinable = text.count(_SEPARATOR) == max(len(values) - 1, 0)
+        if text.isascii():
+            self._codes = np.frombuffer(text.encode("ascii"), dtype=np.uint8)
+            # Separators count as non-digits; reduceat needs the trailing one too
+            is_digit = (self._codes >= 48) & (self._codes <= 57)
+        else:
+            # Character positions, as str indices count them; any non-ASCII
+            # character may be a Unicode digit, so it counts as one
+            self._codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+            is_digit = ((self._codes >= 48) & (self._codes <= 57)) | (self._codes > 127)
+        self._digits = self._per_value(is_digit)
+        self._chars = {}
+
+    def _per_value(self, mask: np.ndarray) -> np.ndarray:
+        """Sums of a per-character mask over each value (and the separator after it)."""
+        if not len(self.values):
+            return np.zeros(0, dtype=np.int64)
+        # A trailing separator, so an empty last value starts within the array
+        return np.add.reduceat(np.append(mask, False).astype(np.int64), self.starts)
+
+    def candidates(self, detector: Detector) -> np.ndarray:
+        """Indices of the values that could match."""
+        mask = self._digits >= detector.min_digits
+        for char in detector.requires:
+            if char not in self._chars:
+                self._chars[char] = self._per_value(self._codes == char) > 0
+            mask &= self._chars[char]
+        return np.flatnonzero(mask)
+
+    def matches(self, detector: Detector, stop_at_first: bool = False) -> np.ndarray:
+        """Indices of the values the detector matches (just the first one with stop_at_first)."""
+        indices = self.candidates(detector)
+        if not len(indices):
+            return indices
+        values = [self.values[i] for i in indices]
+        if detector.joinable and self.joinable:
+            # One pass of the regex in C over the candidates; no match spans a separator
+            text = _SEPARATOR.join(values)
+            starts = _starts(values)
+            if stop_at_first:
+                match = detector.regex.search(text)
+                found = [] if match is None else [match.start()]
+            else:
+                found = [match.start() for match in detector.regex.finditer(text)]
+            hit = np.unique(np.searchsorted(starts, np.asarray(found, dtype=np.int64), side="right") - 1)
+        else:
+            search = detector.regex.search
+            normalize = detector.normalize or str
+            hits = (i for i, value in enumerate(values) if search(normalize(value)))
+            if stop_at_first:
+                hit = np.fromiter(itertools.islice(hits, 1), dtype=np.int64)
+            else:
+                hit = np.fromiter(hits, dtype=np.int64)
+        return indices[hit]
+
+    def count(self, indices: np.ndarray) -> int:
+        if self.weights is None:
+            return int(len(indices))
+        return int(self.weights[indices].sum())
+
+
+def _number_candidates(values: np.ndarray, digits: int) -> np.ndarray:
+    """
+    Mask of the numbers whose string form may have `digits` digits or more.
+    Others are certainly shorter: integers below 10**(digits-1), and finite
+    floats between 1e-4 and 10**(digits-2) that round-trip at the decimals
+    left (str() then prints no exponent and at most digits-1 digits).
+    """
+    limit = digits - 1
+    if values.dtype.kind in "iu":
+        bound = 10 ** limit
+        if values.dtype.kind == "u":
+            return values >= bound
+        return (values >= bound) | (values <= -bound)
+    values = values.astype(np.float64, copy=False)
+    magnitude = np.abs(values)
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        integer_digits = np.maximum(np.floor(np.log10(np.where(magnitude > 0, magnitude, 1.0))) + 1, 1)
+        scale = 10.0 ** np.clip(limit - integer_digits, 0, None)
+        short = (magnitude == 0) | ~np.isfinite(values) | (
+            (magnitude >= 1e-4) & (magnitude < 10.0 ** (limit - 1)) & (np.rint(values * scale) / scale == values))
+    return ~short
+
+
+def column_text(series: pd.Series, detectors: Sequence[Detector]) -> Optional[_Text]:
+    """
+    The column's values as astype(str) writes them, restricted to the ones
+    a detector may match; None if none can. Of a float column only the
+    integral values are candidates.
+    """
+    dtype = series.dtype
+    if pd.api.types.is_bool_dtype(dtype):
+        return None
+    if pd.api.types.is_numeric_dtype(dtype) and dtype.kind in "iuf":
+        digits = [d.number_digits for d in detectors if d.number_digits is not None]
+        if not digits:
+            return None
+        if pd.api.types.is_extension_array_dtype(dtype):
+            # Nullable numbers write missing values as '<NA>', which has no digits
+            numbers = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        else:
+            numbers = series.to_numpy()
+        mask = _number_candidates(numbers, min(digits))
+        if numbers.dtype.kind == "f":
+            with np.errstate(invalid="ignore"):
+                mask &= np.rint(numbers) == numbers
+        if not mask.any():
+            return None
+        return _Text(series[mask].astype(str).tolist())
+    if dtype == object or pd.api.types.is_string_dtype(dtype):
+        return _Text(series.astype(str).tolist())
+    # Dates, categories and other types: their distinct values, weighted by rows
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    values = pd.Series(uniques).astype(str).tolist()
+    counts = np.bincount(codes[codes >= 0], minlength=len(values))
+    missing = int((codes < 0).sum())
+    if missing:
+        values.append(str(series[codes < 0].iloc[0]))
+        counts = np.append(counts, missing)
+    return _Text(values, counts)
+
+
+def count_matches(series: pd.Series, detectors: Sequence[Detector] = SCAN_DETECTORS) -> Dict[str, int]:
+    """Rows of the column each detector matches (detectors without a match are left out)."""
+    text = column_text(series, detectors)
+    if text is None:
+        return {}
+    counts = {}
+    for detector in detectors:
+        n = text.count(text.matches(detector))
+        if n:
+            counts[detector.name] = n
+    return counts
+
+
+def classify(series: pd.Series, detectors: Sequence[Detector] = ANALYSIS_DETECTORS) -> Optional[str]:
+    """The first detector matching any value of the column, or None."""
+    text = column_text(series, detectors)
+    if text is None:
+        return None
+    for detector in detectors:
+        if len(text.matches(detector, stop_at_first=True)):
+            return detector.name
+    return None
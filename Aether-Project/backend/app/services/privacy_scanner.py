@@ -1,57 +1,143 @@
+import os
+
+import numpy as np
 import pandas as pd
-import re
+from . import dataset_loader, instrumentation, metrics, pii_engine
+
+# Regex patterns for common PII (matched by pii_engine)
+PATTERNS = pii_engine.PATTERNS
 
-# Regex patterns for common PII
-PATTERNS = {
-    "Email": r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}',
-    "Phone": r'(\+\d{1,2}\s?)?\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4}',
-    "SSN": r'\d{3}-\d{2}-\d{4}',
-    "Credit Card": r'\b(?:\d[ -]*?){13,16}\b'
-}
+# Whole-dataset scans, stored per content version (see ingest_service.scan_for_pii)
+FULL_SCAN_KIND = "pii_scan:full"
+SAMPLE_SCAN_KIND = "pii_scan:sample"
+SCAN_MODES = {"full": FULL_SCAN_KIND, "sample": SAMPLE_SCAN_KIND}
+SAMPLING_METHODS = ("stratified", "random")
+SAMPLE_ROWS = int(os.getenv("AETHER_PII_SAMPLE_ROWS", "10000"))
 
+@instrumentation.timed
 def scan_dataset(filepath: str, sample_size: int = 100):
     """
     Scans the first N rows of a dataset for PII patterns.
     Returns a list of warnings.
     """
+    if not dataset_loader.is_supported(filepath):
+        return ["Unsupported file format for scanning."]
+
+    try:
+        with instrumentation.stage("read"):
+            df = dataset_loader.read_file(filepath, nrows=sample_size)
+    except Exception as e:
+        return [{"error": f"Failed to scan dataset: {str(e)}"}]
+
+    with instrumentation.stage("scan"):
+        return scan_frame(df)
+
+def scan_frame(df: pd.DataFrame):
+    """
+    Scans an already-loaded sample for PII patterns.
+    Returns a list of warnings.
+    """
     warnings = []
+    metrics.inc(metrics.PII_ROWS_SCANNED, len(df), scanner="dataset")
     
     try:
-        # Determine file type and read
-        if filepath.endswith('.csv'):
-            df = pd.read_csv(filepath, nrows=sample_size)
-        elif filepath.endswith('.xlsx'):
-            df = pd.read_excel(filepath, nrows=sample_size)
-        elif filepath.endswith('.json'):
-            df = pd.read_json(filepath, nrows=sample_size)
-        elif filepath.endswith('.parquet'):
-            df = pd.read_parquet(filepath) # Parquet doesn't support nrows easily in all engines, but it's fast
-            df = df.head(sample_size)
-        else:
-            return ["Unsupported file format for scanning."]
-
         # Scan each column
-        for col in df.columns:
-            # Convert to string for regex matching
-            col_data = df[col].astype(str)
-            
-            for pii_type, pattern in PATTERNS.items():
-                # Check if any value in the column matches the pattern
-                # We use a simple check: if > 10% of non-null values match, flag it
-                matches = col_data.apply(lambda x: bool(re.search(pattern, x)))
-                match_count = matches.sum()
-                
-                if match_count > 0:
-                    warnings.append({
-                        "column": col,
-                        "type": pii_type,
-                        "count": int(match_count),
-                        "message": f"Column '{col}' contains potential {pii_type} data."
-                    })
-                    # Break to avoid flagging same column for multiple things if one is found (optional, but keeps it clean)
-                    # For now, we let it flag multiple if needed.
+        for i, col in enumerate(df.columns):
+            counts = pii_engine.count_matches(df.iloc[:, i], pii_engine.SCAN_DETECTORS)
+            for pii_type, match_count in counts.items():
+                warnings.append({
+                    "column": col,
+                    "type": pii_type,
+                    "count": match_count,
+                    "message": f"Column '{col}' contains potential {pii_type} data."
+                })
+                # A column may be flagged for several types
 
     except Exception as e:
         warnings.append({"error": f"Failed to scan dataset: {str(e)}"})
         
     return warnings
+
+
+def _count_columns(df: pd.DataFrame, hits: dict):
+    """Adds the matching rows of each column and PII type to `hits`."""
+    for i, col in enumerate(df.columns):
+        found = hits.setdefault(str(col), {})
+        for pii_type, count in pii_engine.count_matches(df.iloc[:, i], pii_engine.SCAN_DETECTORS).items():
+            found[pii_type] = found.get(pii_type, 0) + count
+
+
+def _report(hits: dict, rows: int, population: int, **scan) -> dict:
+    """
+    Per-column hit counts and rates (matching rows / rows scanned), plus
+    warnings in scan_frame's format. Sample scans also estimate the count
+    in the whole dataset.
+    """
+    columns, warnings = {}, []
+    for col, found in hits.items():
+        if not found:
+            continue
+        columns[col] = {}
+        for pii_type, count in found.items():
+            entry = {"count": count, "rate": count / rows}
+            if rows < population:
+                entry["estimated_count"] = int(round(entry["rate"] * population))
+            columns[col][pii_type] = entry
+            warnings.append({
+                "column": col,
+                "type": pii_type,
+                "count": count,
+                "rate": entry["rate"],
+                "message": f"Column '{col}' contains potential {pii_type} data."
+            })
+    return {**scan, "rows_scanned": rows, "population_rows": population, "columns": columns, "warnings": warnings}
+
+
+@instrumentation.timed
+def scan_full(dataset, chunk_rows: int = None) -> dict:
+    """
+    Scans every row of a dataset, one chunk at a time (at most `chunk_rows`
+    rows in memory).
+    """
+    hits, rows = {}, 0
+    for chunk in dataset_loader.iter_chunks(dataset, chunk_rows or dataset_loader.STREAM_CHUNK_ROWS):
+        metrics.inc(metrics.PII_ROWS_SCANNED, len(chunk), scanner="full")
+        _count_columns(chunk, hits)
+        rows += len(chunk)
+    return _report(hits, rows, rows, mode="full")
+
+
+def sample_positions(population: int, rows: int, method: str = "stratified", seed: int = 0) -> np.ndarray:
+    """
+    Sorted row positions of a sample spread over the whole file: one random
+    row from each of `rows` equal stretches ("stratified"), or `rows`
+    uniformly random rows ("random").
+    """
+    if method not in SAMPLING_METHODS:
+        raise ValueError(f"method must be one of {', '.join(SAMPLING_METHODS)}")
+    rng = np.random.default_rng(seed)
+    rows = min(rows, population)
+    if method == "random":
+        return np.sort(rng.choice(population, rows, replace=False))
+    width = population / rows if rows else 0
+    return np.unique((np.arange(rows) * width + rng.random(rows) * width).astype(np.int64))
+
+
+@instrumentation.timed
+def scan_sample(dataset, rows: int = SAMPLE_ROWS, method: str = "stratified", seed: int = 0) -> dict:
+    """
+    Scans `rows` rows drawn from the whole dataset (see sample_positions),
+    reading only those rows from the columnar copy when there is one.
+    """
+    population = dataset.row_count
+    with instrumentation.stage("read"):
+        if population is None:
+            population = sum(len(chunk) for chunk in dataset_loader.iter_chunks(dataset))
+        df = dataset_loader.take_rows(dataset, sample_positions(population, rows, method, seed))
+    with instrumentation.stage("scan"):
+        metrics.inc(metrics.PII_ROWS_SCANNED, len(df), scanner="sample")
+        hits = {}
+        _count_columns(df, hits)
+    # Newlines inside quoted CSV fields make an upload's row count an overestimate
+    population = max(population, len(df))
+    return _report(hits, len(df), population, mode="sample", method=method, seed=seed)
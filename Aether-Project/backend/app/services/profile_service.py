@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from . import artifact_store, category_index, compute_pool, correlation_search, dataset_loader, numeric_profiler
+
+PROFILE_KIND = "profile"
+TOP_VALUES = 5
+
+
+def _native(value):
+    """JSON-safe scalar: numpy numbers become Python ones, NaN/NaT become None."""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return pd.Timestamp(value).isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _kind(series: pd.Series) -> str:
+    # Same groups the AI helpers get from select_dtypes
+    if pd.api.types.is_bool_dtype(series):
+        return "other"
+    if pd.api.types.is_numeric_dtype(series):
+        return "numeric"
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return "datetime"
+    if series.dtype == object or isinstance(series.dtype, pd.CategoricalDtype):
+        return "categorical"
+    return "other"
+
+
+def build_profile(df: pd.DataFrame) -> dict:
+    """
+    Column catalog of a loaded dataset: names, dtypes, null and distinct
+    counts, ranges, quartiles with IQR outlier counts, top values and the
+    strongest Pearson pair. Everything the story wizard and the AI
+    suggestions need without reading the data again.
+    """
+    categories = category_index.CategoryIndex(df)
+    numeric = numeric_profiler.profile_numeric(df, [col for col in df.columns if _kind(df[col]) == "numeric"])
+    columns = []
+    for col in df.columns:
+        series = df[col]
+        kind = _kind(series)
+        profile = {
+            "name": col,
+            "dtype": str(series.dtype),
+            "kind": kind,
+            "nulls": int(series.isnull().sum()),
+            "unique": categories.column(col).nunique() if kind == "categorical" else int(series.nunique())
+        }
+        if kind == "numeric":
+            i = numeric.index(col)
+            # Integer columns keep integer bounds
+            bound = series.dtype.type if series.dtype.kind in "iu" and numeric.count[i] else float
+            profile.update({
+                "min": _native(bound(numeric.min[i])),
+                "max": _native(bound(numeric.max[i])),
+                "mean": _native(numeric.mean[i]),
+                "q1": _native(numeric.quantile(col, 0.25)),
+                "q3": _native(numeric.quantile(col, 0.75)),
+                "outliers": int(numeric.outliers[i])
+            })
+        elif kind == "datetime":
+            profile.update({"min": _native(series.min()), "max": _native(series.max())})
+        elif kind == "categorical":
+            top = categories.column(col).value_counts().head(TOP_VALUES)
+            profile["top_values"] = [{"value": _native(value), "count": int(count)} for value, count in top.items() if count > 0]
+        columns.append(profile)
+
+    numeric_cols = [c["name"] for c in columns if c["kind"] == "numeric"]
+    strongest = None
+    # A pair without a defined correlation (constant column) is reported as such
+    top = correlation_search.top_correlations(df, numeric_cols, k=1, nan_first=True)
+    if top:
+        var1, var2, value = top[0]
+        strongest = {"var1": var1, "var2": var2, "correlation": _native(value)}
+
+    return {
+        "rows": int(len(df)),
+        "columns": columns,
+        "strongest_correlation": strongest
+    }
+
+
+def store_profile(db: Session, content_hash: str, df: pd.DataFrame) -> dict:
+    """Builds and records the catalog for a file's content. The caller commits."""
+    profile = build_profile(df)
+    artifact_store.put(db, content_hash, PROFILE_KIND, profile)
+    return profile
+
+
+def get_profile(db: Session, dataset) -> dict:
+    """
+    The catalog for a dataset. It is normally written at ingest; datasets
+    from before that (or still being ingested) are profiled once here.
+    """
+    profile = artifact_store.get(db, dataset.content_hash, PROFILE_KIND)
+    if profile is None:
+        # Built in the compute pool, off the request thread
+        profile = compute_pool.call(profile_dataset, compute_pool.dataset_ref(dataset))
+        artifact_store.put(db, dataset.content_hash, PROFILE_KIND, profile)
+        db.commit()
+    return profile
+
+
+def profile_dataset(dataset) -> dict:
+    return build_profile(dataset_loader.load_dataset(dataset))
+
+
+def columns_of_kind(profile: dict, kind: str) -> list:
+    return [c["name"] for c in profile["columns"] if c["kind"] == kind]
+
+
+def column(profile: dict, name: str) -> dict:
+    return next(c for c in profile["columns"] if c["name"] == name)
@@ -0,0 +1,197 @@
+"""
+Row-fingerprint index: one 64-bit hash per row, for duplicate detection.
+
+The analysis ran df.duplicated() over every column of the whole frame on
+each call, and the drop_duplicates cleaning step did the same. The index
+is computed once when the columnar copy is written (ingest, cleaning
+edits) and stored next to the blob as `<blob>.rows` (raw uint64); duplicate
+counts and first-occurrence masks are then one hash-table pass over a
+single integer array.
+
+A row's hash is the sum over its columns of hash(values) * weight(column
+name), modulo 2**64, with an odd weight per name. A column's contribution
+can therefore be taken out or put back on its own: dropping, renaming,
+imputing or anonymising a column rehashes only that column (`update_column`).
+
+Values are hashed by what they are, not how they are stored, so the hashes
+survive the dtype optimizer: categories hash like their values, all integer
+widths alike, float32 like float64, -0.0 like 0.0, and every kind of
+missing value alike (matching what duplicated() treats as equal). A string
+column whose every value parses as a number hashes those numbers, as the
+optimizer converts it, so " 1" and "1.0" count as equal there, as they do
+after a load. Object columns of mixed types hash their values' string
+forms, so 1 and 1.0 in one such column count as different. Distinct rows
+collide with probability about rows² / 2**65.
+"""
+import hashlib
+import os
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+ROW_INDEX_SUFFIX = ".rows"
+# Distinct rows a SeenRows keeps before duplicate counts become bounds
+DEDUP_EXACT_LIMIT = int(os.getenv("AETHER_STREAM_DEDUP_LIMIT", str(20_000_000)))
+
+# Hash of a missing value in any column
+_MISSING = np.uint64(0x9E3779B97F4A7C15)
+
+
+def path_for(filepath: str) -> str:
+    return filepath + ROW_INDEX_SUFFIX
+
+
+def _weight(name) -> np.uint64:
+    digest = hashlib.blake2b(repr(name).encode("utf-8"), digest_size=8).digest()
+    return np.uint64(int.from_bytes(digest, "little") | 1)
+
+
+def _canonical(series: pd.Series) -> np.ndarray:
+    """The values in the form they are hashed in (missing entries are masked separately)."""
+    dtype = series.dtype
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return series.to_numpy(dtype=np.int64, na_value=0)
+    if pd.api.types.is_float_dtype(dtype):
+        # + 0.0 turns -0.0 into 0.0
+        return series.to_numpy(dtype=np.float64, na_value=np.nan) + 0.0
+    if pd.api.types.is_datetime64_any_dtype(dtype) or pd.api.types.is_timedelta64_dtype(dtype):
+        return series.to_numpy(dtype="datetime64[ns]" if dtype.kind == "M" or hasattr(dtype, "tz") else "timedelta64[ns]").view(np.int64)
+    values = series.to_numpy(dtype=object)
+    if dtype == object:
+        inferred = pd.api.types.infer_dtype(values, skipna=True)
+        # Numbers kept as objects (e.g. after an anonymize edit) hash like numeric columns
+        if inferred in ("integer", "boolean"):
+            return pd.to_numeric(pd.Series(values).where(pd.notna(values), 0), errors="coerce").to_numpy(dtype=np.int64)
+        if inferred in ("floating", "mixed-integer-float"):
+            return pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=np.float64) + 0.0
+        if inferred == "string":
+            numbers = _parsed_numbers(pd.Series(values))
+            if numbers is not None:
+                return _canonical(numbers)
+    return values
+
+
+def _parsed_numbers(strings: pd.Series) -> Optional[pd.Series]:
+    """The numbers dtype_optimizer turns a column of numeric-looking strings into, else None."""
+    observed = strings.dropna()
+    if len(observed) == 0:
+        return None
+    try:
+        # Most text columns fail on their first value
+        float(observed.iloc[0])
+    except ValueError:
+        return None
+    numbers = pd.to_numeric(strings.str.strip(), errors="coerce")
+    return numbers if numbers.notna().sum() == len(observed) else None
+
+
+def column_hashes(series: pd.Series) -> np.ndarray:
+    """uint64 hash of every value of a column."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = column_hashes(pd.Series(series.cat.categories))
+        codes = series.cat.codes.to_numpy()
+        return np.where(codes >= 0, categories.take(np.maximum(codes, 0)) if len(categories) else _MISSING, _MISSING)
+    missing = series.isna().to_numpy()
+    values = _canonical(series)
+    if values.dtype == object:
+        values = np.where(missing, "", values)
+    # Object values are factorised first, so each distinct value is hashed once
+    hashes = pd.util.hash_array(values, categorize=True)
+    hashes[missing] = _MISSING
+    return hashes
+
+
+def contribution(series: pd.Series, name=None) -> np.ndarray:
+    """A column's share of every row hash."""
+    return column_hashes(series) * _weight(series.name if name is None else name)
+
+
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    hashes = np.zeros(len(df), dtype=np.uint64)
+    for i in range(df.shape[1]):
+        hashes += contribution(df.iloc[:, i], df.columns[i])
+    return hashes
+
+
+def update_column(hashes: np.ndarray, before: Optional[pd.Series] = None, after: Optional[pd.Series] = None) -> np.ndarray:
+    """Row hashes after a column is replaced (before and after), dropped (after=None) or added (before=None)."""
+    updated = hashes.copy()
+    if before is not None:
+        updated -= contribution(before)
+    if after is not None:
+        updated += contribution(after)
+    return updated
+
+
+def first_occurrences(hashes: np.ndarray) -> np.ndarray:
+    """Mask of the rows drop_duplicates() keeps."""
+    return ~pd.Series(hashes, copy=False).duplicated().to_numpy()
+
+
+def duplicate_count(hashes: np.ndarray) -> int:
+    return int(len(hashes) - pd.unique(hashes).size)
+
+
+class SeenRows:
+    """
+    Row-hash set for duplicate removal over a pass in chunks (the streaming
+    analysis, the sampling pass), kept as sorted runs that are merged when
+    they pile up (an LSM, so inserts stay cheap). Stops growing at `limit`
+    hashes; `exact` is False from then on.
+    """
+
+    def __init__(self, limit: int = DEDUP_EXACT_LIMIT):
+        self.limit = limit
+        self.runs: List[np.ndarray] = []
+        self.size = 0
+        self.exact = True
+
+    def first_seen(self, hashes: np.ndarray) -> np.ndarray:
+        """Mask of rows whose hash has not been seen before (in this chunk or earlier)."""
+        mask = ~pd.Series(hashes).duplicated().to_numpy()
+        for run in self.runs:
+            idx = np.minimum(np.searchsorted(run, hashes), len(run) - 1)
+            mask &= run[idx] != hashes
+        new = np.sort(hashes[mask])
+        if not self.exact or self.size + len(new) > self.limit:
+            self.exact = False
+            return mask
+        self.runs.append(new)
+        self.size += len(new)
+        while len(self.runs) > 1 and len(self.runs[-2]) <= 2 * len(self.runs[-1]):
+            merged = np.sort(np.concatenate([self.runs.pop(), self.runs.pop()]), kind='mergesort')
+            self.runs.append(merged)
+        return mask
+
+
+def save(filepath: str, hashes: np.ndarray):
+    """Writes the index of the blob at `filepath` (temp file, then rename)."""
+    path = path_for(filepath)
+    tmp_path = path + ".tmp"
+    np.ascontiguousarray(hashes, dtype=np.uint64).tofile(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def load(filepath: str, rows: Optional[int] = None) -> Optional[np.ndarray]:
+    """The stored index, or None if there is none (or it does not have `rows` entries)."""
+    path = path_for(filepath)
+    if not os.path.exists(path):
+        return None
+    hashes = np.fromfile(path, dtype=np.uint64)
+    return hashes if rows is None or len(hashes) == rows else None
+
+
+def for_dataset(dataset, df: pd.DataFrame) -> np.ndarray:
+    """
+    The index of a dataset's current version, `df` being its loaded frame.
+    Datasets stored before indexes existed get theirs written now.
+    """
+    hashes = load(dataset.filepath, len(df))
+    if hashes is None:
+        hashes = row_hashes(df)
+        try:
+            save(dataset.filepath, hashes)
+        except OSError:
+            pass
+    return hashes
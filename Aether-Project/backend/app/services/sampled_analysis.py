@@ -0,0 +1,289 @@
+"""
+Sample-based ("fast") analysis.
+
+One pass over the dataset draws a seeded uniform sample of a fixed size
+(reservoir sampling with random keys) or, when a sensitive column is
+present, a proportional stratified sample on it. The same pass records
+the figures that are cheap to get exactly: row count, distinct rows (row
+hashes, as in streaming_analysis), null counts, numeric minimum/maximum
+and the stratum sizes. perform_analysis' regular pipeline then runs on
+the sample. Counts are scaled to the population, and
+`approximation.error_bounds` gives a 95% confidence interval for each
+estimated statistic.
+"""
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from . import dataset_loader, instrumentation, row_index
+
+FAST_SAMPLE_ROWS = int(os.getenv("AETHER_FAST_SAMPLE_ROWS", "50000"))
+# Stratifying on a column with more distinct values than this falls back to a
+# uniform sample; the stratified reservoir holds up to MAX_STRATA * rows rows
+MAX_STRATA = 20
+CONFIDENCE = 0.95
+Z = 1.959963984540054
+
+
+class _Reservoir:
+    """The `size` rows with the smallest random keys seen so far, per stratum."""
+
+    def __init__(self, size: int, seed: int):
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        self.kept = None
+        self.seen = 0
+
+    def update(self, chunk: pd.DataFrame, strata: pd.Series = None):
+        chunk = chunk.assign(_key=self.rng.random(len(chunk)), _row=np.arange(self.seen, self.seen + len(chunk)))
+        self.seen += len(chunk)
+        if strata is not None:
+            chunk["_stratum"] = strata.to_numpy()
+        frame = chunk if self.kept is None else pd.concat([self.kept, chunk], ignore_index=True)
+        if strata is None:
+            if len(frame) > self.size:
+                frame = frame.iloc[np.argpartition(frame["_key"].to_numpy(), self.size - 1)[:self.size]]
+        else:
+            frame = frame.sort_values("_key", kind="stable")
+            frame = frame[frame.groupby("_stratum", sort=False).cumcount() < self.size]
+        self.kept = frame.reset_index(drop=True)
+
+
+def _allocate(strata_sizes: pd.Series, rows: int) -> pd.Series:
+    """Proportional allocation (largest remainder), at least one row per stratum."""
+    share = strata_sizes / strata_sizes.sum() * rows
+    alloc = np.floor(share).astype(int).clip(lower=1)
+    remainder = rows - int(alloc.sum())
+    if remainder > 0:
+        order = (share - np.floor(share)).sort_values(ascending=False).index[:remainder]
+        alloc[order] += 1
+    return alloc.clip(upper=strata_sizes)
+
+
+def sample_dataset(dataset, rows: int, stratify: str = None, seed: int = 0, chunk_rows: int = None):
+    """
+    Draws up to `rows` rows in one pass over the dataset. Returns the sample
+    and what the pass measured exactly about the whole dataset.
+    """
+    reservoir = _Reservoir(rows, seed)
+    seen = row_index.SeenRows()
+    population = distinct = 0
+    nulls = None
+    minimum, maximum = {}, {}
+    strata_sizes = None
+
+    for chunk in dataset_loader.iter_chunks(dataset, chunk_rows or dataset_loader.STREAM_CHUNK_ROWS):
+        if stratify is not None and stratify not in chunk.columns:
+            stratify = None
+        population += len(chunk)
+        distinct += int(seen.first_seen(row_index.row_hashes(chunk)).sum())
+        counts = chunk.isnull().sum()
+        nulls = counts if nulls is None else nulls.add(counts, fill_value=0)
+        for col in chunk.select_dtypes(include=[np.number]).columns:
+            lo, hi = chunk[col].min(), chunk[col].max()
+            if pd.notna(lo):
+                minimum[col] = min(minimum.get(col, lo), lo)
+                maximum[col] = max(maximum.get(col, hi), hi)
+
+        strata = None
+        if stratify is not None:
+            strata = chunk[stratify].astype(str)
+            sizes = strata.value_counts()
+            strata_sizes = sizes if strata_sizes is None else strata_sizes.add(sizes, fill_value=0)
+            if len(strata_sizes) > MAX_STRATA:
+                # Too many groups to stratify on; keep a uniform sample instead.
+                # The smallest keys overall are among each stratum's smallest,
+                # so the rows kept so far still hold the uniform reservoir.
+                stratify, strata_sizes, strata = None, None, None
+                if reservoir.kept is not None:
+                    reservoir.kept = reservoir.kept.drop(columns=["_stratum"])
+        reservoir.update(chunk, strata)
+
+    sample = reservoir.kept if reservoir.kept is not None else pd.DataFrame()
+    if stratify is not None and len(sample):
+        allocation = _allocate(strata_sizes.astype(int), rows)
+        sample = sample[sample.groupby("_stratum", sort=False).cumcount() < sample["_stratum"].map(allocation)]
+    if len(sample):
+        # File order, so row-order dependent output (the scatter chart's first rows) keeps its meaning
+        sample = sample.sort_values("_row")
+    sample = sample.drop(columns=[c for c in ("_key", "_row", "_stratum") if c in sample.columns])
+
+    info = {
+        "method": "stratified" if stratify is not None else "reservoir",
+        "stratified_on": stratify,
+        "seed": seed,
+        "sample_rows": int(len(sample)),
+        "population_rows": int(population),
+        # An upper bound once the hash set is full (see row_index.DEDUP_EXACT_LIMIT)
+        "distinct_rows": int(distinct),
+        "duplicates_exact": seen.exact,
+        "missing_values": {k: int(v) for k, v in (nulls if nulls is not None else pd.Series(dtype=int)).items() if v > 0},
+        "min": minimum,
+        "max": maximum,
+        "strata": {k: int(v) for k, v in strata_sizes.items()} if stratify is not None else None
+    }
+    return sample.reset_index(drop=True), info
+
+
+def _fpc(n: int, population: int) -> float:
+    # Finite population correction: a sample of everything has no sampling error
+    return math.sqrt((population - n) / (population - 1)) if population > 1 else 0.0
+
+
+def _interval(low, high) -> list:
+    return [float(low), float(high)]
+
+
+def _proportion_bounds(count: int, n: int, scale: float, fpc: float) -> list:
+    p = count / n if n else 0.0
+    margin = Z * math.sqrt(p * (1 - p) / n) * fpc if n else 0.0
+    return _interval(max(0.0, p - margin) * n * scale, min(1.0, p + margin) * n * scale)
+
+
+def _quantile_bounds(raw: pd.Series, q: float, fpc: float) -> list:
+    """
+    Order-statistic interval for the q-quantile after median imputation.
+    Imputed values all sit on the median, so the interval is taken on the
+    observed values at the level the q-quantile falls on among them.
+    """
+    values = raw.dropna().to_numpy(dtype=np.float64)
+    n = len(values)
+    missing = 1 - n / len(raw)
+    if q < (1 - missing) / 2:
+        level = q / (1 - missing)
+    elif q > (1 + missing) / 2:
+        level = (q - missing) / (1 - missing)
+    else:
+        level = 0.5
+    margin = Z * math.sqrt(level * (1 - level) / n) * fpc
+    return _interval(*np.quantile(values, [max(0.0, level - margin), min(1.0, level + margin)]))
+
+
+def error_bounds(result: dict, raw: pd.DataFrame, clean: pd.DataFrame, population: int) -> dict:
+    """
+    95% confidence intervals for the statistics estimated from the sample:
+    normal intervals for means and standard deviations, distribution-free
+    order-statistic intervals for quartiles, Fisher-z intervals for
+    correlations and Wald intervals for (population-scaled) counts.
+    `raw` is the de-duplicated sample before imputation.
+    """
+    n = len(clean)
+    fpc = _fpc(n, population)
+    scale = population / n if n else 0.0
+    bounds = {"summary_stats": {}, "correlations": [], "categorical_analysis": {}, "distributions": {}, "fairness_scores": {}}
+
+    for col, stats in result["summary_stats"].items():
+        if col not in result["advanced_stats"] or n < 2:
+            continue
+        mean, std = stats["mean"], stats["std"]
+        kurt = result["advanced_stats"][col]["kurtosis"]
+        se_mean = std / math.sqrt(n) * fpc
+        # Var(s^2) ~ s^4 (2/(n-1) + excess kurtosis/n); delta method for s
+        se_std = std / 2 * math.sqrt(max(0.0, 2 / (n - 1) + (kurt if kurt == kurt else 0.0) / n)) * fpc
+        col_bounds = {
+            "mean": _interval(mean - Z * se_mean, mean + Z * se_mean),
+            "std": _interval(max(0.0, std - Z * se_std), std + Z * se_std)
+        }
+        if raw[col].notna().any():
+            for label, q in (("25%", 0.25), ("50%", 0.5), ("75%", 0.75)):
+                col_bounds[label] = _quantile_bounds(raw[col], q, fpc)
+        bounds["summary_stats"][col] = col_bounds
+
+    if n > 3:
+        se = 1 / math.sqrt(n - 3) * fpc
+        for cell in result["correlations"].get("matrix", []):
+            r = cell["value"]
+            if cell["x"] == cell["y"] or r != r:
+                continue
+            z = math.atanh(max(-0.999999, min(0.999999, r)))
+            bounds["correlations"].append({"x": cell["x"], "y": cell["y"], "value": _interval(math.tanh(z - Z * se), math.tanh(z + Z * se))})
+
+    for col, counts in result["categorical_analysis"].items():
+        bounds["categorical_analysis"][col] = {
+            value: _proportion_bounds(count, n, scale, fpc)
+            for value, count in counts.items()
+        }
+    for col, bins in result["distributions"].items():
+        bounds["distributions"][col] = [
+            _proportion_bounds(b["count"], n, scale, fpc) for b in bins
+        ]
+
+    for col, score in result["fairness_scores"].items():
+        shares = clean[col].value_counts(normalize=True)
+        shares = shares[shares > 0]
+        # The score moves with the largest share's deviation; bound it by that share's error
+        margin = Z * math.sqrt(float((shares * (1 - shares)).max()) / n) * fpc if n and len(shares) else 0.0
+        bounds["fairness_scores"][col] = _interval(max(0.0, score - margin * 100), min(100.0, score + margin * 100))
+
+    return bounds
+
+
+def perform_fast_analysis(dataset, rows: int = FAST_SAMPLE_ROWS, stratify: str = None, stored_guardrails=None) -> dict:
+    """
+    perform_analysis' output computed on a sample, with `approximation`
+    describing the error. `stored_guardrails`, the version's recorded
+    guardrail findings, are exact and replace the sample's.
+    """
+    from .analysis_service import FAIRNESS_KEYWORDS, analyse_frame
+
+    if stratify is None:
+        # Stratify on the first categorical sensitive column so fairness scores keep every group
+        head = dataset_loader.load_head(dataset, 1000)
+        columns = head.select_dtypes(include=['object', 'category']).columns
+        stratify = next((c for c in columns if any(k in c.lower() for k in FAIRNESS_KEYWORDS)), None)
+    seed = int(dataset.content_hash[:8], 16) if dataset.content_hash else 0
+    with instrumentation.stage("sample"):
+        sample, info = sample_dataset(dataset, rows, stratify, seed)
+    population = info["population_rows"]
+    exact = info["sample_rows"] == population
+
+    result, clean, _ = analyse_frame(sample, dataset.filename, stored_guardrails=stored_guardrails)
+    bounds = {}
+    scale = 1.0
+    if not exact:
+        rows = _population_rows(result, population, info["distinct_rows"])
+        scale = rows / len(clean) if len(clean) else 0.0
+        with instrumentation.stage("error_bounds"):
+            bounds = error_bounds(result, sample.drop_duplicates(), clean, rows)
+            if stored_guardrails is not None:
+                # Fairness scores of the whole dataset: no sampling error
+                bounds["fairness_scores"] = {col: _interval(score, score) for col, score in result["fairness_scores"].items()}
+        _scale_counts(result, scale)
+        # What the sampling pass measured exactly replaces the sample's figures
+        result["dataset_info"]["missing_values"] = info["missing_values"]
+        for col, stats in result["summary_stats"].items():
+            if col in info["min"]:
+                stats["min"] = float(info["min"][col])
+                stats["max"] = float(info["max"][col])
+
+    result["approximation"] = {
+        "mode": "fast",
+        "exact": exact,
+        "confidence": CONFIDENCE,
+        **{k: info[k] for k in ("method", "stratified_on", "seed", "sample_rows", "population_rows", "duplicates_exact")},
+        "scale": scale,
+        "error_bounds": bounds
+    }
+    return result
+
+
+def _population_rows(result: dict, population: int, distinct: int) -> int:
+    """Fills in the row counts the sampling pass measured; returns the rows left after de-duplication."""
+    info = result["dataset_info"]
+    info.update({"initial_rows": population, "duplicates_removed": population - distinct, "rows": distinct})
+    result["data_card"]["rows"] = info["rows"]
+    return info["rows"]
+
+
+def _scale_counts(result: dict, scale: float):
+    """Counts over the (de-duplicated) sample become population estimates."""
+    for stats in result["summary_stats"].values():
+        if "count" in stats:
+            stats["count"] = float(round(stats["count"] * scale))
+    for col, counts in result["categorical_analysis"].items():
+        result["categorical_analysis"][col] = {value: int(round(count * scale)) for value, count in counts.items()}
+    for bins in result["distributions"].values():
+        for b in bins:
+            b["count"] = int(round(b["count"] * scale))
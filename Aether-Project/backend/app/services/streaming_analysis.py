@@ -0,0 +1,631 @@
+"""
+Single-pass, bounded-memory version of perform_analysis for datasets too
+large to load whole.
+
+The dataset is read chunk by chunk (see dataset_loader.iter_chunks) and each
+chunk is folded into small mergeable summaries, so memory depends on the
+number of columns and the sketch sizes, not on the number of rows:
+
+- moments (count, mean, M2, M3, M4, min, max) are merged with the parallel
+  Welford/Pebay update, giving exact mean, std, skewness and kurtosis;
+- Pearson correlations come from streamed cross-product sums;
+- quantiles come from a compacting quantile sketch (KLL-style) of SKETCH_K
+  items per level;
+- histograms and outlier counts come from HISTOGRAM_BINS fixed-width bins
+  whose width doubles whenever the range has to grow;
+- categorical counts use a Misra-Gries heavy-hitter summary of
+  HEAVY_HITTERS entries per column, distinct counts a k-minimum-values sketch;
+- duplicates are dropped using 64-bit row hashes.
+
+As in perform_analysis, duplicates are removed and missing values imputed
+(numeric median, otherwise mode) before anything is computed. Medians and
+modes are only known at the end, so imputed values are added to each summary
+as one weighted block instead of row by row.
+
+Approximations (reported per run under eda_results["approximation"]):
+
+- quantiles are exact until a column exceeds SKETCH_K values; after that
+  their rank error is bounded by the reported "quantile_rank_error" (a
+  fraction of the row count);
+- histogram and outlier counts are exact while the quantile sketch is;
+  after that they are interpolated inside the one fine bin each 10-bin edge
+  or IQR fence falls in, so they can be off by up to that fine bin's count;
+- value counts are exact until a column has more than HEAVY_HITTERS distinct
+  values; after that each count is low by at most "count_error" and
+  distinct counts are estimates;
+- duplicate detection is exact until row_index.DEDUP_EXACT_LIMIT distinct
+  rows have been seen; rows after that are only checked against the hashes
+  already kept, so "duplicates_removed" becomes a lower bound;
+- column types are taken from the first chunk, and the PII check samples it.
+"""
+import os
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from . import dataset_loader, metrics, row_index
+
+SKETCH_K = int(os.getenv("AETHER_STREAM_SKETCH_K", "2048"))
+HEAVY_HITTERS = int(os.getenv("AETHER_STREAM_HEAVY_HITTERS", "1000"))
+DISTINCT_K = 1024
+HISTOGRAM_BINS = 1024  # fine bins per numeric column, re-binned to 10 at the end
+
+# Smallest group keys kept for the bar chart (the exact path shows the first 10)
+_CHART_GROUPS = 10
+_SCATTER_ROWS = 50
+
+
+class QuantileSketch:
+    """
+    Compacting quantile sketch. Level h holds items that each stand for 2**h
+    values; a full level is sorted and every other item (random offset) is
+    promoted. Nothing is compacted until a level exceeds k items, so small
+    columns stay exact.
+    """
+
+    def __init__(self, k: int = SKETCH_K, seed: int = 0):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.n = 0
+        self.error = 0  # worst-case rank error added by compactions
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values: np.ndarray):
+        if len(values) == 0:
+            return
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.n += len(values)
+        h = 0
+        while h < len(self.levels):
+            if len(self.levels[h]) > self.k:
+                items = np.sort(self.levels[h])
+                keep = items[len(items) - len(items) % 2:]  # odd item out stays at this level
+                items = items[:len(items) - len(keep)]
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], items[self._rng.integers(2)::2]])
+                self.levels[h] = keep
+                self.error += 2 ** h
+            h += 1
+
+    def items(self, extra_value: float = np.nan, extra_weight: int = 0):
+        """Sorted items and their weights, optionally with one extra weighted value."""
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2 ** h, dtype=np.int64) for h, level in enumerate(self.levels)])
+        if extra_weight and not np.isnan(extra_value):
+            values = np.append(values, extra_value)
+            weights = np.append(weights, extra_weight)
+        order = np.argsort(values, kind='stable')
+        return values[order], weights[order]
+
+    @staticmethod
+    def quantile(values: np.ndarray, weights: np.ndarray, q: float) -> float:
+        """Linear interpolation between ranks, as pandas does on sorted data."""
+        total = weights.sum()
+        if total == 0:
+            return np.nan
+        cumulative = np.cumsum(weights)
+        position = q * (total - 1)
+        lower, upper = int(np.floor(position)), int(np.ceil(position))
+        low = values[np.searchsorted(cumulative, lower, side='right')]
+        high = values[np.searchsorted(cumulative, upper, side='right')]
+        return float(low + (position - lower) * (high - low))
+
+
+class StreamingHistogram:
+    """
+    Fixed-width histogram whose range grows as data arrives: when a value
+    falls outside, neighbouring bins are merged pairwise (doubling the width)
+    until it fits. Counts are exact per bin; only the final re-binning onto
+    the exact min/max interpolates inside the fine bin each edge falls in.
+    """
+
+    def __init__(self, bins: int = HISTOGRAM_BINS):
+        self.bins = bins
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.lo = None
+        self.width = None
+
+    def update(self, values: np.ndarray, weight: int = 1):
+        if len(values) == 0:
+            return
+        low, high = values.min(), values.max()
+        if self.lo is None:
+            self.lo = low
+            self.width = (high - low) / self.bins if high > low else max(abs(low), 1.0) / self.bins
+        while low < self.lo:
+            self._widen(left=True)
+        while high >= self.lo + self.width * self.bins:
+            self._widen(left=False)
+        idx = np.clip(((values - self.lo) / self.width).astype(np.int64), 0, self.bins - 1)
+        self.counts += np.bincount(idx, minlength=self.bins) * weight
+
+    def _widen(self, left: bool):
+        merged = self.counts.reshape(-1, 2).sum(axis=1)
+        half = np.zeros(self.bins // 2, dtype=np.int64)
+        if left:
+            self.lo -= self.width * self.bins
+            self.counts = np.concatenate([half, merged])
+        else:
+            self.counts = np.concatenate([merged, half])
+        self.width *= 2
+
+    def cdf(self, x: np.ndarray) -> np.ndarray:
+        """Number of values below each x, interpolating inside a fine bin."""
+        edges = self.lo + self.width * np.arange(self.bins + 1)
+        cumulative = np.concatenate([[0], np.cumsum(self.counts)])
+        return np.interp(x, edges, cumulative)
+
+    def histogram(self, low: float, high: float, bins: int = 10):
+        """Counts and edges over [low, high], like np.histogram(values, bins)."""
+        total = int(self.counts.sum())
+        if total == 0:
+            return np.histogram(np.empty(0), bins=bins)
+        if low == high:
+            return np.histogram(np.array([low]), bins=bins, weights=np.array([total]))
+        edges = np.linspace(low, high, bins + 1)
+        cumulative = np.round(self.cdf(edges))
+        cumulative[0], cumulative[-1] = 0, total
+        return np.diff(cumulative).astype(np.int64), edges
+
+
+class HeavyHitters:
+    """Misra-Gries summary: exact counts until more than `capacity` values are seen."""
+
+    def __init__(self, capacity: int = HEAVY_HITTERS):
+        self.capacity = capacity
+        self.counts = {}
+        self.error = 0  # every count is low by at most this much
+
+    def update(self, counts: pd.Series):
+        for value, count in counts[counts > 0].items():
+            self.counts[value] = self.counts.get(value, 0) + int(count)
+        if len(self.counts) > self.capacity:
+            cut = sorted(self.counts.values(), reverse=True)[self.capacity]
+            self.error += cut
+            self.counts = {value: count - cut for value, count in self.counts.items() if count > cut}
+
+    def mode(self):
+        if not self.counts:
+            return None
+        top = max(self.counts.values())
+        candidates = [value for value, count in self.counts.items() if count == top]
+        try:
+            return min(candidates)  # pandas' mode()[0] is the smallest of the tied values
+        except TypeError:
+            return candidates[0]
+
+    def value_counts(self, extra_value=None, extra_count: int = 0) -> pd.Series:
+        counts = dict(self.counts)
+        if extra_value is not None and extra_count:
+            counts[extra_value] = counts.get(extra_value, 0) + extra_count
+        # Highest count first; ties keep first-seen order like value_counts
+        ordered = sorted(counts.items(), key=lambda item: -item[1])
+        return pd.Series(dict(ordered), dtype='int64')
+
+
+class DistinctCounter:
+    """K-minimum-values distinct count estimate; exact below k distinct values."""
+
+    def __init__(self, k: int = DISTINCT_K):
+        self.k = k
+        self.smallest = np.empty(0, dtype=np.uint64)
+
+    def update(self, values: pd.Series):
+        hashes = pd.util.hash_array(values.dropna().to_numpy())
+        self.smallest = np.union1d(self.smallest, hashes)[:self.k]
+
+    def estimate(self) -> int:
+        if len(self.smallest) < self.k:
+            return len(self.smallest)
+        return int((self.k - 1) / (float(self.smallest[-1]) / 2.0 ** 64))
+
+
+class _Moments:
+    """Vectorised count/mean/M2/M3/M4/min/max per column, merged with the Pebay formulas."""
+
+    def __init__(self, k: int):
+        self.n = np.zeros(k)
+        self.mean = np.zeros(k)
+        self.m2 = np.zeros(k)
+        self.m3 = np.zeros(k)
+        self.m4 = np.zeros(k)
+        self.min = np.full(k, np.nan)
+        self.max = np.full(k, np.nan)
+
+    def update(self, X: np.ndarray, missing: np.ndarray):
+        n = (~missing).sum(axis=0).astype(float)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(missing, 0.0, X).sum(axis=0) / n
+            dev = np.where(missing, 0.0, X - mean)
+        self.merge(n, np.nan_to_num(mean), (dev ** 2).sum(axis=0), (dev ** 3).sum(axis=0), (dev ** 4).sum(axis=0))
+        self.min = np.fmin(self.min, np.nanmin(np.where(missing, np.inf, X), axis=0, initial=np.inf))
+        self.max = np.fmax(self.max, np.nanmax(np.where(missing, -np.inf, X), axis=0, initial=-np.inf))
+        self.min[np.isinf(self.min)] = np.nan
+        self.max[np.isinf(self.max)] = np.nan
+
+    def merge(self, nb, mb, m2b, m3b, m4b):
+        na, ma, m2a, m3a, m4a = self.n, self.mean, self.m2, self.m3, self.m4
+        n = na + nb
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta = mb - ma
+            mean = ma + delta * nb / n
+            m2 = m2a + m2b + delta ** 2 * na * nb / n
+            m3 = (m3a + m3b + delta ** 3 * na * nb * (na - nb) / n ** 2
+                  + 3 * delta * (na * m2b - nb * m2a) / n)
+            m4 = (m4a + m4b + delta ** 4 * na * nb * (na ** 2 - na * nb + nb ** 2) / n ** 3
+                  + 6 * delta ** 2 * (na ** 2 * m2b + nb ** 2 * m2a) / n ** 2
+                  + 4 * delta * (na * m3b - nb * m3a) / n)
+        empty = n == 0
+        self.n = n
+        self.mean = np.where(empty, 0.0, mean)
+        self.m2 = np.where(empty, 0.0, m2)
+        self.m3 = np.where(empty, 0.0, m3)
+        self.m4 = np.where(empty, 0.0, m4)
+
+    def std(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.n > 1, np.sqrt(self.m2 / (self.n - 1)), np.nan)
+
+    def skew(self):
+        # Same adjusted Fisher-Pearson estimator as pandas' Series.skew
+        n = self.n
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result = n * np.sqrt(n - 1) / (n - 2) * self.m3 / self.m2 ** 1.5
+        result = np.where(self.m2 == 0, 0.0, result)
+        return np.where(n < 3, np.nan, result)
+
+    def kurt(self):
+        # Same bias-corrected excess kurtosis as pandas' Series.kurt
+        n = self.n
+        with np.errstate(invalid='ignore', divide='ignore'):
+            numerator = n * (n + 1) * (n - 1) * self.m4
+            denominator = (n - 2) * (n - 3) * self.m2 ** 2
+            result = numerator / denominator - 3 * (n - 1) ** 2 / ((n - 2) * (n - 3))
+        result = np.where(denominator == 0, 0.0, result)
+        return np.where(n < 4, np.nan, result)
+
+
+class _CrossProducts:
+    """
+    Streamed sums for Pearson correlation after median imputation.
+
+    Values are shifted by a per-column constant (the first chunk's mean) to
+    keep the sums well conditioned. Missing cells count as zero, and the
+    products with the missing-value mask are kept so the imputed median can
+    be added in once it is known.
+    """
+
+    def __init__(self, shift: np.ndarray):
+        k = len(shift)
+        self.shift = shift
+        self.sum = np.zeros(k)
+        self.xx = np.zeros((k, k))
+        self.xz = np.zeros((k, k))
+        self.zz = np.zeros((k, k))
+        self.n = 0
+
+    def update(self, X: np.ndarray, missing: np.ndarray):
+        Y = np.where(missing, 0.0, X - self.shift)
+        Z = missing.astype(float)
+        self.sum += Y.sum(axis=0)
+        self.xx += Y.T @ Y
+        self.xz += Y.T @ Z
+        self.zz += Z.T @ Z
+        self.n += len(X)
+
+    def correlation(self, medians: np.ndarray) -> np.ndarray:
+        d = medians - self.shift
+        nz = np.diag(self.zz)
+        total = self.sum + d * nz
+        products = self.xx + self.xz * d[None, :] + self.xz.T * d[:, None] + np.outer(d, d) * self.zz
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cov = products - np.outer(total, total) / self.n
+            scale = np.sqrt(np.outer(np.diag(cov), np.diag(cov)))
+            corr = np.where(scale > 0, cov / scale, np.nan)
+        corr = np.clip(corr, -1.0, 1.0)
+        # Columns with no values at all stay NaN after imputation
+        corr[np.isnan(medians), :] = np.nan
+        corr[:, np.isnan(medians)] = np.nan
+        return corr
+
+
+def _numeric_columns(df: pd.DataFrame) -> List[str]:
+    return [col for col in df.columns
+            if pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col])]
+
+
+def _as_float(chunk: pd.DataFrame, columns: List[str]) -> np.ndarray:
+    if not columns:
+        return np.empty((len(chunk), 0))
+    return np.column_stack([pd.to_numeric(chunk[col], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+                            for col in columns])
+
+
+def perform_streaming_analysis(dataset, chunk_rows: Optional[int] = None, progress=None, stored_guardrails=None) -> dict:
+    """
+    Same result layout as analysis_service.perform_analysis, computed in one
+    pass over the dataset. See the module docstring for what is approximate.
+    `progress(stage, fraction)` is called as chunks are read when the row count is known.
+    `stored_guardrails`, the version's recorded guardrail findings, replace the streamed ones.
+    """
+    from .analysis_service import detect_pii, bias_warning, BIAS_KEYWORDS, FAIRNESS_KEYWORDS
+    from .metric_service import representation_score
+    from .insights_service import generate_insights_from_summary, calculate_data_health_score
+
+    chunks = dataset_loader.iter_chunks(dataset, chunk_rows or dataset_loader.STREAM_CHUNK_ROWS)
+    first = next(chunks, None)
+    if first is None:
+        first = dataset_loader.read_file(dataset.filepath, nrows=0)
+
+    columns = list(first.columns)
+    numeric_cols = _numeric_columns(first)
+    categorical_cols = first.select_dtypes(include=['object', 'category']).columns.tolist()
+    date_cols = first.select_dtypes(include=['datetime64']).columns.tolist()
+    fairness_cols = [col for col in columns if any(k in col.lower() for k in FAIRNESS_KEYWORDS)]
+    counted_cols = list(dict.fromkeys(categorical_cols + fairness_cols))
+
+    seen = row_index.SeenRows()
+    moments = _Moments(len(numeric_cols))
+    sketches = {col: QuantileSketch() for col in numeric_cols}
+    histograms = {col: StreamingHistogram() for col in numeric_cols}
+    heavy = {col: HeavyHitters() for col in counted_cols}
+    distinct = {col: DistinctCounter() for col in categorical_cols}
+    missing_counts = pd.Series(0, index=columns, dtype='int64')
+    initial_rows = 0
+    rows = 0
+    latest_date = None
+    cross = None
+    pii_sample = None
+    scatter_rows = []
+    chart_cat = categorical_cols[0] if categorical_cols else None
+    chart_num = numeric_cols[0] if numeric_cols else None
+    chart_groups = None  # key -> [sum of values, values, missing values]
+    chart_null_group = np.zeros(3)  # rows whose key is missing join the mode's group
+    chunk_count = 0
+
+    for chunk in _chain(first, chunks):
+        chunk_count += 1
+        initial_rows += len(chunk)
+        metrics.inc(metrics.ANALYSIS_ROWS, len(chunk))
+        if progress and getattr(dataset, "row_count", None):
+            progress("streaming", 0.9 * min(1.0, initial_rows / dataset.row_count))
+        if len(chunk) == 0:
+            continue
+        X = _as_float(chunk, numeric_cols)
+        hashed = chunk.copy(deep=False)
+        for i, col in enumerate(numeric_cols):
+            hashed[col] = X[:, i]
+        keep = seen.first_seen(pd.util.hash_pandas_object(hashed, index=False).to_numpy())
+        chunk, X = chunk[keep], X[keep]
+        rows += len(chunk)
+        if len(chunk) == 0:
+            continue
+        missing = np.isnan(X)
+
+        if pii_sample is None:
+            pii_sample = chunk
+        missing_counts += chunk.isnull().sum()
+
+        if numeric_cols:
+            if cross is None:
+                with np.errstate(invalid='ignore'):
+                    shift = np.where(missing.all(axis=0), 0.0, np.nanmean(np.where(missing, np.nan, X), axis=0))
+                cross = _CrossProducts(np.nan_to_num(shift))
+            moments.update(X, missing)
+            cross.update(X, missing)
+            for i, col in enumerate(numeric_cols):
+                values = X[~missing[:, i], i]
+                sketches[col].update(values)
+                histograms[col].update(values)
+
+        for col in counted_cols:
+            heavy[col].update(chunk[col].value_counts(dropna=True, sort=False))
+        for col in categorical_cols:
+            distinct[col].update(chunk[col])
+        if date_cols:
+            chunk_max = chunk[date_cols[0]].max()
+            if pd.notna(chunk_max) and (latest_date is None or chunk_max > latest_date):
+                latest_date = chunk_max
+
+        if chart_cat and chart_num:
+            values = X[:, numeric_cols.index(chart_num)]
+            frame = pd.DataFrame({
+                "key": chunk[chart_cat].to_numpy(),
+                "sum": np.nan_to_num(values),
+                "count": ~np.isnan(values),
+                "missing": np.isnan(values)
+            })
+            null_key = frame["key"].isna().to_numpy()
+            chart_null_group += frame.loc[null_key, ["sum", "count", "missing"]].sum().to_numpy(dtype=float)
+            grouped = frame[~null_key].groupby("key", sort=True)[["sum", "count", "missing"]].sum()
+            chart_groups = grouped if chart_groups is None else chart_groups.add(grouped, fill_value=0).sort_index()
+            # Dropped keys are larger than every kept one, so they can never be needed again
+            chart_groups = chart_groups.head(_CHART_GROUPS)
+        elif len(numeric_cols) >= 2 and sum(map(len, scatter_rows)) < _SCATTER_ROWS:
+            scatter_rows.append(X[:_SCATTER_ROWS - sum(map(len, scatter_rows)), :2])
+
+    duplicates = initial_rows - rows
+
+    # Imputation values, then every summary with the imputed block folded in
+    medians = {}
+    for col in numeric_cols:
+        values, weights = sketches[col].items()
+        medians[col] = QuantileSketch.quantile(values, weights, 0.5)
+    modes = {col: heavy[col].mode() for col in counted_cols}
+    median_arr = np.array([medians[col] for col in numeric_cols])
+    nulls = np.array([missing_counts[col] for col in numeric_cols], dtype=float)
+    filled = np.where(np.isnan(median_arr), 0.0, nulls)
+    moments.merge(filled, np.nan_to_num(median_arr), np.zeros_like(filled), np.zeros_like(filled), np.zeros_like(filled))
+
+    eda_results = {
+        "dataset_info": {
+            "rows": rows,
+            "columns": len(columns),
+            "initial_rows": int(initial_rows),
+            "duplicates_removed": int(duplicates),
+            "missing_values": {k: int(v) for k, v in missing_counts.items() if v > 0}
+        },
+        "columns": columns,
+        "summary_stats": {},
+        "categorical_analysis": {},
+        "advanced_stats": {},
+        "correlations": {},
+        "distributions": {}
+    }
+
+    def imputed_counts(col):
+        mode = modes[col] if col not in medians else medians[col]
+        return heavy[col].value_counts(mode, int(missing_counts[col]))
+
+    for col in categorical_cols:
+        eda_results["categorical_analysis"][col] = imputed_counts(col).head(5).to_dict()
+
+    outliers = {}
+    for i, col in enumerate(numeric_cols):
+        values, weights = sketches[col].items(medians[col], int(missing_counts[col]))
+        quantiles = {q: QuantileSketch.quantile(values, weights, q) for q in (0.25, 0.5, 0.75)}
+        eda_results["summary_stats"][col] = {
+            "count": float(moments.n[i]),
+            "mean": float(moments.mean[i]) if moments.n[i] else np.nan,
+            "std": float(moments.std()[i]),
+            "min": float(moments.min[i]),
+            "25%": quantiles[0.25],
+            "50%": quantiles[0.5],
+            "75%": quantiles[0.75],
+            "max": float(moments.max[i])
+        }
+        eda_results["advanced_stats"][col] = {
+            "skewness": round(float(moments.skew()[i]), 2),
+            "kurtosis": round(float(moments.kurt()[i]), 2),
+            "quantiles": {"25%": quantiles[0.25], "50%": quantiles[0.5], "75%": quantiles[0.75]}
+        }
+        if not np.isnan(medians[col]):
+            histograms[col].update(np.array([medians[col]]), weight=int(missing_counts[col]))
+        if sketches[col].error == 0:
+            # Nothing compacted yet: the sketch still holds every value
+            counts, bin_edges = np.histogram(values, bins=10, weights=weights) if len(values) else np.histogram(values, bins=10)
+        else:
+            counts, bin_edges = histograms[col].histogram(moments.min[i], moments.max[i])
+        eda_results["distributions"][col] = [
+            {"range": f"{round(bin_edges[j], 1)} - {round(bin_edges[j+1], 1)}", "count": int(round(counts[j]))}
+            for j in range(len(counts))
+        ]
+        if i < 3:
+            iqr = quantiles[0.75] - quantiles[0.25]
+            low, high = quantiles[0.25] - 1.5 * iqr, quantiles[0.75] + 1.5 * iqr
+            if sketches[col].error == 0:
+                outliers[col] = int(weights[(values < low) | (values > high)].sum())
+            else:
+                below, above = histograms[col].cdf(np.array([low, high]))
+                outliers[col] = int(round(below + moments.n[i] - above))
+
+    if not numeric_cols:
+        # describe() on a frame without numbers summarises the text columns instead
+        for col in categorical_cols:
+            counts = imputed_counts(col)
+            eda_results["summary_stats"][col] = {
+                "count": rows if len(counts) else 0,
+                "unique": distinct[col].estimate(),
+                "top": counts.index[0] if len(counts) else np.nan,
+                "freq": int(counts.iloc[0]) if len(counts) else np.nan
+            }
+
+    if numeric_cols:
+        corr = np.round(cross.correlation(median_arr), 2) if cross is not None else np.full((len(numeric_cols),) * 2, np.nan)
+        eda_results["correlations"] = {
+            "matrix": [
+                {"x": col, "y": row, "value": float(corr[i, j])}
+                for i, row in enumerate(numeric_cols)
+                for j, col in enumerate(numeric_cols)
+            ],
+            "variables": numeric_cols
+        }
+
+    # Ethical guardrails from the counted columns (and a sample for PII)
+    if stored_guardrails is not None:
+        from .guardrails import sections
+        eda_results.update(sections(stored_guardrails))
+    else:
+        eda_results["pii_warnings"] = detect_pii(pii_sample if pii_sample is not None else first)
+        eda_results["bias_warnings"] = []
+        for col in categorical_cols:
+            if any(keyword in col.lower() for keyword in BIAS_KEYWORDS):
+                warning = bias_warning(col, imputed_counts(col))
+                if warning:
+                    eda_results["bias_warnings"].append(warning)
+        eda_results["fairness_scores"] = {
+            col: round(representation_score(imputed_counts(col)) * 100, 1) for col in fairness_cols
+        }
+
+    eda_results["data_card"] = {
+        "source": dataset.filename,
+        "rows": rows,
+        "columns": len(columns),
+        "pii_detected": len(eda_results["pii_warnings"]) > 0,
+        "bias_detected": len(eda_results["bias_warnings"]) > 0,
+        "cleaning_steps": ["Dropped Duplicates", "Imputed Missing Values"]
+    }
+
+    if chart_cat and chart_num:
+        groups = chart_groups if chart_groups is not None else pd.DataFrame(columns=["sum", "count", "missing"])
+        mode = modes[chart_cat]
+        if mode is not None and chart_null_group.any():
+            groups = groups.add(pd.DataFrame([chart_null_group], index=[mode], columns=groups.columns),
+                                fill_value=0).sort_index()
+        median = medians[chart_num]
+        filled_sum = groups["sum"] + groups["missing"] * (0.0 if np.isnan(median) else median)
+        filled_count = groups["count"] + (0 if np.isnan(median) else groups["missing"])
+        means = (filled_sum / filled_count).head(_CHART_GROUPS)
+        eda_results["visualization"] = {
+            "type": "bar",
+            "x_axis": chart_cat,
+            "y_axis": chart_num,
+            "data": [{chart_cat: key, chart_num: float(value)} for key, value in means.items()]
+        }
+    elif len(numeric_cols) >= 2:
+        sample = np.concatenate(scatter_rows) if scatter_rows else np.empty((0, 2))
+        sample = np.where(np.isnan(sample), median_arr[:2], sample)
+        eda_results["visualization"] = {
+            "type": "scatter",
+            "x_axis": numeric_cols[0],
+            "y_axis": numeric_cols[1],
+            "data": [{numeric_cols[0]: float(x), numeric_cols[1]: float(y)} for x, y in sample]
+        }
+
+    summary = {
+        "row_count": rows,
+        "variances": {col: float(moments.std()[i] ** 2) for i, col in enumerate(numeric_cols)},
+        "categorical": [],
+        "outliers": outliers,
+        "latest_date": latest_date
+    }
+    for col in categorical_cols[:2]:
+        unique_count = distinct[col].estimate()
+        top_value = modes[col] if unique_count / max(rows, 1) < 0.1 else None
+        summary["categorical"].append({
+            "column": col,
+            "unique_count": unique_count,
+            "top_value": top_value,
+            "top_count": int(imputed_counts(col).get(top_value, 0)) if top_value is not None else 0
+        })
+    eda_results["auto_insights"] = generate_insights_from_summary(summary, eda_results)
+    eda_results["health_scores"] = calculate_data_health_score(eda_results)
+
+    eda_results["approximation"] = {
+        "mode": "stream",
+        "chunks": chunk_count,
+        "quantile_rank_error": max([sketches[col].error / max(sketches[col].n, 1) for col in numeric_cols], default=0.0),
+        "count_error": max([heavy[col].error for col in counted_cols], default=0),
+        "duplicates_exact": seen.exact,
+        "exact": not any(sketches[col].error for col in numeric_cols)
+                 and not any(heavy[col].error for col in counted_cols)
+                 and seen.exact
+    }
+    return eda_results
+
+
+def _chain(first, rest):
+    yield first
+    yield from rest
@@ -0,0 +1 @@
+"""Performance benchmarks for the analytics hot paths (run from the backend directory)."""
@@ -0,0 +1,78 @@
+"""
+Full corr() matrix walked cell by cell (what discover_correlations did
+before) versus the blockwise top-k search, for a growing number of
+numeric columns.
+
+    python -m benchmarks.bench_correlations --rows 2000 --columns 100 1000 5000
+
+The legacy walk takes minutes past a few thousand columns; it is skipped
+above --legacy-max-columns and reported as null.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+
+from benchmarks import synthetic
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def legacy_top(df: pd.DataFrame, threshold: float = 0.5, k: int = 5):
+    numeric_cols = df.columns.tolist()
+    corr_matrix = df[numeric_cols].corr()
+    found = []
+    for i in range(len(numeric_cols)):
+        for j in range(i + 1, len(numeric_cols)):
+            corr_value = corr_matrix.iloc[i, j]
+            if abs(corr_value) >= threshold:
+                found.append((numeric_cols[i], numeric_cols[j], round(corr_value, 3)))
+    return sorted(found, key=lambda x: abs(x[2]), reverse=True)[:k]
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2_000)
+    parser.add_argument("--columns", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--legacy-max-columns", type=int, default=1000)
+    args = parser.parse_args()
+
+    sys.path.insert(0, BACKEND_DIR)
+    from app.services.correlation_search import top_correlations
+
+    results = []
+    for columns in args.columns:
+        # Measures driven by a few shared factors, so some pairs correlate strongly
+        df = synthetic.numeric_frame(args.rows, columns)
+        pearson = timed(lambda: top_correlations(df, k=5, min_abs=0.5, decimals=3), args.repeat)
+        spearman = timed(lambda: top_correlations(df, k=5, method="spearman", min_abs=0.5, decimals=3), args.repeat)
+        legacy = timed(lambda: legacy_top(df), args.repeat) if columns <= args.legacy_max_columns else None
+        results.append({
+            "rows": args.rows,
+            "columns": columns,
+            "legacy_seconds": legacy,
+            "blockwise_pearson_seconds": pearson,
+            "blockwise_spearman_seconds": spearman,
+            "speedup": legacy / pearson if legacy is not None else None
+        })
+        legacy_text = f"{legacy:8.3f}s" if legacy is not None else "  skipped"
+        print(f"{columns:6} cols  legacy {legacy_text}  pearson {pearson:8.3f}s  spearman {spearman:8.3f}s")
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
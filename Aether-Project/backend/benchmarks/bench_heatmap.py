@@ -0,0 +1,89 @@
+"""
+Size and serialisation time of the correlation heatmap in each wire format:
+the per-cell list (default), and heatmap=compact in both layouts, as floats
+and quantised to 2 decimals.
+
+    python -m benchmarks.bench_heatmap --rows 2000 --columns 50 300 1000
+
+Serialisation is timed both as json.dumps and as FastAPI does it
+(jsonable_encoder, then json.dumps), since the routes return plain dicts.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+
+from benchmarks import synthetic
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def legacy_cells(corr_matrix: pd.DataFrame) -> list:
+    """The heatmap as analyse_frame built it before (an .iloc lookup per cell)."""
+    heatmap_data = []
+    for i, row in enumerate(corr_matrix.index):
+        for j, col in enumerate(corr_matrix.columns):
+            heatmap_data.append({"x": col, "y": row, "value": float(corr_matrix.iloc[i, j])})
+    return heatmap_data
+
+
+def vectorised_cells(corr_matrix: pd.DataFrame) -> list:
+    return [
+        {"x": col, "y": row, "value": value}
+        for row, values in zip(corr_matrix.index, corr_matrix.to_numpy(dtype=float).tolist())
+        for col, value in zip(corr_matrix.columns, values)
+    ]
+
+
+def timed(fn, repeat: int):
+    best, output = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, output
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2_000)
+    parser.add_argument("--columns", type=int, nargs="+", default=[50, 300, 1000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    sys.path.insert(0, BACKEND_DIR)
+    from fastapi.encoders import jsonable_encoder
+    from app.services.correlation_format import compact_correlations
+
+    results = []
+    for columns in args.columns:
+        corr_matrix = synthetic.numeric_frame(args.rows, columns).corr().round(2)
+        legacy_build, _ = timed(lambda: legacy_cells(corr_matrix), 1)
+        cells_build, cells = timed(lambda: vectorised_cells(corr_matrix), args.repeat)
+        correlations = {"matrix": cells, "variables": corr_matrix.columns.tolist()}
+
+        variants = {"cells": (0.0, correlations)}
+        for layout in ("full", "upper"):
+            for decimals in (None, 2):
+                name = f"compact_{layout}" + ("_q2" if decimals is not None else "")
+                variants[name] = timed(lambda: compact_correlations(correlations, layout, decimals), args.repeat)
+
+        entry = {"rows": args.rows, "columns": columns, "legacy_build_seconds": legacy_build,
+                 "cells_build_seconds": cells_build, "formats": {}}
+        print(f"{columns} columns: cells built in {cells_build:.3f}s (per-cell .iloc: {legacy_build:.3f}s)")
+        for name, (build, payload) in variants.items():
+            dumps, text = timed(lambda: json.dumps(payload), args.repeat)
+            encoded, _ = timed(lambda: json.dumps(jsonable_encoder(payload)), args.repeat)
+            entry["formats"][name] = {"bytes": len(text), "build_seconds": build, "dumps_seconds": dumps,
+                                      "fastapi_seconds": encoded}
+            print(f"  {name:18} {len(text) / 1024:10.1f} KiB  build {build:7.4f}s  dumps {dumps:7.4f}s  fastapi {encoded:7.4f}s")
+        results.append(entry)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Compares dataset load time and memory: original CSV/XLSX parsing versus the
+Arrow IPC copy written at ingest (full read and a 2-column projection).
+
+Each measurement runs in a fresh interpreter so RSS is not polluted by
+earlier runs (Linux only: RSS is read from /proc).
+
+    python -m benchmarks.bench_load --rows 200000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+_CHILD = """
+import json, os, sys, time
+sys.path.insert(0, {backend!r})
+from app.services import dataset_loader
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+before = rss_mb()
+start = time.perf_counter()
+if {columnar!r}:
+    df = dataset_loader.read_columnar({path!r}, columns={columns!r})
+else:
+    df = dataset_loader.read_file({path!r}, columns={columns!r})
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "rss_delta_mb": rss_mb() - before, "shape": list(df.shape)}}))
+"""
+
+
+def make_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "id": np.arange(rows),
+        "score": rng.normal(70, 10, rows).round(2),
+        "amount": rng.exponential(100, rows).round(2),
+        "visits": rng.integers(0, 50, rows),
+        "region": rng.choice(["north", "south", "east", "west"], rows),
+        "segment": rng.choice(["a", "b", "c"], rows),
+        "email": [f"user{i}@example.com" for i in range(rows)],
+    })
+
+
+def measure(path: str, columnar: bool, columns=None) -> dict:
+    code = _CHILD.format(backend=BACKEND_DIR, path=path, columnar=columnar, columns=columns)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--xlsx-rows", type=int, default=20_000, help="openpyxl is slow; keep this smaller")
+    args = parser.parse_args()
+
+    sys.path.insert(0, BACKEND_DIR)
+    from app.services import dataset_loader
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for ext, rows in ((".csv", args.rows), (".xlsx", args.xlsx_rows)):
+            path = os.path.join(tmp, "bench" + ext)
+            df = make_frame(rows)
+            if ext == ".csv":
+                df.to_csv(path, index=False)
+            else:
+                df.to_excel(path, index=False)
+            columnar_path = dataset_loader.write_columnar(df, path)
+
+            for label, target, is_columnar, columns in (
+                (ext, path, False, None),
+                ("arrow", columnar_path, True, None),
+                ("arrow[score,region]", columnar_path, True, ["score", "region"]),
+            ):
+                result = measure(target, is_columnar, columns)
+                result.update({"source": ext, "reader": label, "rows": rows})
+                results.append(result)
+                print(f"{ext:6} {label:22} {result['seconds']:8.3f}s  rss +{result['rss_delta_mb']:8.1f} MB")
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Per-column pandas statistics (what perform_analysis did before) versus the
+column-batched numeric profiler, for a growing number of numeric columns.
+
+    python -m benchmarks.bench_numeric_profile --rows 20000 --columns 10 100 500 1000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import synthetic
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def per_column(df: pd.DataFrame):
+    """The per-column calls perform_analysis and the insights used to make."""
+    summary = df.describe().to_dict()
+    stats = {}
+    for col in df.columns:
+        series = df[col]
+        q1, q3 = series.quantile(0.25), series.quantile(0.75)
+        iqr = q3 - q1
+        stats[col] = (
+            series.skew(), series.kurt(), series.quantile(0.5), series.var(),
+            ((series < q1 - 1.5 * iqr) | (series > q3 + 1.5 * iqr)).sum(),
+            np.histogram(series.dropna(), bins=10)
+        )
+    return summary, stats
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--columns", type=int, nargs="+", default=[10, 100, 500, 1000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    sys.path.insert(0, BACKEND_DIR)
+    from app.services import dtype_optimizer, numeric_profiler
+
+    results = []
+    for columns in args.columns:
+        # In the narrower dtypes the optimizer gives them at ingest
+        df, _ = dtype_optimizer.optimize(synthetic.numeric_frame(args.rows, columns))
+        loop = timed(lambda: per_column(df), args.repeat)
+        batched = timed(lambda: numeric_profiler.profile_numeric(df), args.repeat)
+        results.append({
+            "rows": args.rows,
+            "columns": columns,
+            "per_column_seconds": loop,
+            "batched_seconds": batched,
+            "speedup": loop / batched
+        })
+        print(f"{columns:6} cols  per-column {loop:8.3f}s  batched {batched:8.3f}s  x{loop / batched:5.1f}")
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Throughput of the PII checks, in rows per second, on synthetic datasets
+(see benchmarks/synthetic.py):
+
+    python -m benchmarks.bench_pii --rows 10000 100000 1000000
+
+  scan_frame   the upload scan (privacy_scanner): every column, exact match counts
+  detect_pii   the analysis check (analysis_service): a 50-value sample per text column
+
+Each is timed against the per-value implementation it replaced
+(Series.apply of re.search for every column and pattern), kept below as
+the reference; the results of the two are checked to be equal. --no-reference
+skips the slow reference runs. Results go to --output
+(benchmarks/results/pii-<UTC time>.json by default).
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import synthetic
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def reference_scan_frame(df: pd.DataFrame, patterns: dict) -> list:
+    warnings = []
+    for col in df.columns:
+        col_data = df[col]
+        if col_data.dtype.kind == "f":
+            # Fractional numbers are measurements, which the scan does not match
+            numbers = col_data.to_numpy(dtype=np.float64, na_value=np.nan)
+            col_data = col_data[~np.isfinite(numbers) | (np.rint(numbers) == numbers)]
+        col_data = col_data.astype(str)
+        for pii_type, pattern in patterns.items():
+            match_count = col_data.apply(lambda x: bool(re.search(pattern, x))).sum()
+            if match_count > 0:
+                warnings.append({"column": col, "type": pii_type, "count": int(match_count),
+                                 "message": f"Column '{col}' contains potential {pii_type} data."})
+    return warnings
+
+
+def reference_detect_pii(df: pd.DataFrame) -> list:
+    email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
+    phone_pattern = r'^\+?1?\d{9,15}$'
+    pii_cols = []
+    for col in df.select_dtypes(include=['object', 'category']):
+        sample = df[col].dropna().astype(str).head(50)
+        if len(sample) == 0:
+            continue
+        if any(sample.apply(lambda x: bool(re.search(email_pattern, x)))):
+            pii_cols.append({"column": col, "type": "Email"})
+        elif any(sample.apply(lambda x: bool(re.search(phone_pattern, re.sub(r'[\s\-\(\)]', '', x))))):
+            pii_cols.append({"column": col, "type": "Phone"})
+    return pii_cols
+
+
+def timed(fn, repeat: int):
+    """(result, median seconds) of `repeat` runs."""
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        seconds.append(time.perf_counter() - start)
+    return result, statistics.median(seconds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-reference", action="store_true", help="skip the per-value reference runs")
+    parser.add_argument("--output", help="results file (default benchmarks/results/pii-<UTC time>.json)")
+    synthetic.add_arguments(parser)
+    args = parser.parse_args()
+
+    sys.path.insert(0, BACKEND_DIR)
+    from app.services import analysis_service, privacy_scanner
+
+    created = datetime.utcnow()
+    output = args.output or os.path.join(BACKEND_DIR, "benchmarks", "results", f"pii-{created:%Y%m%d-%H%M%S}.json")
+    spec = synthetic.spec_from(args)
+    benchmarks = (
+        ("scan_frame", privacy_scanner.scan_frame, lambda df: reference_scan_frame(df, privacy_scanner.PATTERNS)),
+        ("detect_pii", analysis_service.detect_pii, reference_detect_pii),
+    )
+
+    results = []
+    for rows in args.rows:
+        df = synthetic.generate(rows, **spec)
+        for name, fn, reference in benchmarks:
+            result, seconds = timed(lambda: fn(df), args.repeat)
+            entry = {"benchmark": name, "rows": rows, "columns": df.shape[1], "seconds": seconds,
+                     "rows_per_s": rows / seconds if seconds else None}
+            line = f"{rows:>10} rows  {name:12} {seconds:9.4f}s  {entry['rows_per_s']:14,.0f} rows/s"
+            if not args.no_reference:
+                expected, reference_seconds = timed(lambda: reference(df), 1)
+                if expected != result:
+                    raise SystemExit(f"{name} differs from the reference on {rows} rows")
+                entry["reference_seconds"] = reference_seconds
+                entry["reference_rows_per_s"] = rows / reference_seconds if reference_seconds else None
+                line += f"  (reference {reference_seconds:9.4f}s, x{reference_seconds / seconds:.1f})"
+            results.append(entry)
+            print(line)
+
+    report = {
+        "created": created.isoformat() + "Z",
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "dataset": spec,
+        "options": {"repeat": args.repeat},
+        "results": results
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+Benchmarks of the analytics hot paths on synthetic datasets (see
+benchmarks/synthetic.py), written as JSON so runs can be compared.
+
+    python -m benchmarks.bench_suite --rows 1000 100000 1000000
+    python -m benchmarks.bench_suite --rows 100000 --only perform_analysis detect_pii \\
+        --compare benchmarks/results/suite-20260101-120000.json
+
+Each dataset is uploaded through the API into a scratch directory and
+database (nothing of the working tree is touched), then:
+
+  perform_analysis          no stored result (the compute workers' frame cache may be warm after the first run)
+  perform_analysis_cached   the stored result is served
+  generate_report           the HTML report, analysis stored
+  scan_dataset              PII scan of the first --scan-rows rows of the file
+  detect_pii, generate_hypotheses, discover_correlations
+                            on the loaded frame
+  apply_cleaning_operation  every operation, each on a fresh copy of the dataset
+
+Every run is an instrumentation operation, so the results carry the stage
+breakdown (analysis stages run in compute workers included); --memory adds
+tracemalloc peaks, which slows the runs down. --workers 0 runs the compute
+pool's work in this process.
+
+Results go to --output (benchmarks/results/suite-<UTC time>.json by
+default); --compare prints the median wall time of each benchmark against
+an earlier results file.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import synthetic
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+BENCHMARKS = (
+    "perform_analysis", "perform_analysis_cached", "generate_report", "scan_dataset", "detect_pii",
+    "generate_hypotheses", "discover_correlations", "apply_cleaning_operation"
+)
+
+# (operation, params) run by the apply_cleaning_operation benchmark
+CLEANING_OPERATIONS = (
+    ("drop_duplicates", {}),
+    ("impute", {"column": "revenue", "method": "median"}),
+    ("impute", {"column": "region", "method": "mode"}),
+    ("anonymize", {"column": "email"}),
+    ("rename_column", {"old_name": "score", "new_name": "satisfaction"}),
+    ("drop_column", {"column": "notes"}),
+)
+
+
+def measure(instrumentation, name: str, fn, repeat: int, memory: bool, setup=None) -> dict:
+    """Runs fn `repeat` times (after setup(), untimed); wall/CPU summary plus the last run's stages."""
+    traces = []
+    for _ in range(repeat):
+        args = setup() if setup else ()
+        with instrumentation.operation(f"bench.{name}", memory=memory) as trace:
+            fn(*args)
+        traces.append(trace)
+    totals = [trace.stages[-1] for trace in traces]
+    walls = [total["wall_s"] for total in totals]
+    entry = {
+        "benchmark": name,
+        "repeat": repeat,
+        "wall_s_first": walls[0],
+        "wall_s_min": min(walls),
+        "wall_s_median": statistics.median(walls),
+        "cpu_s_median": statistics.median(total["cpu_s"] for total in totals),
+        "stages": traces[-1].stages[:-1]
+    }
+    if memory:
+        entry["peak_mb"] = max(total["peak_mb"] or 0.0 for total in totals)
+    return entry
+
+
+def upload(client, path: str) -> int:
+    with open(path, "rb") as f:
+        response = client.post("/upload", files={"file": (os.path.basename(path), f, "text/csv")})
+    response.raise_for_status()
+    return response.json()["dataset_id"]
+
+
+def create_story(client, dataset_id: int) -> int:
+    response = client.post("/stories/", json={
+        "title": "Benchmark", "business_objective": "Measure the hot paths", "level": 1, "dataset_id": dataset_id
+    })
+    response.raise_for_status()
+    return response.json()["id"]
+
+
+def run_dataset(client, path: str, rows: int, args) -> list:
+    from app.database import SessionLocal
+    from app.models import db_models
+    from app.services import ai_story_service, analysis_service, dataset_loader, instrumentation, privacy_scanner, report_service
+
+    dataset_id = upload(client, path)
+    story_id = create_story(client, dataset_id)
+    db = SessionLocal()
+    dataset = db.query(db_models.Dataset).filter(db_models.Dataset.id == dataset_id).first()
+
+    def forget_analysis():
+        db.query(db_models.DatasetArtifact).filter(
+            db_models.DatasetArtifact.content_hash == dataset.content_hash,
+            db_models.DatasetArtifact.kind.like("analysis:%")
+        ).delete(synchronize_session=False)
+        db.commit()
+        return ()
+
+    def run(name, fn, repeat=args.repeat, setup=None):
+        if args.only and name.split(":")[0] not in args.only:
+            return
+        entry = {"rows": rows, **measure(instrumentation, name, fn, repeat, args.memory, setup)}
+        results.append(entry)
+        print(f"{rows:>10} rows  {name:52} median {entry['wall_s_median']:9.4f}s  first {entry['wall_s_first']:9.4f}s")
+
+    results = []
+    try:
+        run("perform_analysis", lambda: analysis_service.perform_analysis(story_id, db), setup=forget_analysis)
+        # Leaves the result stored for the next two
+        analysis_service.perform_analysis(story_id, db)
+        run("perform_analysis_cached", lambda: analysis_service.perform_analysis(story_id, db))
+        run("generate_report", lambda: report_service.generate_report(story_id, db))
+        run("scan_dataset", lambda: privacy_scanner.scan_dataset(dataset.filepath, args.scan_rows))
+
+        df = dataset_loader.load_dataset(dataset)
+        run("detect_pii", lambda: analysis_service.detect_pii(df))
+        run("generate_hypotheses", lambda: ai_story_service.generate_hypotheses(df))
+        run("discover_correlations", lambda: ai_story_service.discover_correlations(df))
+        del df
+
+        for operation, params in CLEANING_OPERATIONS:
+            # Each run edits a dataset of its own, uploaded (untimed) from the same file
+            run("apply_cleaning_operation:" + ":".join([operation, *map(str, params.values())]),
+                lambda copy_id: analysis_service.apply_cleaning_operation(copy_id, operation, params, db),
+                setup=lambda: (upload(client, path),))
+    finally:
+        db.close()
+    return results
+
+
+def compare(results: list, previous_path: str):
+    with open(previous_path) as f:
+        previous = {(entry["benchmark"], entry["rows"]): entry for entry in json.load(f)["results"]}
+    print(f"\nMedian wall time against {previous_path}:")
+    for entry in results:
+        before = previous.get((entry["benchmark"], entry["rows"]))
+        if before is None:
+            continue
+        ratio = entry["wall_s_median"] / before["wall_s_median"] if before["wall_s_median"] else float("inf")
+        print(f"{entry['rows']:>10} rows  {entry['benchmark']:52} {before['wall_s_median']:9.4f}s -> "
+              f"{entry['wall_s_median']:9.4f}s  x{ratio:.2f}")
+
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, help="run just these benchmarks")
+    parser.add_argument("--scan-rows", type=int, default=100, help="rows scan_dataset reads (its default is 100)")
+    parser.add_argument("--memory", action="store_true", help="record tracemalloc peaks")
+    parser.add_argument("--workers", type=int, help="compute pool workers (0: run in this process)")
+    parser.add_argument("--output", help="results file (default benchmarks/results/suite-<UTC time>.json)")
+    parser.add_argument("--compare", help="an earlier results file")
+    synthetic.add_arguments(parser)
+    args = parser.parse_args()
+
+    created = datetime.utcnow()
+    output = args.output or os.path.join(BACKEND_DIR, "benchmarks", "results", f"suite-{created:%Y%m%d-%H%M%S}.json")
+    output = os.path.abspath(output)
+    previous = os.path.abspath(args.compare) if args.compare else None
+    spec = synthetic.spec_from(args)
+    cwd = os.getcwd()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        # The app's database and upload directory are read from the environment and cwd at import
+        os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(scratch, "bench.db")
+        if args.workers is not None:
+            os.environ["AETHER_COMPUTE_WORKERS"] = str(args.workers)
+        os.chdir(scratch)
+        sys.path.insert(0, BACKEND_DIR)
+        from fastapi.testclient import TestClient
+        from app.database import Base, engine
+        from app.main import app
+        from app.services import compute_pool
+        Base.metadata.create_all(bind=engine)
+
+        results = []
+        try:
+            with TestClient(app) as client:
+                for rows in args.rows:
+                    path = synthetic.write_csv(os.path.join(scratch, f"synthetic_{rows}.csv"), rows, **spec)
+                    results.extend(run_dataset(client, path, rows, args))
+        finally:
+            compute_pool._pool.shutdown()
+            os.chdir(cwd)
+
+    report = {
+        "created": created.isoformat() + "Z",
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "cpus": os.cpu_count(),
+        "workers": compute_pool.WORKERS,
+        "dataset": spec,
+        "options": {"repeat": args.repeat, "scan_rows": args.scan_rows, "memory": args.memory},
+        "results": results
+    }
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+    if previous:
+        compare(results, previous)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Seeded generator of realistic mixed-type datasets for the benchmarks.
+
+    from benchmarks.synthetic import generate, numeric_frame, write_csv
+    df = generate(100_000, numeric=6, categorical=4, null_rate=0.05,
+                  duplicate_rate=0.02, pii_rate=0.1, seed=1)
+    numbers = numeric_frame(2_000, columns=1_000)   # measures only
+    write_csv("bench.csv", 10_000_000)   # chunked, bounded memory
+
+A dataset has a `customer_id`, a `signup_date`, `numeric` measures driven by
+shared latent factors (so correlation search has something to find; counts,
+skewed amounts and bounded ratings among them), `categorical` columns from
+a small cycle that includes the sensitive `gender` and `age_group` (bias
+and fairness checks fire on them) and one wide `product` column, and, when
+`pii_rate` > 0, `email`, `phone` and free-text `notes` columns in which
+that share of values hold PII (the rest are placeholders or plain text).
+
+`null_rate` of the cells outside `customer_id` are blanked, then
+`duplicate_rate` of the rows are replaced by copies of other rows of the
+same chunk. The same arguments and seed always give the same data.
+"""
+import argparse
+import os
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# (name, generator kind) of the numeric measures, cycled when more are asked for
+NUMERIC_COLUMNS = (
+    ("revenue", "lognormal"),
+    ("score", "normal"),
+    ("visits", "count"),
+    ("rating", "bounded"),
+    ("tenure_days", "count"),
+    ("discount", "uniform"),
+)
+
+# (name, levels, weights) of the categorical columns, cycled likewise
+CATEGORICAL_COLUMNS = (
+    ("region", ["north", "south", "east", "west", "central"], [0.3, 0.25, 0.2, 0.15, 0.1]),
+    ("gender", ["female", "male", "non-binary"], [0.47, 0.5, 0.03]),
+    ("segment", ["consumer", "small business", "enterprise", "public sector"], [0.55, 0.25, 0.15, 0.05]),
+    ("age_group", ["18-24", "25-34", "35-44", "45-54", "55+"], [0.12, 0.3, 0.26, 0.18, 0.14]),
+    ("channel", ["web", "store", "phone", "partner"], [0.5, 0.3, 0.15, 0.05]),
+    ("product", [f"SKU-{i:04d}" for i in range(500)], None),
+)
+
+DEFAULT_CHUNK_ROWS = 1_000_000
+
+_LATENT_FACTORS = 3
+_WORDS = np.array(["order", "delayed", "refund", "asked", "about", "invoice", "upgrade", "renewal", "thanks", "call", "back", "issue"])
+
+
+def _column_name(columns: tuple, i: int) -> str:
+    name = columns[i % len(columns)][0]
+    return name if i < len(columns) else f"{name}_{i // len(columns) + 1}"
+
+
+def _numeric(rng: np.random.Generator, kind: str, signal: np.ndarray) -> np.ndarray:
+    rows = len(signal)
+    if kind == "lognormal":
+        return np.round(np.exp(3.5 + 0.6 * signal + rng.normal(0, 0.3, rows)), 2)
+    if kind == "normal":
+        return np.round(70 + 8 * signal + rng.normal(0, 4, rows), 1)
+    if kind == "count":
+        return rng.poisson(np.exp(1.5 + 0.5 * np.clip(signal, -3, 3)))
+    if kind == "bounded":
+        return np.clip(np.round(3 + signal + rng.normal(0, 0.5, rows)), 1, 5)
+    return np.round(rng.uniform(0, 0.3, rows), 3)
+
+
+def _categorical(rng: np.random.Generator, levels: list, weights: Optional[list], rows: int) -> np.ndarray:
+    if weights is None:
+        # Zipf-like popularity over many levels
+        weights = 1.0 / np.arange(1, len(levels) + 1)
+    weights = np.asarray(weights, dtype=float)
+    return np.asarray(levels, dtype=object)[rng.choice(len(levels), rows, p=weights / weights.sum())]
+
+
+def _digits(rng: np.random.Generator, rows: int, width: int) -> pd.Series:
+    return (pd.Series(rng.integers(0, 10 ** width, rows)) + 10 ** width).astype(str).str[1:]
+
+
+def _emails(ids: np.ndarray) -> pd.Series:
+    return "user" + pd.Series(ids).astype(str) + "@example.com"
+
+
+def _phones(rng: np.random.Generator, rows: int) -> pd.Series:
+    return "(" + _digits(rng, rows, 3) + ") " + _digits(rng, rows, 3) + "-" + _digits(rng, rows, 4)
+
+
+def _ssns(rng: np.random.Generator, rows: int) -> pd.Series:
+    return _digits(rng, rows, 3) + "-" + _digits(rng, rows, 2) + "-" + _digits(rng, rows, 4)
+
+
+def _pii_columns(rng: np.random.Generator, ids: np.ndarray, pii_rate: float) -> dict:
+    rows = len(ids)
+    text = np.char.add(np.char.add("customer ", _WORDS[rng.integers(0, len(_WORDS), rows)]),
+                       np.char.add(" ", _WORDS[rng.integers(0, len(_WORDS), rows)])).astype(object)
+    email = np.full(rows, "not provided", dtype=object)
+    phone = np.full(rows, "n/a", dtype=object)
+    notes = text.copy()
+
+    # PII strings are only built for the rows that get them
+    pii = np.flatnonzero(rng.random(rows) < pii_rate)
+    email[pii] = _emails(ids[pii]).to_numpy(dtype=object)
+    pii = np.flatnonzero(rng.random(rows) < pii_rate)
+    phone[pii] = _phones(rng, len(pii)).to_numpy(dtype=object)
+    # Notes with PII carry one of an email, a phone number or an SSN
+    pii = np.flatnonzero(rng.random(rows) < pii_rate)
+    kind = rng.integers(0, 3, len(pii))
+    contact = np.empty(len(pii), dtype=object)
+    contact[kind == 0] = _emails(ids[pii[kind == 0]]).to_numpy(dtype=object)
+    contact[kind == 1] = _phones(rng, int((kind == 1).sum())).to_numpy(dtype=object)
+    contact[kind == 2] = _ssns(rng, int((kind == 2).sum())).to_numpy(dtype=object)
+    notes[pii] = text[pii] + " " + contact
+    return {"email": email, "phone": phone, "notes": notes}
+
+
+def generate(rows: int, numeric: int = 6, categorical: int = 4, null_rate: float = 0.05, duplicate_rate: float = 0.02,
+             pii_rate: float = 0.1, seed: int = 0, start: int = 0) -> pd.DataFrame:
+    """
+    A synthetic dataset of `rows` rows (see the module docstring). `start`
+    is the first customer_id; write_csv generates chunk by chunk with it.
+    """
+    for name, rate in (("null_rate", null_rate), ("duplicate_rate", duplicate_rate), ("pii_rate", pii_rate)):
+        if not 0.0 <= rate <= 1.0:
+            raise ValueError(f"{name} must be between 0 and 1, got {rate}")
+    rng = np.random.default_rng([seed, start])
+    ids = np.arange(start, start + rows)
+    latent = rng.normal(size=(rows, _LATENT_FACTORS))
+
+    columns = {
+        "customer_id": ids,
+        "signup_date": pd.Timestamp("2020-01-01") + pd.to_timedelta(rng.integers(0, 4 * 365, rows), unit="D")
+    }
+    for i in range(numeric):
+        # Mostly one factor each: measures sharing it correlate strongly, the others weakly
+        loadings = np.full(_LATENT_FACTORS, 0.2)
+        loadings[i % _LATENT_FACTORS] = 1.0
+        columns[_column_name(NUMERIC_COLUMNS, i)] = _numeric(rng, NUMERIC_COLUMNS[i % len(NUMERIC_COLUMNS)][1], latent @ loadings)
+    for i in range(categorical):
+        _, levels, weights = CATEGORICAL_COLUMNS[i % len(CATEGORICAL_COLUMNS)]
+        columns[_column_name(CATEGORICAL_COLUMNS, i)] = _categorical(rng, levels, weights, rows)
+    if pii_rate > 0:
+        columns.update(_pii_columns(rng, ids, pii_rate))
+    df = pd.DataFrame(columns)
+
+    if null_rate > 0:
+        for col in df.columns[1:]:
+            df[col] = df[col].mask(rng.random(rows) < null_rate)
+    if duplicate_rate > 0 and rows > 1:
+        source = np.arange(rows)
+        copies = rng.random(rows) < duplicate_rate
+        source[copies] = rng.integers(0, rows, int(copies.sum()))
+        df = df.take(source).reset_index(drop=True)
+    return df
+
+
+def numeric_frame(rows: int, columns: int, null_rate: float = 0.0, seed: int = 0) -> pd.DataFrame:
+    """Only `columns` numeric measures (no id, date, categorical or PII columns), for the numeric benchmarks."""
+    df = generate(rows, numeric=columns, categorical=0, null_rate=null_rate, duplicate_rate=0.0, pii_rate=0.0, seed=seed)
+    return df.drop(columns=["customer_id", "signup_date"])
+
+
+def write_csv(path: str, rows: int, chunk_rows: int = DEFAULT_CHUNK_ROWS, **spec) -> str:
+    """Writes generate(rows, **spec) to a CSV, one chunk of rows at a time."""
+    with open(path, "w", newline="") as f:
+        for start in range(0, rows, chunk_rows):
+            chunk = generate(min(chunk_rows, rows - start), start=start, **spec)
+            chunk.to_csv(f, index=False, header=start == 0)
+    return path
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """The generator's options, shared by the benchmarks."""
+    parser.add_argument("--numeric", type=int, default=6, help="numeric columns")
+    parser.add_argument("--categorical", type=int, default=4, help="categorical columns")
+    parser.add_argument("--null-rate", type=float, default=0.05)
+    parser.add_argument("--duplicate-rate", type=float, default=0.02)
+    parser.add_argument("--pii-rate", type=float, default=0.1, help="share of values in the PII columns that are PII")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def spec_from(args: argparse.Namespace) -> dict:
+    return {"numeric": args.numeric, "categorical": args.categorical, "null_rate": args.null_rate,
+            "duplicate_rate": args.duplicate_rate, "pii_rate": args.pii_rate, "seed": args.seed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    add_arguments(parser)
+    args = parser.parse_args()
+    write_csv(args.path, args.rows, args.chunk_rows, **spec_from(args))
+    print(f"{args.rows} rows written to {args.path} ({os.path.getsize(args.path) / 2**20:.1f} MiB)")
+
+
+if __name__ == "__main__":
+    main()
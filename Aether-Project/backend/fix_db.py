@@ -2,20 +2,32 @@ import sqlite3
 
 db_path = "aether.db"
 
+# (table, column, type) added after the initial schema
+MIGRATIONS = [
+    ("datasets", "project_id", "INTEGER"),
+    ("datasets", "columnar_path", "VARCHAR"),
+    ("datasets", "content_hash", "VARCHAR"),
+    ("datasets", "size_bytes", "INTEGER"),
+    ("datasets", "row_count", "INTEGER"),
+]
+
+conn = None
 try:
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     
-    print("Attempting to add project_id column to datasets table...")
-    cursor.execute("ALTER TABLE datasets ADD COLUMN project_id INTEGER")
-    conn.commit()
-    print("Successfully added project_id column.")
+    for table, column, col_type in MIGRATIONS:
+        print(f"Attempting to add {column} column to {table} table...")
+        try:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {col_type}")
+            conn.commit()
+            print(f"Successfully added {column} column.")
+        except sqlite3.OperationalError as e:
+            if "duplicate column name" in str(e):
+                print(f"Column {column} already exists.")
+            else:
+                print(f"Error: {e}")
     
-except sqlite3.OperationalError as e:
-    if "duplicate column name" in str(e):
-        print("Column project_id already exists.")
-    else:
-        print(f"Error: {e}")
 except Exception as e:
     print(f"An unexpected error occurred: {e}")
 finally:
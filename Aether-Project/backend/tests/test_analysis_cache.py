@@ -0,0 +1,46 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.database import Base
+from app.services import analysis_cache
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(analysis_cache, "_counters", analysis_cache._Counters())
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def test_results_are_keyed_by_content_and_options(db):
+    dataset = SimpleNamespace(content_hash="abc", filename="sales.csv")
+    result = {"dataset_info": {"rows": 3}, "data_card": {"source": "sales.csv"}}
+
+    assert analysis_cache.get(db, dataset, {"mode": "exact"}) is None
+    analysis_cache.put(db, dataset, {"mode": "exact"}, result)
+
+    assert analysis_cache.get(db, dataset, {"mode": "exact"}) == result
+    assert analysis_cache.get(db, dataset, {"mode": "stream"}) is None
+    edited = SimpleNamespace(content_hash="def", filename="sales.csv")
+    assert analysis_cache.get(db, edited, {"mode": "exact"}) is None
+    assert analysis_cache.stats() == {"hits": 1, "misses": 3, "hit_ratio": 0.25}
+
+
+def test_datasets_sharing_content_keep_their_own_name(db):
+    analysis_cache.put(db, SimpleNamespace(content_hash="abc", filename="a.csv"), {"mode": "exact"},
+                       {"data_card": {"source": "a.csv"}})
+
+    result = analysis_cache.get(db, SimpleNamespace(content_hash="abc", filename="b.csv"), {"mode": "exact"})
+
+    assert result["data_card"]["source"] == "b.csv"
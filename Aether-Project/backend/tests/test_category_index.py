@@ -0,0 +1,95 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import HTTPException
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services import category_index
+from app.services.category_index import CategoryColumn, CategoryIndex
+
+
+def sample_frame():
+    rng = np.random.default_rng(7)
+    df = pd.DataFrame({
+        "region": np.array(["north", "south", "east", "west"], dtype=object)[rng.integers(0, 4, 200)],
+        "revenue": rng.normal(100, 15, 200)
+    })
+    df.loc[rng.random(200) < 0.1, "region"] = np.nan
+    df.loc[rng.random(200) < 0.1, "revenue"] = np.nan
+    df["segment"] = pd.Categorical(df["region"], categories=["west", "south", "north", "east", "unused"])
+    return df
+
+
+def test_counts_match_pandas():
+    df = sample_frame()
+    for col in ("region", "segment"):
+        column = CategoryColumn(df[col])
+        pd.testing.assert_series_equal(column.value_counts(), df[col].value_counts())
+        assert column.nunique() == df[col].nunique()
+        assert column.mode() == df[col].mode()[0]
+
+
+def test_group_aggregates_match_groupby():
+    df = sample_frame()
+    index = CategoryIndex(df)
+    for col in ("region", "segment"):
+        grouped = df.groupby(col, observed=True)["revenue"]
+        for metric, expected in (("count", grouped.count()), ("sum", grouped.sum()), ("mean", grouped.mean())):
+            result = index.column(col).aggregate(metric, df["revenue"])
+            assert list(result.index) == list(expected.index)
+            np.testing.assert_allclose(result.to_numpy(dtype=float), expected.to_numpy(dtype=float), rtol=1e-12)
+    assert index.column("region") is index.column("region")
+
+
+def test_aggregate_dataset_reports_groups_and_rejects_bad_columns(tmp_path):
+    path = tmp_path / "sales.csv"
+    pd.DataFrame({"region": ["n", "s", "n", None, "e"], "revenue": [10.0, 12.5, 9.0, 4.0, None]}).to_csv(path, index=False)
+    dataset = SimpleNamespace(filepath=str(path), columnar_path=None, expiry_time=None)
+
+    result = category_index.aggregate_dataset(dataset, "region", "mean", "revenue")
+    assert result["group_count"] == 3
+    assert result["groups"] == [{"group": "e", "mean": None}, {"group": "n", "mean": 9.5}, {"group": "s", "mean": 12.5}]
+    rows = category_index.aggregate_dataset(dataset, "region", limit=1)
+    assert rows["groups"] == [{"group": "e", "count": 1}]
+
+    for by, metric, value in (("missing", "count", None), ("region", "sum", None), ("revenue", "mean", "region")):
+        with pytest.raises(HTTPException) as exc:
+            category_index.aggregate_dataset(dataset, by, metric, value)
+        assert exc.value.status_code == 400
+
+
+def test_dataset_indexes_stay_within_the_budget_and_read_only_needed_columns(tmp_path, monkeypatch):
+    datasets = []
+    for name in ("a", "b"):
+        path = tmp_path / f"{name}.csv"
+        pd.DataFrame({f"c{i}": [f"{name}{i}-{j % 50}" for j in range(2000)] for i in range(4)}).assign(
+            revenue=1.0).to_csv(path, index=False)
+        datasets.append(SimpleNamespace(filepath=str(path), columnar_path=None, expiry_time=None))
+    monkeypatch.setattr(category_index, "_indexes", category_index.OrderedDict())
+    loaded = []
+    load_dataset = category_index.dataset_loader.load_dataset
+    monkeypatch.setattr(category_index.dataset_loader, "load_dataset",
+                        lambda dataset, columns=None: loaded.append(columns) or load_dataset(dataset, columns))
+
+    first = category_index.for_dataset(datasets[0])
+    first.column("c0")
+    one_column = first.nbytes
+    monkeypatch.setattr(category_index, "CACHE_BUDGET_BYTES", int(2.5 * one_column))
+
+    second = category_index.for_dataset(datasets[1])
+    second.column("c0")
+    second.column("c1")
+    # The other dataset's index went first
+    assert list(category_index._indexes.values()) == [second]
+    for col in ("c2", "c3"):
+        category_index.aggregate_dataset(datasets[1], col, "sum", "revenue")
+    # Then the growing index's least recently used columns
+    assert second.nbytes <= category_index.CACHE_BUDGET_BYTES
+    assert list(second._columns) == ["c2", "c3"]
+    assert None not in loaded
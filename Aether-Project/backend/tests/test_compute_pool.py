@@ -0,0 +1,70 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.compute_pool import ComputePool, TaskCancelled
+
+
+def not_found():
+    raise HTTPException(status_code=404, detail="Dataset not found")
+
+
+class DisconnectedRequest:
+    async def is_disconnected(self):
+        return True
+
+
+@pytest.fixture
+def pool():
+    pool = ComputePool(workers=1, timeout=30)
+    yield pool
+    pool.shutdown()
+
+
+def test_tasks_run_in_a_worker_process_and_errors_come_back(pool):
+    assert pool.call(os.getpid) != os.getpid()
+    with pytest.raises(HTTPException) as error:
+        pool.call(not_found)
+    assert error.value.status_code == 404
+    with pytest.raises(RuntimeError, match="ValueError"):
+        pool.call(int, "x")
+    assert pool.stats()["completed"] == 1
+    assert pool.stats()["failed"] == 2
+
+
+def test_timed_out_task_is_stopped_and_its_worker_replaced(pool):
+    first = pool.call(os.getpid)
+    started = time.monotonic()
+    with pytest.raises(HTTPException) as error:
+        pool.call(time.sleep, 30, timeout=0.5)
+
+    assert error.value.status_code == 504
+    assert time.monotonic() - started < 5
+    assert pool.call(os.getpid) != first
+
+
+def test_cancelled_task_is_stopped(pool):
+    cancelled = threading.Event()
+    threading.Timer(0.3, cancelled.set).start()
+
+    with pytest.raises(TaskCancelled):
+        pool.call(time.sleep, 30, cancelled=cancelled)
+    assert pool.stats()["cancelled"] == 1
+
+
+def test_disconnected_client_stops_the_awaited_task(pool):
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(pool.run(time.sleep, 30, request=DisconnectedRequest()))
+    assert error.value.status_code == 499
+
+
+def test_zero_workers_runs_in_the_calling_process():
+    assert ComputePool(workers=0, timeout=1).call(os.getpid) == os.getpid()
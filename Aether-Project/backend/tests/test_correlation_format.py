@@ -0,0 +1,53 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import HTTPException
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.analysis_service import analyse_frame
+from app.services.correlation_format import compact_correlations, expand_correlations, format_result
+
+
+def sample_result():
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame(rng.normal(size=(40, 4)), columns=["a", "b", "c", "d"])
+    df["flat"] = 1.0  # undefined correlations
+    return analyse_frame(df, "sample.csv")[0]
+
+
+def test_compact_layouts_round_trip_to_the_cells():
+    result = sample_result()
+    cells = result["correlations"]
+    for layout in ("upper", "full"):
+        for decimals in (None, 2):
+            compact = compact_correlations(cells, layout, decimals)
+            assert compact["variables"] == cells["variables"]
+            assert len(compact["values"]) == (15 if layout == "upper" else 25)
+            expanded = expand_correlations(compact)
+            assert [(c["x"], c["y"]) for c in expanded["matrix"]] == [(c["x"], c["y"]) for c in cells["matrix"]]
+            np.testing.assert_array_equal([c["value"] for c in expanded["matrix"]], [c["value"] for c in cells["matrix"]])
+
+
+def test_quantised_values_are_integers_and_nan_is_null():
+    compact = compact_correlations(sample_result()["correlations"], "upper", 2)
+    assert compact["scale"] == 100
+    assert compact["values"][0] == 100  # a with itself
+    assert compact["values"][-1] is None  # flat with itself
+    assert all(v is None or isinstance(v, int) for v in compact["values"])
+
+
+def test_format_result_is_opt_in_and_validates():
+    result = sample_result()
+    assert format_result(result) is result
+    compact = format_result(result, "compact", "full")
+    assert compact["correlations"]["format"] == "compact"
+    assert result["correlations"]["matrix"]  # the stored result is untouched
+    for bad in ({"heatmap": "png"}, {"layout": "lower"}, {"decimals": 9}):
+        with pytest.raises(HTTPException) as exc:
+            format_result(result, bad.get("heatmap", "compact"), bad.get("layout", "upper"), bad.get("decimals"))
+        assert exc.value.status_code == 400
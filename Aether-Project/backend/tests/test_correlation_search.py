@@ -0,0 +1,70 @@
+import os
+import sys
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services import correlation_search
+from app.services.correlation_search import top_correlations
+from benchmarks import synthetic
+
+
+def make_frame(rows=300, columns=12, seed=0):
+    return synthetic.numeric_frame(rows, columns, seed=seed)
+
+
+def expected_top(corr: pd.DataFrame, k: int):
+    upper = corr.where(np.triu(np.ones(corr.shape, dtype=bool), 1)).stack()
+    return upper.reindex(upper.abs().sort_values(ascending=False, kind="stable").index).head(k)
+
+
+def test_blockwise_search_matches_the_full_matrix():
+    df = make_frame()
+    df = df.mask(np.random.default_rng(1).random(df.shape) < 0.1)
+
+    for block in (None, 1, 5):
+        top = top_correlations(df, k=6, block=block)
+        expected = expected_top(df.corr(), 6)
+        assert [(a, b) for a, b, _ in top] == list(expected.index)
+        assert np.allclose([r for _, _, r in top], expected.values)
+
+
+def test_spearman_threshold_and_rounded_ties():
+    df = make_frame()
+    top = top_correlations(df, k=4, method="spearman")
+    expected = expected_top(df.corr(method="spearman"), 4)
+    assert np.allclose([r for _, _, r in top], expected.values)
+
+    # Identical columns tie at any rounding; the earlier pair comes first
+    df = pd.DataFrame({"a": [1.0, 2, 3, 5], "b": [1.0, 2, 3, 5], "c": [2.0, 4, 6, 10], "d": [4.0, 1, 3, 1]})
+    assert [(a, b) for a, b, _ in top_correlations(df, k=3, min_abs=0.5, decimals=3)] == [("a", "b"), ("a", "c"), ("b", "c")]
+
+
+def test_constant_column_pairs_are_skipped_or_ranked_first():
+    df = make_frame(columns=3).assign(flat=1.0)
+    first = df.columns[0]
+    assert all("flat" not in pair[:2] for pair in top_correlations(df, k=10))
+    var1, var2, value = top_correlations(df, k=1, nan_first=True)[0]
+    assert (var1, var2) == (first, "flat") and np.isnan(value)
+
+
+def test_memory_stays_within_the_block_budget(monkeypatch):
+    # 10000 x 100 floats with gaps: an 8MB frame, searched with a 2MB budget
+    df = make_frame(rows=10000, columns=100)
+    df = df.mask(np.random.default_rng(2).random(df.shape) < 0.05)
+    monkeypatch.setattr(correlation_search, "BLOCK_BYTES", 2 * 1024 * 1024)
+
+    for method in ("pearson", "spearman"):
+        tracemalloc.start()
+        try:
+            top = top_correlations(df, k=3, method=method)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        assert peak < 4 * 1024 * 1024
+        if method == "pearson":
+            assert np.allclose([r for _, _, r in top], expected_top(df.corr(), 3).values)
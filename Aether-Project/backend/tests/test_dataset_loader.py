@@ -0,0 +1,119 @@
+import pytest
+import pandas as pd
+import os
+import sys
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services import dataset_loader
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(dataset_loader, "_cache", dataset_loader._DatasetCache(10 * 1024 * 1024))
+
+
+def make_dataset(tmp_path, dataset_id=1, rows=100, expiry=None):
+    path = tmp_path / f"data_{dataset_id}.csv"
+    pd.DataFrame({'a': range(rows), 'b': ['x'] * rows}).to_csv(path, index=False)
+    return SimpleNamespace(
+        id=dataset_id,
+        filepath=str(path),
+        expiry_time=expiry or datetime.utcnow() + timedelta(hours=1)
+    )
+
+
+def test_second_load_is_a_cache_hit(tmp_path):
+    dataset = make_dataset(tmp_path)
+
+    first = dataset_loader.load_dataset(dataset)
+    second = dataset_loader.load_dataset(dataset)
+
+    assert first is second
+    stats = dataset_loader.cache_stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+    assert stats['bytes'] > 0
+
+
+def test_modified_file_is_reparsed(tmp_path):
+    dataset = make_dataset(tmp_path)
+    dataset_loader.load_dataset(dataset)
+
+    pd.DataFrame({'a': [1, 2, 3]}).to_csv(dataset.filepath, index=False)
+    df = dataset_loader.load_dataset(dataset)
+
+    assert list(df.columns) == ['a']
+    assert dataset_loader.cache_stats()['entries'] == 1
+
+
+def test_expired_dataset_is_not_served_from_cache(tmp_path):
+    dataset = make_dataset(tmp_path, expiry=datetime.utcnow() - timedelta(seconds=1))
+
+    dataset_loader.load_dataset(dataset)
+    dataset_loader.load_dataset(dataset)
+
+    stats = dataset_loader.cache_stats()
+    assert stats['hits'] == 0
+    assert stats['entries'] == 0
+
+
+def test_lru_evicts_when_over_budget(tmp_path, monkeypatch):
+    first = make_dataset(tmp_path, dataset_id=1, rows=1000)
+    second = make_dataset(tmp_path, dataset_id=2, rows=1000)
+    dataset_loader.load_dataset(first)
+    size = dataset_loader.cache_stats()['bytes']
+    monkeypatch.setattr(dataset_loader, "_cache", dataset_loader._DatasetCache(size + size // 2))
+
+    dataset_loader.load_dataset(first)
+    dataset_loader.load_dataset(second)
+
+    stats = dataset_loader.cache_stats()
+    assert stats['entries'] == 1
+    assert stats['evictions'] == 1
+    assert stats['bytes'] <= stats['budget_bytes']
+
+
+def test_column_projection_and_head(tmp_path):
+    dataset = make_dataset(tmp_path)
+
+    assert list(dataset_loader.load_dataset(dataset, columns=['b']).columns) == ['b']
+    assert len(dataset_loader.load_head(dataset, 5)) == 5
+
+
+def test_columnar_copy_is_preferred_and_projected(tmp_path):
+    pytest.importorskip("pyarrow")
+    dataset = make_dataset(tmp_path)
+    dataset.columnar_path = dataset_loader.write_columnar(dataset_loader.read_file(dataset.filepath), dataset.filepath)
+
+    assert dataset.columnar_path.endswith(dataset_loader.COLUMNAR_SUFFIX)
+    projected = dataset_loader.load_dataset(dataset, columns=['a'])
+    assert list(projected.columns) == ['a']
+    assert len(dataset_loader.load_head(dataset, 3)) == 3
+    pd.testing.assert_frame_equal(
+        dataset_loader.load_dataset(dataset),
+        dataset_loader.read_file(dataset.filepath)
+    )
+
+
+def test_columnar_numeric_columns_are_memory_mapped(tmp_path):
+    pytest.importorskip("pyarrow")
+    dataset = make_dataset(tmp_path)
+    dataset.columnar_path = dataset_loader.write_columnar(dataset_loader.read_file(dataset.filepath), dataset.filepath)
+
+    df = dataset_loader.load_dataset(dataset)
+
+    assert not df['a'].values.flags.writeable
+    assert dataset_loader.cache_stats()['mapped_bytes'] == df['a'].values.nbytes
+
+
+def test_xlsx_reader_matches_read_excel(tmp_path):
+    path = str(tmp_path / "book.xlsx")
+    df = pd.DataFrame({'a': range(30), 'b': ['x', None] * 15, 'c': [1.5, None, 2.0] * 10})
+    df.to_excel(path, index=False)
+
+    pd.testing.assert_frame_equal(dataset_loader.read_xlsx(path), pd.read_excel(path))
+    pd.testing.assert_frame_equal(dataset_loader.read_xlsx(path, nrows=5), pd.read_excel(path, nrows=5))
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import os
+import sys
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services import dtype_optimizer
+
+
+def make_frame(rows=1000):
+    return pd.DataFrame({
+        'gender': np.where(np.arange(rows) % 2, 'female', 'male'),
+        'email': [f'user{i}@example.com' for i in range(rows)],
+        'score': np.arange(rows) % 100,
+        'amount': (np.arange(rows) % 8) * 0.25,
+        'ratio': np.arange(rows) / 3,
+        'zip': [f' {10000 + i} ' for i in range(rows)],
+    })
+
+
+def test_optimize_picks_smaller_types_and_reports_savings():
+    df, plan = dtype_optimizer.optimize(make_frame())
+
+    assert df['gender'].dtype.name == 'category'
+    assert df['email'].dtype == object
+    assert df['score'].dtype == np.int8
+    assert df['amount'].dtype == np.float32
+    assert df['ratio'].dtype == np.float64  # float32 would change values
+    assert df['zip'].dtype == np.int16
+    assert plan['bytes_saved'] == plan['bytes_before'] - plan['bytes_after'] > 0
+
+
+def test_values_are_unchanged():
+    original = make_frame()
+    df, _ = dtype_optimizer.optimize(original)
+
+    for col in ['gender', 'email', 'score', 'amount', 'ratio']:
+        assert (df[col].astype(original[col].dtype) == original[col]).all()
+
+
+def test_recorded_plan_is_reused_and_tolerates_edits():
+    _, plan = dtype_optimizer.optimize(make_frame())
+    edited = make_frame().drop(columns=['email'])
+    edited.loc[0, 'score'] = 1000  # no longer fits int8
+
+    df, _ = dtype_optimizer.optimize(edited, plan)
+
+    assert df['gender'].dtype.name == 'category'
+    assert df['score'].dtype == np.int64
@@ -0,0 +1,79 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services import analysis_service, guardrails
+
+SECTIONS = ("pii_warnings", "bias_warnings", "fairness_scores")
+
+
+def make_frame():
+    return pd.DataFrame({
+        "email": ["a@example.com", "b@example.com", "b@example.com", None, "c@example.com", "d@example.com"],
+        "gender": ["F", "F", "F", "F", "F", "M"],
+        "age": [31, 45, 45, np.nan, 52, 28],
+        "notes": ["x", "y", "y", "z", None, "w"],
+        "sales": [1.0, 2.0, 2.0, 3.0, 4.0, 5.0],
+    })
+
+
+def analysed(df):
+    eda_results, _, _ = analysis_service.analyse_frame(df, "people.csv")
+    return {key: eda_results[key] for key in SECTIONS}
+
+
+def test_stored_findings_match_the_analysis():
+    df = make_frame()
+
+    # What the upload step records: the checks on the needed columns of the cleaned frame
+    stored = guardrails.compute(guardrails.cleaned_frame(df))
+    stored["columns"] = list(df.columns)
+
+    assert guardrails.sections(stored) == analysed(df)
+    # Round trip through an exact analysis' result
+    eda_results, _, _ = analysis_service.analyse_frame(df, "people.csv")
+    assert guardrails.sections(guardrails.from_result(eda_results)) == analysed(df)
+
+
+def test_cleaning_edits_recheck_only_the_columns_they_touch(monkeypatch):
+    df = make_frame()
+    previous = guardrails.from_result(analysis_service.analyse_frame(df, "people.csv")[0])
+    checked = []
+    compute = guardrails.compute
+    monkeypatch.setattr(guardrails, "compute", lambda frame, categories=None: checked.append(list(frame.columns))
+                        or compute(frame, categories))
+
+    anonymized = df.assign(email=df["email"].map(lambda v: None if v is None else "***"))
+    renamed = df.rename(columns={"gender": "sex"})
+    dropped = df.drop(columns=["age"])
+    edits = [
+        (anonymized, "anonymize", {"column": "email"}, [["email"]]),
+        # Equally sensitive names: the findings are relabelled, nothing is checked
+        (renamed, "rename_column", {"old_name": "gender", "new_name": "sex"}, []),
+        (dropped, "drop_column", {"column": "age"}, []),
+    ]
+    for edited, operation, params, expected in edits:
+        checked.clear()
+        findings = guardrails.carry_over(previous, edited, None, operation, params)
+        assert checked == expected
+        assert guardrails.sections(findings) == analysed(edited)
+
+
+def test_analysis_reports_the_stored_findings(monkeypatch):
+    df = make_frame()
+    stored = {"columns": list(df.columns), "rows": 5, "pii": {"notes": "Phone"}, "bias": {}, "fairness": {"age": 0.5}}
+
+    def compute(*args):
+        raise AssertionError("checked again")
+    monkeypatch.setattr(guardrails, "compute", compute)
+
+    eda_results, _, _ = analysis_service.analyse_frame(df, "people.csv", stored_guardrails=stored)
+
+    assert eda_results["pii_warnings"] == [{"column": "notes", "type": "Phone"}]
+    assert eda_results["bias_warnings"] == []
+    assert eda_results["fairness_scores"] == {"age": 0.5}
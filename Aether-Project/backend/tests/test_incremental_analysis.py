@@ -0,0 +1,89 @@
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.database import Base
+from app.services import analysis_cache, artifact_store, dataset_loader, incremental_analysis, profile_service
+from app.services.analysis_service import analyse_frame
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def make_frame(rows=500):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'id': np.arange(rows),
+        'gender': rng.choice(['f', 'm'], rows, p=[0.8, 0.2]),
+        'city': rng.choice(['a', 'b', None], rows),
+        'income': rng.lognormal(3, 1, rows),
+        'score': rng.normal(50, 10, rows),
+    })
+    df.loc[rng.random(rows) < 0.1, 'income'] = np.nan
+    return pd.concat([df, df.head(5)], ignore_index=True)
+
+
+def analysed(df):
+    result, _, summary = analyse_frame(df, "people.csv")
+    return json.loads(json.dumps(result, default=str)), incremental_analysis.stored_inputs(summary)
+
+
+def edit(db, monkeypatch, tmp_path, df, edited, operation, params):
+    """Stores the analysis of `df`, applies the edit and returns the carried-over result."""
+    dataset = SimpleNamespace(content_hash="v1", filename="people.csv", filepath=str(tmp_path / "v1.csv"))
+    analysis_cache.put(db, dataset, {"mode": "exact"}, *analysed(df))
+    artifact_store.put(db, "v1", "profile", profile_service.build_profile(df))
+    previous = incremental_analysis.snapshot(db, dataset)
+
+    dataset.content_hash, dataset.filepath = "v2", str(tmp_path / "v2.csv")
+    monkeypatch.setattr(dataset_loader, "load_dataset", lambda _: edited)
+    assert incremental_analysis.carry_over(db, dataset, previous, operation, params)
+    return analysis_cache.peek(db, "v2", {"mode": "exact"})
+
+
+@pytest.mark.parametrize("operation,params,apply", [
+    ("rename_column", {"old_name": "city", "new_name": "town"}, lambda df: df.rename(columns={"city": "town"})),
+    ("rename_column", {"old_name": "city", "new_name": "race"}, lambda df: df.rename(columns={"city": "race"})),
+    ("drop_column", {"column": "score"}, lambda df: df.drop(columns=["score"])),
+    ("impute", {"column": "income"}, lambda df: df.assign(income=df["income"].fillna(df["income"].mean()))),
+])
+def test_carried_over_result_matches_a_full_analysis(db, monkeypatch, tmp_path, operation, params, apply):
+    df = make_frame()
+    edited = apply(df)
+
+    result, inputs = edit(db, monkeypatch, tmp_path, df, edited, operation, params)
+
+    expected, expected_inputs = analysed(edited)
+    assert result == expected
+    assert inputs == expected_inputs
+
+
+def test_edit_that_changes_duplicates_is_left_to_a_full_analysis(db, monkeypatch, tmp_path):
+    df = pd.DataFrame({'id': [1, 2, 3, 4], 'gender': ['f', 'f', 'm', 'f'], 'score': [1.0, 1.0, 2.0, 3.0]})
+    dataset = SimpleNamespace(content_hash="v1", filename="people.csv", filepath=str(tmp_path / "v1.csv"))
+    analysis_cache.put(db, dataset, {"mode": "exact"}, *analysed(df))
+    artifact_store.put(db, "v1", "profile", profile_service.build_profile(df))
+    previous = incremental_analysis.snapshot(db, dataset)
+
+    # Without the id column the first two rows are duplicates
+    dataset.content_hash, dataset.filepath = "v2", str(tmp_path / "v2.csv")
+    monkeypatch.setattr(dataset_loader, "load_dataset", lambda _: df.drop(columns=["id"]))
+
+    assert not incremental_analysis.carry_over(db, dataset, previous, "drop_column", {"column": "id"})
+    assert analysis_cache.peek(db, "v2", {"mode": "exact"}) is None
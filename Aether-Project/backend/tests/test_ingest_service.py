@@ -0,0 +1,87 @@
+import asyncio
+import hashlib
+import io
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.datastructures import UploadFile
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.database import Base
+from app.models import db_models
+from app.services import blob_store, dataset_loader, ingest_service, privacy_scanner
+
+
+def make_csv(rows):
+    lines = ["name,email,score"] + [f"user{i},user{i}@example.com,{i}" for i in range(rows)]
+    return ("\n".join(lines) + "\n").encode()
+
+
+def test_stream_upload_hashes_counts_and_scans(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest_service, "CHUNK_SIZE", 64)
+    payload = make_csv(500)
+    destination = str(tmp_path / "people.csv")
+
+    result = asyncio.run(ingest_service.stream_upload(UploadFile(io.BytesIO(payload), filename="people.csv"), destination))
+
+    with open(destination, "rb") as f:
+        assert f.read() == payload
+    assert result["sha256"] == hashlib.sha256(payload).hexdigest()
+    assert result["size_bytes"] == len(payload)
+    assert result["row_count"] == 500
+    assert result["warnings"] == privacy_scanner.scan_dataset(destination)
+    assert any(w["type"] == "Email" for w in result["warnings"])
+
+
+def test_row_count_without_trailing_newline(tmp_path):
+    payload = make_csv(3).rstrip(b"\n")
+    destination = str(tmp_path / "people.csv")
+
+    result = asyncio.run(ingest_service.stream_upload(UploadFile(io.BytesIO(payload), filename="people.csv"), destination))
+
+    assert result["row_count"] == 3
+
+
+def test_identical_uploads_share_one_blob(tmp_path, monkeypatch):
+    monkeypatch.setattr(blob_store, "BLOB_DIR", str(tmp_path / "blobs"))
+    monkeypatch.setattr(blob_store, "INCOMING_DIR", str(tmp_path))
+    payload = make_csv(10)
+
+    paths = []
+    for _ in range(2):
+        tmp_file = blob_store.incoming_path("people.csv")
+        result = asyncio.run(ingest_service.stream_upload(UploadFile(io.BytesIO(payload), filename="people.csv"), tmp_file))
+        paths.append(blob_store.commit(tmp_file, result["sha256"], "people.csv"))
+
+    assert paths[0] == (blob_store.blob_path(result["sha256"], "people.csv"), True)
+    assert paths[1] == (paths[0][0], False)
+    assert sorted(os.listdir(tmp_path)) == ["blobs"]
+
+
+def test_edited_workbook_is_stored_as_arrow(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(blob_store, "BLOB_DIR", str(tmp_path / "blobs"))
+    monkeypatch.setattr(blob_store, "INCOMING_DIR", str(tmp_path))
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    path = str(tmp_path / "book.xlsx")
+    pd.DataFrame({'a': [1, 2, 3], 'b': ['x', 'y', 'z']}).to_excel(path, index=False)
+    dataset = db_models.Dataset(filename="book.xlsx", filepath=path, expiry_time=datetime.utcnow() + timedelta(hours=1))
+    db.add(dataset)
+    db.commit()
+
+    edited = dataset_loader.load_dataset(dataset).rename(columns={'a': 'id'})
+    ingest_service.store_edited_frame(db, dataset, edited)
+
+    assert dataset.filepath.endswith(dataset_loader.COLUMNAR_SUFFIX)
+    assert dataset.columnar_path == dataset.filepath
+    assert list(dataset_loader.load_dataset(dataset).columns) == ['id', 'b']
+    db.close()
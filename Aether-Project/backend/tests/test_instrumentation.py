@@ -0,0 +1,60 @@
+import os
+import sys
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services import instrumentation
+
+
+@instrumentation.timed
+def build_rows(n):
+    with instrumentation.stage("allocate"):
+        return [list(range(100)) for _ in range(n)]
+
+
+def test_stages_are_recorded_inside_an_operation_only():
+    instrumentation.reset()
+    build_rows(10)
+    with instrumentation.operation("job", memory=True) as trace:
+        with instrumentation.stage("prepare"):
+            pass
+        build_rows(2000)
+
+    stages = [entry["stage"] for entry in trace.stages]
+    assert stages == ["prepare", "allocate", "build_rows", "total"]
+    allocate = trace.stages[1]
+    assert allocate["wall_s"] >= 0 and allocate["cpu_s"] >= 0
+    # 2000 lists of 100 ints is well over 1MB, and the enclosing stages saw it too
+    assert allocate["peak_mb"] > 1
+    assert trace.stages[2]["peak_mb"] >= allocate["peak_mb"]
+    assert trace.stages[3]["peak_mb"] >= allocate["peak_mb"]
+
+    # Called on its own, a timed function is an operation of its own
+    stats = instrumentation.stats()
+    assert stats["build_rows"]["allocate"]["count"] == 1
+    assert stats["build_rows"]["allocate"]["peak_mb_max"] is None
+    assert stats["job"]["total"]["count"] == 1
+
+
+def test_traced_tasks_report_their_stages_to_the_caller():
+    instrumentation.reset()
+    with instrumentation.operation("remote") as trace:
+        # What a compute pool worker runs (inline here)
+        task = instrumentation.traced_task(build_rows, 3)
+        output = task[0](*task[1:])
+        rows = instrumentation.collect(output)
+    assert len(rows) == 3
+    assert [entry["stage"] for entry in trace.stages] == ["allocate", "build_rows", "total"]
+    assert "peak_mb" not in trace.stages[0]
+
+    # A nested operation is aggregated on its own and shows in the caller's stages
+    with instrumentation.operation("outer") as outer:
+        with instrumentation.operation("inner"):
+            build_rows(1)
+    assert [entry["stage"] for entry in outer.stages] == ["inner.allocate", "inner.build_rows", "inner.total", "total"]
+    assert instrumentation.stats()["inner"]["build_rows"]["count"] == 1
+
+    result = instrumentation.attach({"rows": 3}, trace, True)
+    assert result["_timings"]["operation"] == "remote"
+    assert instrumentation.attach({"rows": 3}, trace, False) == {"rows": 3}
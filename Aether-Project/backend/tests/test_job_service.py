@@ -0,0 +1,106 @@
+import os
+import sys
+import time
+
+import pandas as pd
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import database
+from app.database import Base
+from app.models import db_models
+from app.services import analysis_service, compute_pool, job_service
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine)
+    # Dispatcher and job sessions use the test database; tasks run in the dispatcher thread
+    monkeypatch.setattr(database, "SessionLocal", SessionLocal)
+    monkeypatch.setattr(compute_pool, "_pool", compute_pool.ComputePool(workers=0, timeout=30))
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+def add_story(db, tmp_path):
+    path = tmp_path / "sales.csv"
+    pd.DataFrame({"region": ["n", "s", "n", "e"], "revenue": [10.0, 12.5, 9.0, 30.0]}).to_csv(path, index=False)
+    dataset = db_models.Dataset(filename="sales.csv", filepath=str(path), content_hash="abc", size_bytes=os.path.getsize(path))
+    db.add(dataset)
+    db.commit()
+    story = db_models.Story(title="Sales", business_objective="x", level=1, dataset_id=dataset.id)
+    db.add(story)
+    db.commit()
+    return story
+
+
+def wait_for(db, job_id):
+    for _ in range(100):
+        db.expire_all()
+        status = job_service.get_job(db, job_id)
+        if status["status"] in (job_service.SUCCEEDED, job_service.FAILED):
+            return status
+        time.sleep(0.05)
+    raise AssertionError("job did not finish")
+
+
+def test_duplicate_submissions_share_one_job_and_its_result(db, tmp_path):
+    story = add_story(db, tmp_path)
+
+    first = job_service.submit_job(db, story.id)
+    second = job_service.submit_job(db, story.id)
+    assert first["job_id"] == second["job_id"]
+
+    status = wait_for(db, first["job_id"])
+    assert status["status"] == "succeeded"
+    assert status["progress"] == 1.0
+    assert status["result"]["dataset_info"]["rows"] == 4
+    assert status["result"]["data_card"]["source"] == "sales.csv"
+    # Other options are a different job
+    streamed = job_service.submit_job(db, story.id, mode="stream")
+    assert streamed["job_id"] != first["job_id"]
+    assert wait_for(db, streamed["job_id"])["status"] == "succeeded"
+
+
+def test_stories_on_the_same_data_get_their_own_jobs(db, tmp_path):
+    story = add_story(db, tmp_path)
+    copy = db_models.Dataset(filename="sales-copy.csv", filepath=story.dataset.filepath, content_hash="abc",
+                             size_bytes=os.path.getsize(story.dataset.filepath))
+    db.add(copy)
+    db.commit()
+    other = db_models.Story(title="Sales again", business_objective="y", level=1, dataset_id=copy.id)
+    db.add(other)
+    db.commit()
+
+    first = wait_for(db, job_service.submit_job(db, story.id)["job_id"])
+    second = wait_for(db, job_service.submit_job(db, other.id)["job_id"])
+
+    assert first["job_id"] != second["job_id"]
+    assert (second["story_id"], second["dataset_id"]) == (other.id, copy.id)
+    assert second["result"]["data_card"]["source"] == "sales-copy.csv"
+    assert second["result"]["dataset_info"] == first["result"]["dataset_info"]
+
+
+def test_failed_job_reports_the_error_and_can_be_resubmitted(db, tmp_path, monkeypatch):
+    story = add_story(db, tmp_path)
+
+    def fail(dataset, options, progress=None, stored_guardrails=None):
+        raise HTTPException(status_code=500, detail="Analysis failed: boom")
+    monkeypatch.setattr(analysis_service, "compute_analysis", fail)
+
+    job = job_service.submit_job(db, story.id)
+    status = wait_for(db, job["job_id"])
+    assert status["status"] == "failed"
+    assert status["error"] == "Analysis failed: boom"
+
+    again = job_service.submit_job(db, story.id)
+    assert again["job_id"] != job["job_id"]
+    assert wait_for(db, again["job_id"])["status"] == "failed"
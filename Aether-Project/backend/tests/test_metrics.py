@@ -0,0 +1,65 @@
+import os
+import sys
+
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services import metrics
+
+
+def sample(text, line_start):
+    """Value of the one sample line starting with `line_start`."""
+    values = [line.rsplit(" ", 1)[1] for line in text.splitlines() if line.startswith(line_start)]
+    assert len(values) == 1, values
+    return float(values[0])
+
+
+def test_requests_are_counted_per_mount_and_route_template():
+    metrics.reset()
+    router = APIRouter()
+
+    @router.get("/items/{item_id}")
+    def get_item(item_id: int):
+        return {"id": item_id}
+
+    app = FastAPI()
+    app.add_middleware(metrics.MetricsMiddleware)
+    app.include_router(router, prefix="/api")
+    app.include_router(router)
+    client = TestClient(app)
+    for path in ("/items/1", "/items/2", "/api/items/3", "/missing", "/items/x"):
+        client.get(path)
+
+    text = metrics.render()
+    route = 'route="/items/{item_id}"'
+    assert sample(text, f'aether_http_requests_total{{method="GET",mount="root",{route},status="200"}}') == 2
+    assert sample(text, f'aether_http_requests_total{{method="GET",mount="api",{route},status="200"}}') == 1
+    assert sample(text, f'aether_http_requests_total{{method="GET",mount="root",{route},status="422"}}') == 1
+    assert sample(text, 'aether_http_requests_total{method="GET",mount="root",route="<unmatched>",status="404"}') == 1
+    # Histogram buckets are cumulative and end with the count
+    assert sample(text, f'aether_http_request_duration_seconds_bucket{{method="GET",mount="root",{route},le="+Inf"}}') == 3
+    assert sample(text, f'aether_http_request_duration_seconds_count{{method="GET",mount="root",{route}}}') == 3
+
+
+def test_worker_reports_add_to_the_server_figures():
+    metrics.reset()
+    metrics.inc(metrics.ANALYSIS_ROWS, 100)
+    # What a compute worker sends with a task result: its unreported counts only
+    report = metrics.worker_report()
+    assert report["counters"] == {(metrics.ANALYSIS_ROWS, ()): 100}
+    assert metrics.worker_report()["counters"] == {}
+
+    metrics.merge_worker({**report, "pid": -1, "counters": {(metrics.PII_ROWS_SCANNED, (("scanner", "dataset"),)): 50},
+                          "dataset_cache": {**report["dataset_cache"], "bytes": 4096}})
+    text = metrics.render()
+    assert sample(text, "aether_analysis_rows_total ") == 100
+    assert sample(text, 'aether_pii_rows_scanned_total{scanner="dataset"}') == 50
+    assert sample(text, 'aether_dataset_cache_bytes{process="workers"}') == 4096
+
+    metrics.forget_worker(-1)
+    assert 'process="workers"' not in metrics.render()
+    # Counts already reported stay
+    assert sample(metrics.render(), 'aether_pii_rows_scanned_total{scanner="dataset"}') == 50
@@ -0,0 +1,57 @@
+import pytest
+import pandas as pd
+import numpy as np
+import os
+import sys
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services import numeric_profiler
+
+
+def make_frame():
+    rng = np.random.default_rng(3)
+    n = 257
+    df = pd.DataFrame({
+        'price': rng.lognormal(3, 1, n),
+        'score': rng.normal(50, 10, n).astype(np.float32),
+        'visits': rng.integers(0, 100, n).astype(np.int8),
+        'flat': np.full(n, 2.5),
+        'empty': np.full(n, np.nan),
+    })
+    df.loc[rng.random(n) < 0.1, 'score'] = np.nan
+    df.loc[[3, 9], 'price'] = np.nan
+    return df
+
+
+def test_batched_stats_match_per_column_pandas():
+    df = make_frame()
+    profile = numeric_profiler.profile_numeric(df)
+
+    assert profile.columns == list(df.columns)
+    for col in df.columns:
+        series = df[col]
+        i = profile.index(col)
+        assert profile.describe(col) == pytest.approx(series.describe().to_dict(), nan_ok=True, rel=0, abs=0)
+        for got, expected in ((profile.skew[i], series.skew()), (profile.kurt[i], series.kurt()), (profile.var[i], series.var())):
+            assert got == expected or (np.isnan(got) and np.isnan(expected))
+
+        q1, q3 = series.quantile(0.25), series.quantile(0.75)
+        iqr = q3 - q1
+        assert profile.outliers[i] == ((series < q1 - 1.5 * iqr) | (series > q3 + 1.5 * iqr)).sum()
+
+        counts, edges = np.histogram(series.dropna(), bins=10)
+        got_counts, got_edges = profile.histograms[i]
+        assert got_counts.tolist() == counts.tolist()
+        assert got_edges.dtype == edges.dtype and got_edges.tolist() == edges.tolist()
+
+
+def test_wide_frames_are_processed_in_blocks(monkeypatch):
+    monkeypatch.setattr(numeric_profiler, "BLOCK_BYTES", 1)
+    df = make_frame()
+    profile = numeric_profiler.profile_numeric(df, ['visits', 'price'])
+
+    assert profile.columns == ['visits', 'price']
+    assert profile.quantile('price', 0.5) == df['price'].quantile(0.5)
+    assert profile.mean[profile.index('visits')] == df['visits'].mean()
@@ -0,0 +1,69 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services import analysis_service, pii_engine, privacy_scanner
+
+
+def test_scan_counts_matching_rows_of_every_column_type():
+    df = pd.DataFrame({
+        "contact": ["jane@example.com", "call (555) 123-4567", None, "jane@example.com and bob@example.org"],
+        "ssn": ["123-45-6789", "n/a", "987-65-4321", ""],
+        "phone_number": [5551234567, 12, 5559876543, 7],
+        "ratio": [1 / 3, 0.5, np.nan, 2.0],
+        "account": [4111111111111111.0, 5559876543.0, np.nan, 1.5],
+        "card": pd.Categorical(["4111 1111 1111 1111", "x", "4111 1111 1111 1111", None]),
+        "signup": pd.to_datetime(["2020-01-01", "2021-06-30", None, "2022-03-15"]),
+    })
+
+    found = {(w["column"], w["type"]): w["count"] for w in privacy_scanner.scan_frame(df)}
+
+    assert found[("contact", "Email")] == 2
+    assert found[("contact", "Phone")] == 1
+    assert found[("ssn", "SSN")] == 2
+    assert found[("phone_number", "Phone")] == 2
+    # str(1/3) has sixteen digits in a row, but fractions are measurements, not identifiers
+    assert not any(column == "ratio" for column, _ in found)
+    assert found[("account", "Credit Card")] == 1
+    assert found[("account", "Phone")] == 2
+    assert found[("card", "Credit Card")] == 2
+    assert not any(column == "signup" for column, _ in found)
+
+
+def test_values_that_cannot_match_are_not_searched():
+    text = pii_engine.column_text(pd.Series(["a@b.co", "plain text", "12 dogs", "x@y"]), pii_engine.SCAN_DETECTORS)
+    email, phone = pii_engine.SCAN_DETECTORS[:2]
+
+    assert list(text.candidates(email)) == [0, 3]
+    assert list(text.candidates(phone)) == []
+    # Numbers too short to hold a phone number are never turned into strings
+    assert pii_engine.column_text(pd.Series([1.5, 250.0, 99999.0]), pii_engine.SCAN_DETECTORS) is None
+    assert pii_engine.column_text(pd.Series([0.1, 1e-05]), pii_engine.SCAN_DETECTORS) is None
+    assert pii_engine.column_text(pd.Series([0.1, 1e15]), pii_engine.SCAN_DETECTORS).values == ["1000000000000000.0"]
+
+
+def test_float_measurements_are_not_flagged():
+    values = pd.Series(np.random.default_rng(0).normal(size=1000))
+
+    assert privacy_scanner.scan_frame(values.to_frame("score")) == []
+    assert privacy_scanner.scan_frame(values.astype("Float64").to_frame("score")) == []
+
+
+def test_detect_pii_classifies_email_before_phone():
+    df = pd.DataFrame({
+        "email": ["someone@example.com", None],
+        "phone": ["+1 (555) 123-4567", "555-123-4567"],
+        "both": ["555 123 4567", "someone@example.com"],
+        "name": ["Ada", "Grace"],
+    })
+
+    assert analysis_service.detect_pii(df) == [
+        {"column": "email", "type": "Email"},
+        {"column": "phone", "type": "Phone"},
+        {"column": "both", "type": "Email"},
+    ]
@@ -0,0 +1,110 @@
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import BackgroundTasks
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.database import Base
+from app.models import db_models
+from app.routes import dataset as dataset_routes
+from app.services import artifact_store, blob_store, compute_pool, dataset_loader, ingest_service, privacy_scanner
+
+
+def make_dataset(tmp_path, rows=1000):
+    df = pd.DataFrame({"id": range(rows), "note": ["hello"] * rows})
+    # PII only far past the rows the upload scan reads
+    df.loc[900:909, "note"] = "reach me at someone@example.com"
+    path = tmp_path / "deep.csv"
+    df.to_csv(path, index=False)
+    return SimpleNamespace(id=1, filepath=str(path), columnar_path=None, row_count=rows, expiry_time=None)
+
+
+def test_full_scan_counts_every_chunk(tmp_path):
+    dataset = make_dataset(tmp_path)
+
+    assert privacy_scanner.scan_dataset(dataset.filepath) == []
+    result = privacy_scanner.scan_full(dataset, chunk_rows=128)
+
+    assert result["rows_scanned"] == result["population_rows"] == 1000
+    assert result["columns"] == {"note": {"Email": {"count": 10, "rate": 0.01}}}
+    assert [(w["column"], w["type"], w["count"]) for w in result["warnings"]] == [("note", "Email", 10)]
+
+
+def test_stratified_sample_covers_every_stretch_of_the_file(tmp_path):
+    positions = privacy_scanner.sample_positions(1000, 100, "stratified", seed=3)
+    assert len(positions) == 100
+    assert np.array_equal(positions // 10, np.arange(100))
+    assert len(np.unique(privacy_scanner.sample_positions(1000, 100, "random", seed=3))) == 100
+
+    dataset = make_dataset(tmp_path)
+    rows = dataset_loader.take_rows(dataset, positions, chunk_rows=64)
+    assert rows["id"].tolist() == positions.tolist()
+
+    result = privacy_scanner.scan_sample(dataset, rows=100, seed=3)
+    assert result["mode"] == "sample" and result["method"] == "stratified"
+    assert result["columns"]["note"]["Email"] == {"count": 1, "rate": 0.01, "estimated_count": 10}
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine)
+    monkeypatch.setattr(ingest_service, "SessionLocal", SessionLocal)
+    monkeypatch.setattr(compute_pool, "_pool", compute_pool.ComputePool(workers=0, timeout=30))
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+def add_dataset(db, tmp_path):
+    path = make_dataset(tmp_path).filepath
+    dataset = db_models.Dataset(filename="deep.csv", filepath=path, content_hash="deep", size_bytes=os.path.getsize(path))
+    db.add(dataset)
+    db.commit()
+    return dataset
+
+
+def test_queued_scan_is_pending_until_its_result_is_stored(db, tmp_path):
+    dataset = add_dataset(db, tmp_path)
+
+    tasks = BackgroundTasks()
+    assert ingest_service.queue_pii_scan(tasks, dataset, "full")
+    # Pending from the moment it is queued, and queued only once
+    assert ingest_service.pii_scan_running("deep", "full")
+    assert not ingest_service.queue_pii_scan(tasks, dataset, "full")
+    assert len(tasks.tasks) == 1
+
+    asyncio.run(tasks())
+    assert not ingest_service.pii_scan_running("deep", "full")
+    db.expire_all()
+    assert artifact_store.get(db, "deep", privacy_scanner.FULL_SCAN_KIND)["columns"]["note"]["Email"]["count"] == 10
+
+
+def test_cleaning_edit_scans_the_new_version(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(blob_store, "BLOB_DIR", str(tmp_path / "blobs"))
+    monkeypatch.setattr(blob_store, "INCOMING_DIR", str(tmp_path))
+    monkeypatch.setattr(ingest_service, "BACKGROUND_PII_SCAN", "full")
+    dataset = add_dataset(db, tmp_path)
+    op = dataset_routes.CleaningOperation(operation="anonymize", params={"column": "note"})
+
+    tasks = BackgroundTasks()
+    dataset_routes.clean_dataset(dataset.id, op, tasks, db=db)
+    assert dataset.content_hash != "deep"
+    assert dataset_routes.get_pii_scan(dataset.id, db=db) == {"status": "pending"}
+
+    asyncio.run(tasks())
+    db.expire_all()
+    scan = dataset_routes.get_pii_scan(dataset.id, db=db)
+    assert scan["status"] == "ready" and scan["rows_scanned"] == 1000
+    # The anonymized column holds hashes now, not the emails
+    assert "Email" not in scan["columns"].get("note", {})
@@ -0,0 +1,45 @@
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services import ai_story_service, profile_service
+
+
+def make_frame():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'revenue': np.r_[rng.normal(100, 10, 99), 1000],
+        'visits': rng.integers(0, 50, 100),
+        'region': rng.choice(['north', 'south', None], 100),
+    })
+
+
+def test_profile_records_column_metadata():
+    df = make_frame()
+
+    profile = json.loads(json.dumps(profile_service.build_profile(df)))
+
+    assert profile["rows"] == 100
+    region = profile_service.column(profile, 'region')
+    assert region["kind"] == "categorical"
+    assert region["nulls"] == int(df['region'].isnull().sum())
+    assert region["unique"] == 2
+    revenue = profile_service.column(profile, 'revenue')
+    assert revenue["max"] == 1000
+    assert revenue["outliers"] >= 1
+    assert profile_service.columns_of_kind(profile, "numeric") == ['revenue', 'visits']
+
+
+def test_hypotheses_from_profile_match_the_data():
+    df = make_frame()
+    profile = json.loads(json.dumps(profile_service.build_profile(df)))
+
+    for story_type in ['exploratory', 'root_cause']:
+        assert ai_story_service.generate_hypotheses_from_profile(profile, story_type=story_type) == \
+            ai_story_service.generate_hypotheses(df, story_type=story_type)
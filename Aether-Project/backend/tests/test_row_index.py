@@ -0,0 +1,60 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services import dtype_optimizer, row_index
+
+
+def make_frame():
+    rng = np.random.default_rng(11)
+    n = 300
+    df = pd.DataFrame({
+        "city": np.array(["a", "b", None, np.nan], dtype=object)[rng.integers(0, 4, n)],
+        "visits": rng.integers(0, 3, n),
+        "score": np.array([0.0, -0.0, 1.5, np.nan])[rng.integers(0, 4, n)],
+        "joined": pd.to_datetime(rng.integers(0, 2, n), unit="D"),
+        # Numeric-looking strings, which the optimizer parses
+        "code": np.array(["1", " 2", "3.5", None], dtype=object)[rng.integers(0, 4, n)],
+        "zip": np.array(["07", "10", "12"], dtype=object)[rng.integers(0, 3, n)]
+    })
+    return df
+
+
+def test_first_occurrences_match_duplicated_in_any_storage_type():
+    df = make_frame()
+    hashes = row_index.row_hashes(df)
+    np.testing.assert_array_equal(row_index.first_occurrences(hashes), ~df.duplicated().to_numpy())
+    assert row_index.duplicate_count(hashes) == int(df.duplicated().sum())
+    # The optimizer's categories and narrower numbers hash like the values they hold
+    optimized, _ = dtype_optimizer.optimize(df)
+    assert (optimized.dtypes != df.dtypes).any()
+    np.testing.assert_array_equal(row_index.row_hashes(optimized), hashes)
+
+
+def test_column_updates_equal_a_rebuild():
+    df = make_frame()
+    hashes = row_index.row_hashes(df)
+
+    dropped = df.drop(columns=["visits"])
+    np.testing.assert_array_equal(row_index.update_column(hashes, df["visits"]), row_index.row_hashes(dropped))
+    renamed = df.rename(columns={"city": "town"})
+    np.testing.assert_array_equal(row_index.update_column(hashes, df["city"], renamed["town"]), row_index.row_hashes(renamed))
+    imputed = df.assign(city=df["city"].fillna("a"))
+    np.testing.assert_array_equal(row_index.update_column(hashes, df["city"], imputed["city"]), row_index.row_hashes(imputed))
+
+
+def test_for_dataset_stores_the_index_next_to_the_file(tmp_path):
+    df = make_frame()
+    dataset = SimpleNamespace(filepath=str(tmp_path / "people.csv"))
+    hashes = row_index.for_dataset(dataset, df)
+
+    assert os.path.exists(row_index.path_for(dataset.filepath))
+    np.testing.assert_array_equal(row_index.load(dataset.filepath, len(df)), hashes)
+    # An index of another length is not used
+    assert row_index.load(dataset.filepath, len(df) - 1) is None
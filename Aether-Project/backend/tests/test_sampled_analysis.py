@@ -0,0 +1,85 @@
+import pandas as pd
+import numpy as np
+import os
+import sys
+from types import SimpleNamespace
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services import sampled_analysis
+
+
+def make_dataset(tmp_path, rows=20000):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'income': rng.lognormal(10, 0.5, rows).round(2),
+        'gender': rng.choice(['f', 'm', 'x'], rows, p=[0.48, 0.48, 0.04]),
+        'score': rng.normal(50, 10, rows),
+    })
+    df.loc[rng.random(rows) < 0.05, 'score'] = np.nan
+    path = tmp_path / "people.csv"
+    df.to_csv(path, index=False)
+    dataset = SimpleNamespace(id=1, filepath=str(path), filename="people.csv", columnar_path=None,
+                              content_hash=None, expiry_time=None)
+    return dataset, pd.read_csv(path)
+
+
+def test_stratified_sample_is_proportional_and_exact_figures_cover_every_row(tmp_path):
+    dataset, df = make_dataset(tmp_path)
+
+    sample, info = sampled_analysis.sample_dataset(dataset, 1000, stratify='gender', seed=1, chunk_rows=3000)
+
+    assert len(sample) == info["sample_rows"] == 1000
+    assert info["population_rows"] == len(df)
+    assert info["strata"] == df['gender'].value_counts().to_dict()
+    expected = (df['gender'].value_counts() / len(df) * 1000)
+    assert (sample['gender'].value_counts() - expected).abs().max() <= 1
+    assert info["missing_values"] == {'score': int(df['score'].isnull().sum())}
+    assert info["min"]['income'] == df['income'].min() and info["max"]['income'] == df['income'].max()
+
+
+def test_fast_analysis_reports_intervals_around_the_exact_values(tmp_path):
+    dataset, df = make_dataset(tmp_path)
+
+    result = sampled_analysis.perform_fast_analysis(dataset, rows=4000)
+
+    approximation = result["approximation"]
+    assert approximation["exact"] is False
+    assert approximation["stratified_on"] == 'gender'
+    assert result["dataset_info"]["initial_rows"] == len(df)
+    bounds = approximation["error_bounds"]
+    low, high = bounds["summary_stats"]['income']['mean']
+    assert low <= df['income'].mean() <= high
+    low, high = bounds["summary_stats"]['income']['50%']
+    assert low <= df['income'].median() <= high
+    low, high = bounds["categorical_analysis"]['gender']['f']
+    assert low <= (df['gender'] == 'f').sum() <= high
+    assert 'gender' in bounds["fairness_scores"]
+
+
+def test_sample_covering_the_dataset_is_exact(tmp_path):
+    dataset, df = make_dataset(tmp_path, rows=500)
+
+    result = sampled_analysis.perform_fast_analysis(dataset, rows=1000)
+
+    assert result["approximation"]["exact"] is True
+    assert result["approximation"]["error_bounds"] == {}
+    assert result["dataset_info"]["rows"] == len(df)
+
+
+def test_duplicate_count_covers_rows_repeated_many_times(tmp_path):
+    dataset, df = make_dataset(tmp_path, rows=20000)
+    # One row repeated across a tenth of the file
+    df.iloc[::10] = df.iloc[0].to_numpy()
+    df.to_csv(dataset.filepath, index=False)
+    df = pd.read_csv(dataset.filepath)
+
+    result = sampled_analysis.perform_fast_analysis(dataset, rows=1000)
+
+    info = result["dataset_info"]
+    assert result["approximation"]["duplicates_exact"] is True
+    assert info["duplicates_removed"] == int(df.duplicated().sum())
+    assert info["rows"] == len(df.drop_duplicates())
+    scale = result["approximation"]["scale"]
+    assert 15 < scale < 20
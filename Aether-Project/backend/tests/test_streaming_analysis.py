@@ -0,0 +1,67 @@
+import pytest
+import pandas as pd
+import numpy as np
+import os
+import sys
+from types import SimpleNamespace
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services import streaming_analysis
+
+
+def make_frame():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'score': rng.normal(50, 10, 300).round(1),
+        'hours': rng.exponential(3, 300).round(2),
+        'gender': rng.choice(['f', 'm'], 300),
+    })
+    df.loc[[5, 17, 40], 'score'] = np.nan
+    df.loc[[8], 'gender'] = None
+    return pd.concat([df, df.head(25)], ignore_index=True)
+
+
+def test_streamed_stats_match_in_memory_analysis(tmp_path):
+    df = make_frame()
+    path = tmp_path / "data.csv"
+    df.to_csv(path, index=False)
+    dataset = SimpleNamespace(id=1, filepath=str(path), filename="data.csv", columnar_path=None)
+
+    result = streaming_analysis.perform_streaming_analysis(dataset, chunk_rows=40)
+
+    # Reference: the same cleaning perform_analysis does, in memory
+    clean = df.drop_duplicates().copy()
+    for col in ['score', 'hours']:
+        clean[col] = clean[col].fillna(clean[col].median())
+    clean['gender'] = clean['gender'].fillna(clean['gender'].mode()[0])
+
+    info = result["dataset_info"]
+    assert info["rows"] == len(clean)
+    assert info["duplicates_removed"] == 25
+    assert info["missing_values"] == {'score': 3, 'gender': 1}
+    expected = clean.describe().to_dict()
+    for col in ['score', 'hours']:
+        for stat, value in expected[col].items():
+            assert result["summary_stats"][col][stat] == pytest.approx(value)
+        assert result["advanced_stats"][col]["skewness"] == round(clean[col].skew(), 2)
+        assert result["advanced_stats"][col]["kurtosis"] == round(clean[col].kurt(), 2)
+    corr = {(c["x"], c["y"]): c["value"] for c in result["correlations"]["matrix"]}
+    assert corr[('score', 'hours')] == round(clean['score'].corr(clean['hours']), 2)
+    assert result["categorical_analysis"]["gender"] == clean['gender'].value_counts().to_dict()
+    assert result["approximation"]["exact"] is True
+
+
+def test_quantile_sketch_stays_within_reported_error():
+    values = np.random.default_rng(1).normal(size=200000)
+    sketch = streaming_analysis.QuantileSketch(k=512)
+    for chunk in np.array_split(values, 20):
+        sketch.update(chunk)
+
+    items, weights = sketch.items()
+    estimate = streaming_analysis.QuantileSketch.quantile(items, weights, 0.5)
+    rank = (values < estimate).mean()
+
+    assert sum(len(level) for level in sketch.levels) < 512 * 10
+    assert abs(rank - 0.5) <= sketch.error / sketch.n